@@ -1,5 +1,5 @@
 import json
-from fastapi import FastAPI,HTTPException, status, Depends, Cookie, BackgroundTasks
+from fastapi import FastAPI,HTTPException, status, Depends, Cookie, BackgroundTasks, Request
 from pydantic import BaseModel
 from typing import Optional
 from models.refresh_token import RefreshToken
@@ -10,7 +10,15 @@ from models.db import get_session
 from datetime import datetime, timedelta, timezone
 import os
 from fastapi.responses import JSONResponse, Response # Import Response
-from helpers.authentication_utils import create_access_token, get_current_user, hash_password, verify_password
+from helpers.authentication_utils import (
+    create_access_token, get_current_user, ahash_password, averify_and_update_password,
+    check_login_attempts, reset_login_attempts, login_client_ip
+)
+from helpers.principal_cache import invalidate_principal
+from helpers.refresh_token_store import (
+    issue_refresh_token, rotate_refresh_token, revoke_refresh_token, revoke_all_refresh_tokens
+)
+from jose import jwt, JWTError
 import secrets
 from datetime import datetime, timedelta, timezone
 from helpers.logging import setup_logger
@@ -46,7 +54,7 @@ def auth_api(app: FastAPI, prefix: str = "/api/v1/auth"):
             )
 
         # Create new user
-        hashed_password = hash_password(user.password)
+        hashed_password = await ahash_password(user.password)
         db_user = User(
             email=user.email,
             hashed_password=hashed_password,
@@ -68,27 +76,31 @@ def auth_api(app: FastAPI, prefix: str = "/api/v1/auth"):
         }
 
     @app.post(f"{prefix}/login")
-    async def login_for_access_token(user_login: UserLogin, session: Session = Depends(get_session)):
+    async def login_for_access_token(user_login: UserLogin, request: Request, session: Session = Depends(get_session)):
+        await check_login_attempts(user_login.email, login_client_ip(request))
         user = session.exec(select(User).where(User.email == user_login.email)).first()
-        if not user or not verify_password(plain_password=user_login.password, hashed_password=user.hashed_password):
+        valid, new_hash = (False, None)
+        if user:
+            valid, new_hash = await averify_and_update_password(user_login.password, user.hashed_password)
+        if not valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        await reset_login_attempts(user_login.email)
+        if new_hash:
+            # Stored hash used another bcrypt cost; upgrade it while we hold the plaintext
+            user.hashed_password = new_hash
+            session.add(user)
         access_token_expires = timedelta(minutes=Settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
             data={"sub": str(user.id)}, expires_delta=access_token_expires
         )
         # refresh token
-        refresh_token_value = secrets.token_urlsafe(32)
-        refresh_token = RefreshToken(
-            user_id=user.id,
-            token=refresh_token_value,
-            expires_at=datetime.now(timezone.utc) + timedelta(days=Settings.REFRESH_TOKEN_EXPIRE_DAYS)
-        )
-        session.add(refresh_token)
-        session.commit()
+        refresh_token_value = issue_refresh_token(user.id, session)
+        if session.new or session.dirty:
+            session.commit()
         response = JSONResponse(content={"message": "Login successful"})
         is_prod = os.getenv("ENV") == "production"
         response.set_cookie(
@@ -113,33 +125,23 @@ def auth_api(app: FastAPI, prefix: str = "/api/v1/auth"):
         return response
 
     @app.get(f"{prefix}/me")
-    async def read_users_me(
-        current_user: dict = Depends(get_current_user), 
-        session: Session = Depends(get_session)):
-        user_id = current_user.id
-        user = session.exec(select(User).where(User.id == str(user_id))).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        return {"user": {"id": str(user.id), "email": user.email, "full_name": user.full_name}}
+    async def read_users_me(current_user: User = Depends(get_current_user)):
+        # get_current_user already resolved the user; no second lookup
+        return {"user": {"id": str(current_user.id), "email": current_user.email, "full_name": current_user.full_name}}
 
     @app.post(f"{prefix}/refresh")
     def refresh_token(response: Response, refreshToken: str = Cookie(None), session: Session = Depends(get_session)):
         if not refreshToken:
             raise HTTPException(401, "No refresh token")
 
-        token_entry = session.exec(select(RefreshToken).where(RefreshToken.token == refreshToken)).first()
-        if not token_entry or token_entry.expires_at < datetime.now(timezone.utc):
+        # rotate refresh token
+        rotated = rotate_refresh_token(refreshToken, session)
+        if not rotated:
             raise HTTPException(401, "Refresh token expired or invalid")
+        user_id, new_refresh_token_value = rotated
 
         # issue new tokens
-        access_token = create_access_token({"sub": token_entry.user_id}, timedelta(minutes=Settings.ACCESS_TOKEN_EXPIRE_MINUTES))
-        new_refresh_token_value = secrets.token_urlsafe(32)
-
-        # rotate refresh token
-        token_entry.token = new_refresh_token_value
-        token_entry.expires_at = datetime.now(timezone.utc) + timedelta(days=Settings.REFRESH_TOKEN_EXPIRE_DAYS)
-        session.add(token_entry)
-        session.commit()
+        access_token = create_access_token({"sub": user_id}, timedelta(minutes=Settings.ACCESS_TOKEN_EXPIRE_MINUTES))
 
         response.set_cookie(key="authToken", value=access_token, 
                             httponly=True, secure=True, 
@@ -153,10 +155,20 @@ def auth_api(app: FastAPI, prefix: str = "/api/v1/auth"):
     @app.post(f"{prefix}/logout")
     def logout(response: Response, 
             refreshToken: str = Cookie(None), 
+            authToken: str = Cookie(None),
+            everywhere: bool = False,
             session: Session = Depends(get_session)):
-        if refreshToken:
-            session.exec(delete(RefreshToken).where(RefreshToken.token == refreshToken))
-            session.commit()
+        user_id = revoke_refresh_token(refreshToken, session) if refreshToken else None
+        if authToken:
+            try:
+                user_id = jwt.decode(authToken, Settings.SECRET_KEY, algorithms=[Settings.ALGORITHM]).get("sub") or user_id
+            except JWTError:
+                pass # expired/invalid access token; the refresh token may still identify the user
+        if user_id:
+            invalidate_principal(user_id)
+            if everywhere:
+                # ?everywhere=true revokes every refresh token of the user
+                revoke_all_refresh_tokens(user_id, session)
         response.delete_cookie("authToken")
         response.delete_cookie("refreshToken")
         return {"message": "Logged out"}
@@ -2,16 +2,25 @@ from fastapi import FastAPI, Body, WebSocket, WebSocketDisconnect, Depends, \
     HTTPException, Query, Cookie, Request
 from pydantic import BaseModel, Field
 from models.user import User
-from controllers.chatting import  agent_chatting
+from fastapi.responses import StreamingResponse
+from controllers.chatting import  agent_chatting, agent_chatting_events
 from helpers.authentication_utils import get_current_user # Corrected import
 from sqlmodel import Session, SQLModel, Field
-from models.db import get_session
+from models.db import get_session, engine
 from helpers.logging import setup_logger
-from helpers.redis_utils import reset_user_session
+from helpers.redis_utils import areset_user_session
+from helpers.json_utils import json_serial
+import json
 
 logger = setup_logger("chat_api")
 
 
+def format_sse(event: dict) -> str:
+    """Renders one agent event as a Server-Sent Events frame."""
+    data = json.dumps(event["data"], default=json_serial, ensure_ascii=False)
+    return f"event: {event['event']}\ndata: {data}\n\n"
+
+
 class MessageCreate(SQLModel):
     text: str
     # sender: str  # "user_id" or "bot" --> sourced directly from logged in user
@@ -45,18 +54,66 @@ def query_api(app: FastAPI, prefix: str = "/api/v1"):
         # current_user: dict = Depends(get_current_user),
         session: Session = Depends(get_session)):
 
-      response = agent_chatting(
+      response = await agent_chatting(
           session_id=session_id, 
           msg=msg,
           session=session)
       # { "answer": str, "data": { "ventures": [...], "venture_ids": [...]} }
       return response
 
+    @app.post(f"{prefix}/query/stream")
+    async def ai_agent_query_stream(
+        session_id: str = Body("test"),
+        msg: str = Body(...),
+        session: Session = Depends(get_session)):
+      """
+      SSE twin of /query: emits tool_call, ventures and token events as the agent
+      loop progresses, then a final event with the same payload /query returns.
+      """
+      async def event_stream():
+          try:
+              async for event in agent_chatting_events(session_id=session_id, msg=msg, session=session):
+                  yield format_sse(event)
+          except Exception as e:
+              logger.exception(f"Streaming query failed: {e}")
+              yield format_sse({"event": "error", "data": {"error": "internal_error"}})
+
+      return StreamingResponse(
+          event_stream(),
+          media_type="text/event-stream",
+          headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    @app.websocket(f"{prefix}/query/ws")
+    async def ai_agent_query_ws(websocket: WebSocket):
+      """
+      WebSocket variant for the mobile client. Each inbound frame is
+      {"session_id": str, "msg": str}; every agent event is sent back as JSON.
+      Each message gets its own Session, so an idle socket holds no pooled connection.
+      """
+      await websocket.accept()
+      try:
+          while True:
+              request = await websocket.receive_json()
+              try:
+                  with Session(engine) as session:
+                      async for event in agent_chatting_events(
+                              session_id=request.get("session_id", "test"),
+                              msg=request["msg"],
+                              session=session):
+                          await websocket.send_text(json.dumps(event, default=json_serial, ensure_ascii=False))
+              except WebSocketDisconnect:
+                  raise
+              except Exception as e:
+                  logger.exception(f"WebSocket query failed: {e}")
+                  await websocket.send_json({"event": "error", "data": {"error": "internal_error"}})
+      except WebSocketDisconnect:
+          logger.info("Query websocket disconnected")
+
 
     @app.post(f"{prefix}/session/clear")
     async def clear_session(session_id: str = Body(..., embed=True)):
         try:
-            reset_user_session(session_id)
+            await areset_user_session(session_id)
         except Exception as e:
             print(f"Session clear failed: {e}")
 
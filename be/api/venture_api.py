@@ -1,54 +1,92 @@
-from fastapi import FastAPI, HTTPException, Depends, Query
+from fastapi import FastAPI, HTTPException, Depends, Query, Response
 from sqlmodel import Session, select, or_
+from sqlalchemy import tuple_
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from models.venture import Venture
 
-from models.db import get_session
-from schemas import VenturePulseResponse
+from models.db import get_async_read_session, read_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from schemas import VenturePulseResponse, VentureDetailResponse, VentureListItem, MetricPointSchema
+from controllers.venture_cache import aget_all_venture_payloads, aget_venture_payloads, aget_venture_count
+from controllers.venture_filtering import VENTURE_LIST_FIELDS, venture_list_statement, project_ventures, parse_search_results
+from controllers.venture_search import afulltext_search, semantic_search, DEFAULT_TOP_K, MAX_TOP_K
+from helpers.pagination import encode_cursor, decode_cursor
+from starlette.concurrency import run_in_threadpool
+from controllers.venture_metrics import aget_metrics_history
 from helpers.authentication_utils import get_current_user 
 
+def _semantic_search_in_own_session(query: str, k: int):
+    # The embedding index is built and queried synchronously; keep it off the event loop
+    with Session(read_engine) as db:
+        return semantic_search(db, query, k)
+
 def venture_api(app: FastAPI, prefix: str = "/api/v1/ventures"):
     
-    @app.get(f"{prefix}", response_model=List[VenturePulseResponse])
+    @app.get(f"{prefix}", response_model=List[VentureListItem], response_model_exclude_unset=True)
     async def get_all_ventures(
-        session: Session = Depends(get_session),
+        response: Response,
+        limit: Optional[int] = Query(None, ge=1, le=200, description="Page size; omit for the whole portfolio"),
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+        fields: Optional[str] = Query(None, description="Comma-separated subset, e.g. id,name,health,runway_months"),
+        session: AsyncSession = Depends(get_async_read_session),
         # current_user: dict = Depends(get_current_user)
         ):
         """
-        Fetches all ventures using denormalized columns for high performance.
+        Fetches ventures using denormalized columns for high performance.
+        Without paging/projection the whole list is served from the shared venture cache.
+        With `limit`/`cursor` it pages by keyset over (name, id); the total and the next
+        cursor come back in the X-Total-Count / X-Next-Cursor headers.
         """
-        # We only need to eager load pilot_customers if the schema requires the full list
-        statement = select(Venture).options(
-            selectinload(Venture.pilot_customers)
-        )
-        results = session.exec(statement).all()
-        
-        # Pydantic's model_validate handles the snake_case -> camelCase mapping 
-        # based on the aliases we set in the VenturePulseResponse schema.
-        return [VenturePulseResponse.model_validate(v) for v in results]
+        if limit is None and cursor is None and not fields:
+            return await aget_all_venture_payloads(session)
 
-    @app.get(f"{prefix}/{{venture_id}}", response_model=VenturePulseResponse)
-    async def get_venture_details(
-        venture_id: str, 
-        session: Session = Depends(get_session),
-        # current_user: dict = Depends(get_current_user)
-        ):
+        selected = list(VENTURE_LIST_FIELDS)
+        if fields:
+            requested = [f.strip() for f in fields.split(",") if f.strip()]
+            unknown = [f for f in requested if f not in VENTURE_LIST_FIELDS]
+            if unknown:
+                raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(unknown)}")
+            selected = ["id"] + [f for f in requested if f != "id"]
+
+        statement = venture_list_statement(selected).order_by(Venture.name, Venture.id)
+        if cursor is not None:
+            key = decode_cursor(cursor)
+            # (name, id) as produced by encode_cursor; anything else is a client error
+            if not key or len(key) != 2 or not all(isinstance(part, str) for part in key):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            statement = statement.where(tuple_(Venture.name, Venture.id) > tuple_(*key))
+        if limit is not None:
+            # One extra row tells us whether another page exists
+            statement = statement.limit(limit + 1)
+
+        results = (await session.exec(statement)).all()
+        has_more = limit is not None and len(results) > limit
+        results = results[:limit] if limit is not None else results
+
+        response.headers["X-Total-Count"] = str(await aget_venture_count(session))
+        if has_more:
+            response.headers["X-Next-Cursor"] = encode_cursor(results[-1].name, results[-1].id)
+        return project_ventures(results, selected)
+
+    # Registered before /{venture_id} so '/search' and '/filter' aren't captured as a venture id
+    @app.get(f"{prefix}/search", response_model=List[VenturePulseResponse])
+    async def search_ventures_text(
+        q: str = Query(..., min_length=1, max_length=256),
+        k: int = Query(DEFAULT_TOP_K, ge=1, le=MAX_TOP_K),
+        mode: str = Query("fulltext", pattern="^(fulltext|semantic)$"),
+        session: AsyncSession = Depends(get_async_read_session)
+    ):
         """
-        Fetches full details for a single venture, including history for the sparkline.
+        Top-k ventures for a free-text query over name, description and last update:
+        Postgres full-text ranking, or local-embedding similarity with mode=semantic.
         """
-        statement = select(Venture).where(Venture.id == venture_id).options(
-            selectinload(Venture.pilot_customers),
-            # We eager load history only when viewing details
-            selectinload(Venture.metrics_history) 
-        )
-        venture = session.exec(statement).first()
-        
-        if not venture:
-            raise HTTPException(status_code=404, detail="Venture not found")
-            
-        return VenturePulseResponse.model_validate(venture)
-    
+        if mode == "semantic":
+            results = await run_in_threadpool(_semantic_search_in_own_session, q, k)
+        else:
+            results = await afulltext_search(session, q, k)
+        return parse_search_results(results=results)
+
     @app.get(f"{prefix}/filter", response_model=List[VenturePulseResponse])
     async def filter_ventures(
         pod: Optional[str] = Query(None),
@@ -57,10 +95,12 @@ def venture_api(app: FastAPI, prefix: str = "/api/v1/ventures"):
         search: Optional[str] = Query(None),
         min_runway: Optional[int] = Query(None),
         max_burn: Optional[float] = Query(None),
-        session: Session = Depends(get_session)
+        session: AsyncSession = Depends(get_async_read_session)
     ):
         """
         Optimized filtering using direct database columns.
+        Text search is served by the pg_trgm GIN indexes; categorical + range filters by
+        the (pod, stage, health, runway/burn) composite indexes.
         """
         statement = select(Venture).options(selectinload(Venture.pilot_customers))
 
@@ -77,15 +117,45 @@ def venture_api(app: FastAPI, prefix: str = "/api/v1/ventures"):
             statement = statement.where(
                 or_(
                     Venture.name.ilike(f"%{search}%"),
-                    Venture.founder.ilike(f"%{search}%")
+                    Venture.founder.ilike(f"%{search}%"),
+                    Venture.description.ilike(f"%{search}%")
                 )
             )
 
         # Numerical Metric Filters (Now possible directly in SQL!)
-        if min_runway:
+        if min_runway is not None:
             statement = statement.where(Venture.runway_months >= min_runway)
-        if max_burn:
+        if max_burn is not None:
             statement = statement.where(Venture.burn_rate_monthly <= max_burn)
 
-        results = session.exec(statement).all()
-        return [VenturePulseResponse.model_validate(v) for v in results]
\ No newline at end of file
+        results = (await session.exec(statement)).all()
+        return [VenturePulseResponse.model_validate(v) for v in results]
+
+    @app.get(f"{prefix}/{{venture_id}}", response_model=VentureDetailResponse)
+    async def get_venture_details(
+        venture_id: str, 
+        session: AsyncSession = Depends(get_async_read_session),
+        # current_user: dict = Depends(get_current_user)
+        ):
+        """
+        Fetches full details for a single venture (read-through the shared venture cache),
+        including the last 12 monthly rollups for the sparkline.
+        """
+        payloads = await aget_venture_payloads([venture_id], session)
+        
+        if not payloads:
+            raise HTTPException(status_code=404, detail="Venture not found")
+            
+        return {**payloads[0], "metrics_history": await aget_metrics_history(session, venture_id)}
+
+    @app.get(f"{prefix}/{{venture_id}}/metrics", response_model=List[MetricPointSchema])
+    async def get_venture_metrics(
+        venture_id: str,
+        granularity: str = Query("month", pattern="^(month|quarter)$"),
+        limit: int = Query(12, ge=1, le=120),
+        session: AsyncSession = Depends(get_async_read_session),
+        ):
+        """
+        KPI trend for one venture from the pre-aggregated monthly/quarterly rollups.
+        """
+        return await aget_metrics_history(session, venture_id, granularity=granularity, limit=limit)
@@ -10,6 +10,8 @@ from helpers.exception_handler import ExceptionHandler
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from models.db import init_db
+from controllers.venture_cache import start_invalidation_listener, stop_invalidation_listener
+from controllers.portfolio_snapshots import start_snapshot_scheduler, stop_snapshot_scheduler
 import os
 from config.config import Settings
 
@@ -43,6 +45,7 @@ app.add_middleware(
     allow_credentials=True,         # Allow credentials (e.g., cookies, authorization headers)
     allow_methods=["*"],            # Allow all HTTP methods (GET, POST, etc.)
     allow_headers=["*"],            # Allow all headers
+    expose_headers=["X-Total-Count", "X-Next-Cursor"], # GET /ventures pagination
 )
 
 # Register routes
@@ -73,10 +76,13 @@ def health_check():
 @app.on_event('startup')
 async def startup():
     init_db()
+    start_invalidation_listener()
+    start_snapshot_scheduler()
 
 @app.on_event("shutdown")
 async def shutdown():
-    pass
+    stop_invalidation_listener()
+    stop_snapshot_scheduler()
 
 app.include_router(router)
 
@@ -0,0 +1,59 @@
+"""
+Concurrent chat sessions on one worker: the async agent loop against a model call
+that blocks the event loop, which is what the synchronous LLM_WITH_TOOLS.invoke did.
+
+    python -m benchmarks.bench_agent_concurrency [--llm-ms 500] [--sessions 1 10 50]
+
+Each session runs one full turn through agent_chatting (tool call, tool, answer:
+two model round-trips of --llm-ms each) with the router and answer cache off.
+"""
+import argparse
+import asyncio
+import time
+from sqlmodel import Session
+from benchmarks.harness import StubLLM, new_session_id, percentiles, print_table, seed_ventures
+from config.config import settings
+from controllers import chatting
+from helpers.redis_utils import areset_user_session
+from models.db import engine, read_engine
+
+QUESTION = "Which ventures have the best NPS and what does that mean for the portfolio?"
+
+async def run_sessions(count: int):
+    latencies = []
+
+    async def one_session():
+        session_id = new_session_id()
+        # One Session per chat, as the request dependency gives each request its own
+        with Session(read_engine) as db:
+            start = time.perf_counter()
+            final = await chatting.agent_chatting(session_id, QUESTION, db)
+            latencies.append(time.perf_counter() - start)
+        assert final and final.get("answer"), final
+        await areset_user_session(session_id)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_session() for _ in range(count)))
+    return latencies, time.perf_counter() - started
+
+async def main(args):
+    seed_ventures(engine, args.ventures)
+    settings.QUERY_ROUTER_ENABLED = False
+    settings.RESPONSE_CACHE_ENABLED = False
+
+    rows = []
+    for label, blocking in (("blocking model call (before)", True), ("async model call (after)", False)):
+        chatting.LLM_WITH_TOOLS = StubLLM(args.llm_ms / 1000, blocking=blocking)
+        for count in args.sessions:
+            latencies, elapsed = await run_sessions(count)
+            stats = percentiles(latencies)
+            rows.append([label, count, elapsed, count / elapsed, stats["p50"], stats["p95"]])
+    print_table(f"one agent turn per session, stub LLM {args.llm_ms:g} ms per call",
+                ["agent loop", "sessions", "wall s", "turns/s", "p50 ms", "p95 ms"], rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-ms", type=float, default=500, help="stub latency per model call")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50], help="concurrent sessions per run")
+    parser.add_argument("--ventures", type=int, default=200, help="synthetic ventures to seed")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,96 @@
+"""
+Authenticated request throughput on GET /api/v1/auth/me, before and after the
+principal cache.
+
+    python -m benchmarks.bench_auth [--requests 2000] [--concurrency 50]
+
+"before" reproduces the old path: get_current_user decodes the JWT and selects the
+user from Postgres, then read_users_me selects it a second time. "after" is the
+current endpoint, measured with the Redis tier only (local LRU off) and with both
+tiers warm.
+"""
+import argparse
+import asyncio
+import time
+import httpx
+from fastapi import Cookie, Depends, FastAPI, HTTPException
+from jose import jwt
+from sqlmodel import Session, select
+from api.auth_api import auth_api
+from benchmarks.harness import BENCH_PREFIX, percentiles, print_table
+from config.config import Settings
+from helpers import principal_cache
+from helpers.authentication_utils import create_access_token
+from models.db import engine
+from models.user import User
+
+BENCH_USER_ID = f"{BENCH_PREFIX}user"
+
+def ensure_user():
+    with Session(engine) as session:
+        if not session.get(User, BENCH_USER_ID):
+            session.add(User(id=BENCH_USER_ID, email="bench@example.com", hashed_password="x",
+                             full_name="Bench User", team_id=None))
+            session.commit()
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    auth_api(app)
+
+    async def legacy_get_current_user(authToken: str = Cookie(None)):
+        payload = jwt.decode(authToken, Settings.SECRET_KEY, algorithms=[Settings.ALGORITHM])
+        with Session(engine) as session:
+            user = session.exec(select(User).where(User.id == payload.get("sub"))).first()
+        if not user:
+            raise HTTPException(status_code=401)
+        return user
+
+    @app.get("/legacy/auth/me")
+    async def legacy_read_users_me(current_user: User = Depends(legacy_get_current_user)):
+        with Session(engine) as session:
+            user = session.exec(select(User).where(User.id == current_user.id)).first()
+        return {"user": {"id": str(user.id), "email": user.email, "full_name": user.full_name}}
+
+    return app
+
+async def run_load(client: httpx.AsyncClient, path: str, total: int, concurrency: int):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return latencies, time.perf_counter() - started
+
+async def main(args):
+    if not Settings.SECRET_KEY:
+        Settings.SECRET_KEY = "bench-secret" # tokens are only minted and read inside this process
+    ensure_user()
+    token = create_access_token({"sub": BENCH_USER_ID})
+    transport = httpx.ASGITransport(app=build_app())
+
+    rows = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", cookies={"authToken": token}) as client:
+        for label, path, local_ttl in (("before: 2 DB lookups", "/legacy/auth/me", None),
+                                       ("after: Redis tier", "/api/v1/auth/me", 0),
+                                       ("after: local LRU", "/api/v1/auth/me", principal_cache.PRINCIPAL_LOCAL_TTL)):
+            if local_ttl is not None:
+                principal_cache.PRINCIPAL_LOCAL_TTL = local_ttl
+            await run_load(client, path, 50, 10) # warm pools and caches
+            latencies, elapsed = await run_load(client, path, args.requests, args.concurrency)
+            stats = percentiles(latencies)
+            rows.append([label, len(latencies), len(latencies) / elapsed, stats["p50"], stats["p95"]])
+    print_table(f"GET /auth/me, {args.concurrency} in flight",
+                ["principal resolution", "requests", "req/s", "p50 ms", "p95 ms"], rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
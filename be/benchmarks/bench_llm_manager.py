@@ -0,0 +1,46 @@
+"""
+Per-call setup cost of LLMManager.generate_response, before and after caching the
+configured runnables and compiled prompt templates. The model call itself is not
+made; this times everything generate_response does before it.
+
+    python -m benchmarks.bench_llm_manager [--calls 5000]
+"""
+import argparse
+import timeit
+from langchain_core.prompts import PromptTemplate
+from benchmarks.harness import print_table
+from services.llm import LLMManager, FALLBACK_MODELS
+
+TEMPLATE = "You are the Venture Pulse analyst. Brief the {audience} on {venture} in {language}, in at most {sentences} sentences."
+INPUT_VARS = {"audience": "board", "venture": "PortFlow", "sentences": "3"}
+
+def setup_before(manager: LLMManager):
+    """What generate_response built on every call before the caches (reproduced for comparison)."""
+    primary = manager.llm_proxy.with_config(config={"configurable": {"model_provider": "openai", "model": "gpt-5.2"}})
+    fallbacks = [manager.llm_proxy.with_config(config={"configurable": {"model_provider": p, "model": m}})
+                 for p, m in FALLBACK_MODELS]
+    runnable = primary.with_fallbacks(fallbacks)
+    template = PromptTemplate(input_variables=list(INPUT_VARS), template=TEMPLATE.replace("{language}", "English"))
+    return runnable, template.format(**INPUT_VARS)
+
+def setup_after(manager: LLMManager):
+    runnable = manager._get_runnable("openai", "gpt-5.2")
+    template = manager._get_template("bench", TEMPLATE, "English", tuple(INPUT_VARS))
+    return runnable, template.format(**INPUT_VARS)
+
+def main(args):
+    manager = LLMManager()
+    assert setup_before(manager)[1] == setup_after(manager)[1]
+
+    rows = []
+    for label, setup in (("rebuilt per call (before)", setup_before), ("cached (after)", setup_after)):
+        best = min(timeit.repeat(lambda: setup(manager), number=args.calls, repeat=5)) / args.calls
+        rows.append([label, args.calls, best * 1e6])
+    print_table("generate_response setup before the model call (best of 5)",
+                ["runnables and template", "calls", "us per call"], rows)
+    print(f"\nsaved per call: {rows[0][2] - rows[1][2]:.1f} us ({rows[0][2] / rows[1][2]:.0f}x)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5000, help="calls per timing repeat")
+    main(parser.parse_args())
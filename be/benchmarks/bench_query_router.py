@@ -0,0 +1,96 @@
+"""
+p50/p95 latency of a chat turn on a labeled query set, with the query router on and off.
+
+    python -m benchmarks.bench_query_router [--llm-ms 400] [--repeat 3] [--ventures 200]
+
+Each question is labeled with the tool the fast path should call, or None when it
+has to go to the agent. The script reports routing accuracy against those labels,
+the router's own parse time, and end-to-end agent_chatting latency, where the stub
+LLM costs --llm-ms per model round-trip.
+"""
+import argparse
+import asyncio
+import time
+from sqlmodel import Session
+from benchmarks.harness import StubLLM, new_session_id, percentiles, print_table, seed_ventures
+from config.config import settings
+from controllers import chatting
+from controllers.query_router import known_pods, route_query
+from helpers.redis_utils import areset_user_session
+from models.db import engine
+
+LABELED_QUERIES = [
+    ("top 3 by NPS", "get_ventures_by_metrics"),
+    ("which venture has the highest burn", "get_ventures_by_metrics"),
+    ("lowest runway ventures", "get_ventures_by_metrics"),
+    ("top 5 fintech ventures by nps", "get_ventures_by_metrics"),
+    ("fintech ventures with highest nps in growth stage", "get_ventures_by_metrics"),
+    ("ventures with runway under 6 months", "get_ventures_by_metrics"),
+    ("which ventures burn more than 100k", "get_ventures_by_metrics"),
+    ("ventures with nps between 40 and 70", "get_ventures_by_metrics"),
+    ("show critical ventures in FinTech", "search_ventures"),
+    ("list at risk ventures", "search_ventures"),
+    ("show me ventures in the pilot stage", "search_ventures"),
+    ("which ventures are in healthtech", "search_ventures"),
+    ("ventures that are not at risk", None),
+    ("runway under 6 months and nps above 50", None),
+    ("show me 3 critical fintech ventures", None),
+    ("is Bench Venture 00001 on track", None),
+    ("why is the cleantech pod burning so much", None),
+    ("compare the top two fintech ventures", None),
+    ("summarize the portfolio for the board", None),
+    ("what should we do about the critical ventures", None),
+]
+
+def routing_accuracy(pods):
+    hits, parse_times = 0, []
+    for question, expected in LABELED_QUERIES:
+        start = time.perf_counter()
+        routed = route_query(question, pods)
+        parse_times.append(time.perf_counter() - start)
+        hits += (routed.tool if routed else None) == expected
+    return hits, parse_times
+
+async def run_turns(router_enabled: bool, repeat: int):
+    settings.QUERY_ROUTER_ENABLED = router_enabled
+    samples = {"fast path": [], "agent": []}
+    with Session(engine) as session:
+        for _ in range(repeat):
+            for question, expected in LABELED_QUERIES:
+                session_id = new_session_id()
+                start = time.perf_counter()
+                await chatting.agent_chatting(session_id, question, session)
+                samples["fast path" if expected else "agent"].append(time.perf_counter() - start)
+                await areset_user_session(session_id)
+    return samples
+
+async def main(args):
+    seed_ventures(engine, args.ventures)
+    chatting.LLM_WITH_TOOLS = StubLLM(args.llm_ms / 1000)
+    settings.RESPONSE_CACHE_ENABLED = False # every turn must do the work it is measuring
+
+    with Session(engine) as session:
+        pods = known_pods(session)
+    hits, parse_times = routing_accuracy(pods)
+    parse = percentiles(parse_times)
+    print(f"routing accuracy: {hits}/{len(LABELED_QUERIES)} labeled questions; "
+          f"route_query p50 {parse['p50']:.3f} ms, p95 {parse['p95']:.3f} ms")
+
+    rows = []
+    for enabled in (False, True):
+        samples = await run_turns(enabled, args.repeat)
+        for label in ("fast path", "agent"):
+            stats = percentiles(samples[label])
+            rows.append(["on" if enabled else "off", label, len(samples[label]), stats["p50"], stats["p95"], stats["mean"]])
+        overall = percentiles(samples["fast path"] + samples["agent"])
+        rows.append(["on" if enabled else "off", "all", sum(map(len, samples.values())),
+                     overall["p50"], overall["p95"], overall["mean"]])
+    print_table(f"agent_chatting latency (stub LLM {args.llm_ms:g} ms per call)",
+                ["router", "questions labeled", "turns", "p50 ms", "p95 ms", "mean ms"], rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-ms", type=float, default=400, help="stub latency per model call")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the labeled set per mode")
+    parser.add_argument("--ventures", type=int, default=200, help="synthetic ventures to seed")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,89 @@
+"""
+Per-turn session I/O at 10, 100 and 1000 stored messages: the old single JSON blob
+(read, parse and rewrite everything) against the state hash + message list
+(read the trailing window, append this turn's messages).
+
+    python -m benchmarks.bench_session_store [--sizes 10 100 1000] [--turns 30]
+
+A turn is what agent_chatting does around the model: load the session, rebuild the
+LangChain messages it will use, save the state and the turn's two new messages.
+"""
+import argparse
+import asyncio
+import json
+import time
+from langchain_core.messages import AIMessage, HumanMessage, messages_from_dict, messages_to_dict
+from benchmarks.harness import new_session_id, percentiles, print_table
+from config.constants import CHAT_HISTORY_LIVE_WINDOW
+from helpers.json_utils import json_serial
+from helpers.redis_utils import (
+    async_redis_client, aget_user_session, asave_user_session, areset_user_session, SESSION_TTL_SECONDS,
+)
+
+STATE = {
+    "summary": "The user is reviewing FinTech ventures with short runway ahead of the board meeting.",
+    "active_filters": {"pod": "FinTech", "metric_type": "runway_months", "operator": "lt", "value": 6},
+    "focused_ventures": [str(i) for i in range(10)],
+    "data_version": 42,
+}
+
+def turn_messages(i: int) -> list:
+    return messages_to_dict([
+        HumanMessage(content=f"Question {i}: which FinTech ventures have less than six months of runway?"),
+        AIMessage(content=f"Answer {i}: " + "PortFlow and LogiChain are at a CRITICAL runway stage. " * 6),
+    ])
+
+# --- Old layout, reproduced for comparison: the whole session as one JSON string ---
+
+async def blob_seed(session_id: str, count: int):
+    messages = [m for i in range(count // 2) for m in turn_messages(i)]
+    await async_redis_client.setex(session_id, SESSION_TTL_SECONDS,
+                                   json.dumps({**STATE, "messages": messages}, default=json_serial))
+
+async def blob_turn(session_id: str, i: int):
+    raw = await async_redis_client.get(session_id)
+    session = json.loads(raw) if raw else {}
+    history = messages_from_dict(session.get("messages", []))
+    history.extend(messages_from_dict(turn_messages(i)))
+    session.update(STATE)
+    session["messages"] = messages_to_dict(history)
+    await async_redis_client.setex(session_id, SESSION_TTL_SECONDS,
+                                   json.dumps(session, default=json_serial, ensure_ascii=False))
+
+# --- Current layout ---
+
+async def hash_seed(session_id: str, count: int):
+    await asave_user_session(session_id, STATE, new_messages=[m for i in range(count // 2) for m in turn_messages(i)])
+
+async def hash_turn(session_id: str, i: int):
+    session = await aget_user_session(session_id, message_window=CHAT_HISTORY_LIVE_WINDOW * 2)
+    history = messages_from_dict(session.get("messages", []))
+    stored_count = len(history)
+    history.extend(messages_from_dict(turn_messages(i)))
+    await asave_user_session(session_id, STATE, new_messages=messages_to_dict(history[stored_count:]))
+
+async def measure(seed, turn, size: int, turns: int):
+    session_id = new_session_id()
+    await seed(session_id, size)
+    samples = []
+    for i in range(turns):
+        start = time.perf_counter()
+        await turn(session_id, size + i)
+        samples.append(time.perf_counter() - start)
+    await areset_user_session(session_id)
+    return percentiles(samples)
+
+async def main(args):
+    rows = []
+    for size in args.sizes:
+        blob = await measure(blob_seed, blob_turn, size, args.turns)
+        current = await measure(hash_seed, hash_turn, size, args.turns)
+        rows.append([size, blob["p50"], blob["p95"], current["p50"], current["p95"]])
+    print_table(f"session load + save per turn ({args.turns} turns per size)",
+                ["stored messages", "blob p50 ms", "blob p95 ms", "hash+list p50 ms", "hash+list p95 ms"], rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="stored messages per session")
+    parser.add_argument("--turns", type=int, default=30, help="turns measured per size and layout")
+    asyncio.run(main(parser.parse_args()))
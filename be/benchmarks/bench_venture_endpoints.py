@@ -0,0 +1,108 @@
+"""
+GET /api/v1/ventures/filter under concurrency: the asyncpg handler against the sync
+path it replaced (Session.exec inside the async handler, blocking the event loop).
+
+    python -m benchmarks.bench_venture_endpoints [--concurrency 100 200] [--rounds 5] [--ventures 2000]
+
+Both handlers run the same statement in one in-process app, driven through httpx's
+ASGI transport, so the difference is only in how the query waits on Postgres.
+Latency is measured from the start of each burst (all requests arrive together);
+loop lag is the worst delay seen by a 10 ms ticker running alongside, i.e. how long
+any other request on the worker would have been stalled.
+"""
+import argparse
+import asyncio
+import time
+from typing import Optional
+import httpx
+from fastapi import FastAPI, Query
+from sqlmodel import Session, select
+from sqlalchemy.orm import selectinload
+from api.venture_api import venture_api
+from benchmarks.harness import percentiles, print_table, seed_ventures
+from models import Venture
+from models.db import engine, read_engine, pool_stats
+from schemas import VenturePulseResponse
+
+# Narrow filters (a few dozen rows each), so the query rather than response encoding dominates
+FILTER_QUERIES = [
+    "pod=FinTech&stage=Pilot&health=Critical&min_runway=6",
+    "pod=HealthTech&stage=Growth&health=At%20Risk&max_burn=80000",
+    "pod=CleanTech&stage=Scale&health=On%20Track",
+    "pod=Infrastructure&stage=Discovery&health=Critical&min_runway=3",
+]
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    venture_api(app)
+
+    @app.get("/legacy/ventures/filter")
+    async def legacy_filter_ventures(pod: Optional[str] = Query(None), stage: Optional[str] = Query(None),
+                                     health: Optional[str] = Query(None), min_runway: Optional[int] = Query(None),
+                                     max_burn: Optional[float] = Query(None)):
+        # The pre-asyncpg handler: a sync Session queried straight from the coroutine
+        with Session(read_engine) as session:
+            statement = select(Venture).options(selectinload(Venture.pilot_customers))
+            if pod:
+                statement = statement.where(Venture.pod == pod)
+            if stage:
+                statement = statement.where(Venture.stage == stage)
+            if health:
+                statement = statement.where(Venture.health == health)
+            if min_runway is not None:
+                statement = statement.where(Venture.runway_months >= min_runway)
+            if max_burn is not None:
+                statement = statement.where(Venture.burn_rate_monthly <= max_burn)
+            return [VenturePulseResponse.model_validate(v) for v in session.exec(statement).all()]
+
+    return app
+
+async def run_load(client: httpx.AsyncClient, path: str, concurrency: int, rounds: int):
+    latencies, lag = [], [0.0]
+    running = True
+
+    async def ticker():
+        while running:
+            expected = time.perf_counter() + 0.01
+            await asyncio.sleep(0.01)
+            lag[0] = max(lag[0], time.perf_counter() - expected)
+
+    async def one(i: int, burst_start: float):
+        response = await client.get(f"{path}?{FILTER_QUERIES[i % len(FILTER_QUERIES)]}")
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - burst_start)
+
+    monitor = asyncio.ensure_future(ticker())
+    started = time.perf_counter()
+    for _ in range(rounds):
+        burst_start = time.perf_counter()
+        await asyncio.gather(*(one(i, burst_start) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    running = False
+    await monitor
+    return latencies, elapsed, lag[0]
+
+async def main(args):
+    seed_ventures(engine, args.ventures)
+    transport = httpx.ASGITransport(app=build_app())
+    rows = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, path in (("sync Session (before)", "/legacy/ventures/filter"),
+                            ("asyncpg (after)", "/api/v1/ventures/filter")):
+            await run_load(client, path, 10, 1) # warm both pools and the statement caches
+            for concurrency in args.concurrency:
+                latencies, elapsed, lag = await run_load(client, path, concurrency, args.rounds)
+                stats = percentiles(latencies)
+                rows.append([label, concurrency, len(latencies), len(latencies) / elapsed,
+                             stats["p50"], stats["p95"], lag * 1000])
+    print_table(f"GET /ventures/filter over {args.ventures} ventures",
+                ["handler", "concurrency", "requests", "req/s", "p50 ms", "p95 ms", "max loop lag ms"], rows)
+    async_pool = pool_stats()["async_read"]
+    print(f"\nasync_read pool: size {async_pool['size']}, max checkout wait {async_pool['max_checkout_wait_ms']} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[100, 200])
+    parser.add_argument("--rounds", type=int, default=5, help="bursts of --concurrency requests per level")
+    parser.add_argument("--ventures", type=int, default=2000, help="synthetic ventures to seed")
+    asyncio.run(main(parser.parse_args()))
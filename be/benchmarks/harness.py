@@ -0,0 +1,112 @@
+"""
+Shared setup for the benchmark scripts. Run them from be/ against scratch services:
+
+    DATABASE_URL=postgresql://... REDIS_HOST=localhost python -m benchmarks.bench_query_router
+
+DATABASE_URL must point at a database the app has initialized (models.db.init_db);
+it is seeded with synthetic "bench-" ventures, replacing any left by an earlier run.
+Redis is used as configured. The LLM is always a stub, so numbers measure our own
+overhead around a model call of known latency, not a provider.
+"""
+from typing import List, Optional
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+from sqlalchemy import delete
+from sqlmodel import Session
+from langchain_core.messages import AIMessageChunk, ToolMessage, message_chunk_to_message
+from models import Venture, PilotCustomer, VentureMetric, VentureMetricRollup
+
+BENCH_PREFIX = "bench-"
+PODS = ["Infrastructure", "HealthTech", "FinTech", "CleanTech"]
+STAGES = ["Discovery", "Validation", "Pilot", "Growth", "Scale"]
+HEALTH = ["On Track", "At Risk", "Critical"]
+
+def seed_ventures(engine, count: int, pilots_per_venture: int = 2, seed: int = 0) -> List[str]:
+    """Replaces the synthetic ventures with `count` fresh ones; returns their ids."""
+    rng = random.Random(seed)
+    with Session(engine) as session:
+        for model in (PilotCustomer, VentureMetric, VentureMetricRollup):
+            session.exec(delete(model).where(model.venture_id.startswith(BENCH_PREFIX)))
+        session.exec(delete(Venture).where(Venture.id.startswith(BENCH_PREFIX)))
+
+        ids = []
+        for i in range(count):
+            venture_id = f"{BENCH_PREFIX}{i}"
+            ids.append(venture_id)
+            session.add(Venture(
+                id=venture_id, name=f"Bench Venture {i:05d}", pod=rng.choice(PODS), stage=rng.choice(STAGES),
+                health=rng.choice(HEALTH), founder=f"Founder {i}",
+                description="Synthetic venture for benchmarks: logistics, payments and clinical workflows.",
+                last_update_text="Signed a pilot and hired two engineers.",
+                burn_rate_monthly=rng.randrange(10_000, 150_000, 500), runway_months=rng.randrange(2, 30),
+                nps_score=rng.randrange(0, 100), pilot_customers_count=pilots_per_venture,
+            ))
+            for j in range(pilots_per_venture):
+                session.add(PilotCustomer(
+                    id=f"{venture_id}-{j}", name=f"Customer {j}", contract_value=50_000,
+                    start_date=datetime(2024, 1, 1, tzinfo=timezone.utc), venture_id=venture_id,
+                ))
+        session.commit()
+    return ids
+
+class StubLLM:
+    """
+    Stands in for chatting.LLM_WITH_TOOLS. A turn's first call asks for one tool
+    call, the call after the tool result answers. Each call costs `latency` seconds:
+    asyncio.sleep by default, or time.sleep on the event loop with blocking=True,
+    which is what a synchronous SDK call inside a coroutine amounts to.
+    """
+
+    def __init__(self, latency: float, tool: str = "get_ventures_by_metrics", args: Optional[dict] = None,
+                 blocking: bool = False):
+        self.latency = latency
+        self.tool = tool
+        self.args = args if args is not None else {"metric_type": "nps_score", "operator": "sort_desc", "limit": 3}
+        self.blocking = blocking
+        self.calls = 0
+
+    async def _wait(self):
+        self.calls += 1
+        if self.blocking:
+            time.sleep(self.latency)
+        else:
+            await asyncio.sleep(self.latency)
+
+    def _reply(self, messages) -> AIMessageChunk:
+        if messages and isinstance(messages[-1], ToolMessage):
+            return AIMessageChunk(content="Here is the portfolio briefing you asked for.")
+        return AIMessageChunk(content="", tool_call_chunks=[{
+            "name": self.tool, "args": json.dumps(self.args), "id": f"call_{uuid4().hex[:12]}", "index": 0,
+        }])
+
+    async def astream(self, messages):
+        await self._wait()
+        yield self._reply(messages)
+
+    async def ainvoke(self, messages):
+        await self._wait()
+        return message_chunk_to_message(self._reply(messages))
+
+def new_session_id() -> str:
+    return f"{BENCH_PREFIX}{uuid4().hex}"
+
+def percentiles(samples: List[float]) -> dict:
+    """p50 / p95 / mean of samples given in seconds, reported in milliseconds."""
+    if len(samples) < 2:
+        value = samples[0] * 1000 if samples else 0.0
+        return {"p50": value, "p95": value, "mean": value}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": cuts[49] * 1000, "p95": cuts[94] * 1000, "mean": statistics.fmean(samples) * 1000}
+
+def print_table(title: str, headers: List[str], rows: List[list]):
+    cells = [[f"{c:,.2f}" if isinstance(c, float) else str(c) for c in row] for row in rows]
+    widths = [max(len(h), *(len(r[i]) for r in cells)) for i, h in enumerate(headers)]
+    print(f"\n{title}")
+    print("  ".join(h.rjust(w) for h, w in zip(headers, widths)))
+    for row in cells:
+        print("  ".join(c.rjust(w) for c, w in zip(row, widths)))
@@ -30,6 +30,19 @@ class Settings:
     ALGORITHM = get_config("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES = int(get_config("ACCESS_TOKEN_EXPIRE_MINUTES", 60000)) # 1 hour
     REFRESH_TOKEN_EXPIRE_DAYS = int(get_config("REFRESH_TOKEN_EXPIRE_DAYS", 14))
+    # Where refresh tokens live: "db" (refresh_token table) or "redis" (TTL'd hashes, no Postgres writes)
+    REFRESH_TOKEN_STORE = get_config("REFRESH_TOKEN_STORE", "db").lower()
+    # bcrypt cost factor; hashes with a different cost are upgraded on the next successful login
+    BCRYPT_ROUNDS = int(get_config("BCRYPT_ROUNDS", 12))
+    PASSWORD_HASH_WORKERS = int(get_config("PASSWORD_HASH_WORKERS", 4)) # concurrent bcrypt calls per worker
+    # Login attempt limiter (Redis, fixed window)
+    LOGIN_ATTEMPT_WINDOW_SECONDS = int(get_config("LOGIN_ATTEMPT_WINDOW_SECONDS", 300))
+    LOGIN_MAX_ATTEMPTS_PER_ACCOUNT = int(get_config("LOGIN_MAX_ATTEMPTS_PER_ACCOUNT", 10))
+    # Per-IP limit, off (0) by default: behind a reverse proxy every client shares the proxy's
+    # address, so only enable it together with TRUSTED_PROXY_HOPS there
+    LOGIN_MAX_ATTEMPTS_PER_IP = int(get_config("LOGIN_MAX_ATTEMPTS_PER_IP", 0))
+    # Proxies in front of the app that append to X-Forwarded-For; 0 = clients connect directly
+    TRUSTED_PROXY_HOPS = int(get_config("TRUSTED_PROXY_HOPS", 0))
 
     # General
     ENV = get_config("ENV", "development")
@@ -37,6 +50,26 @@ class Settings:
 
     # LLMs
     OPENAI_API_KEY = get_config("OPENAI_API_KEY")
+    # Provider routing: per-attempt deadline, circuit breaker and optional hedging
+    LLM_ATTEMPT_TIMEOUT_SECONDS = float(get_config("LLM_ATTEMPT_TIMEOUT_SECONDS", 30)) # for streams: first/next chunk
+    LLM_CIRCUIT_ERROR_RATE = float(get_config("LLM_CIRCUIT_ERROR_RATE", 0.5))
+    LLM_CIRCUIT_MIN_CALLS = int(get_config("LLM_CIRCUIT_MIN_CALLS", 5))
+    LLM_CIRCUIT_COOLDOWN_SECONDS = float(get_config("LLM_CIRCUIT_COOLDOWN_SECONDS", 30))
+    LLM_HEDGE_ENABLED = get_config("LLM_HEDGE_ENABLED", "false").lower() == "true"
+    LLM_HEDGE_MIN_DELAY_SECONDS = float(get_config("LLM_HEDGE_MIN_DELAY_SECONDS", 2))
+    # Sync calls in flight per provider/model per worker, counting timed-out calls still running
+    LLM_MAX_IN_FLIGHT_PER_PROVIDER = int(get_config("LLM_MAX_IN_FLIGHT_PER_PROVIDER", 32))
+    # Local CPU embedding model for semantic venture search (e.g. "sentence-transformers/all-MiniLM-L6-v2").
+    # Unset -> a dependency-free hashing embedder is used instead.
+    SEMANTIC_SEARCH_MODEL = get_config("SEMANTIC_SEARCH_MODEL")
+    # Answer simple lookups ("top 3 by NPS", "critical ventures in FinTech") without the agent loop
+    QUERY_ROUTER_ENABLED = get_config("QUERY_ROUTER_ENABLED", "true").lower() == "true"
+    # Cache of final agent answers, keyed by normalized question + active filters + data version
+    RESPONSE_CACHE_ENABLED = get_config("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_TTL_SECONDS = int(get_config("RESPONSE_CACHE_TTL_SECONDS", 900))
+    # Cosine similarity for near-duplicate questions; 0 restricts the cache to exact matches.
+    # Off by default unless a real embedding model is configured: the hashing fallback is bag-of-words.
+    RESPONSE_CACHE_SIMILARITY = float(get_config("RESPONSE_CACHE_SIMILARITY", 0.92 if SEMANTIC_SEARCH_MODEL else 0))
     
     # Redis
     REDIS_HOST = get_config("REDIS_HOST", "redis")
@@ -47,6 +80,20 @@ class Settings:
     DB_USER = get_config("DB_USER", "postgres")
     DB_PASSWORD = get_config("DB_PASS", "postgres123")
     DB_NAME = get_config("DB_NAME", "venture_pulse")
+    # Optional read replica for the read-only venture/stats endpoints (falls back to the primary)
+    DATABASE_READ_URL = get_config("DATABASE_READ_URL")
+    # Connection pools (per engine, per worker). Each worker opens at most, per database server:
+    #   sync (DB_POOL_SIZE + DB_MAX_OVERFLOW) + asyncpg (DB_ASYNC_POOL_SIZE + DB_ASYNC_MAX_OVERFLOW)
+    # = 30 + 10 = 40 with the defaults, on the primary and (if configured) again on the replica.
+    # Keep workers * 40 under Postgres max_connections (100 by default) minus admin/migration headroom.
+    DB_POOL_SIZE = int(get_config("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(get_config("DB_MAX_OVERFLOW", 20))
+    # asyncpg pools (read endpoints, and cache fills on the primary when a replica is configured)
+    DB_ASYNC_POOL_SIZE = int(get_config("DB_ASYNC_POOL_SIZE", 5))
+    DB_ASYNC_MAX_OVERFLOW = int(get_config("DB_ASYNC_MAX_OVERFLOW", 5))
+    DB_POOL_TIMEOUT = int(get_config("DB_POOL_TIMEOUT", 10)) # seconds to wait for a free connection
+    DB_POOL_RECYCLE = int(get_config("DB_POOL_RECYCLE", 1800)) # seconds before a connection is replaced
+    DB_POOL_PRE_PING = get_config("DB_POOL_PRE_PING", "true").lower() == "true"
 
 settings = Settings()
 
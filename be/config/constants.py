@@ -13,6 +13,9 @@ ASR_MODEL = "whisper-1"
 
 CHAT_HISTORY_SUMMARIZATION_MODEL_PROVIDER = "openai"
 CHAT_HISTORY_SUMMARIZATION_MODEL = "gpt-5-nano"
+# Messages sent to the model per turn, and the stored history length that triggers compaction
+CHAT_HISTORY_LIVE_WINDOW = 8
+CHAT_HISTORY_COMPACTION_THRESHOLD = 20
 
 # Supported LLMs dict
 LLM_MODELS = {
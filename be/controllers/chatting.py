@@ -1,37 +1,54 @@
 
 from services.llm_client import llm
 from services.agent_tools import tools
-from helpers.redis_utils import get_user_session, save_user_session
+from services.provider_router import ProviderRouter, Candidate
+from helpers.redis_utils import aget_user_session, asave_user_session
 import json
+import asyncio
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
 from langchain_core.messages import (
     HumanMessage, 
     SystemMessage, 
     ToolMessage, 
     AIMessage, 
+    message_chunk_to_message,
     messages_from_dict, 
     messages_to_dict
 )
 from services.prompts import PROMPTS
 from controllers.venture_filtering import get_ventures_by_metrics, search_ventures
+from controllers.venture_search import search_venture_text
 from helpers.logging import setup_logger
 from helpers.json_utils import json_serial
+from models.db import read_engine
+from controllers.history_compaction import schedule_compaction
+from controllers.venture_cache import get_venture_payloads, get_data_version, aget_data_version
+from controllers import response_cache
+from controllers.query_router import route_message, run_routed_query, briefing, known_pods
+from config.constants import CHAT_HISTORY_LIVE_WINDOW
+from config.config import settings
+from uuid import uuid4
 
 logger = setup_logger("chatting.py")
 
 tool_map = {
     "search_ventures": search_ventures,
     "get_ventures_by_metrics": get_ventures_by_metrics,
+    "search_venture_text": search_venture_text,
 }
 
-# Model Setup with Fallbacks
-primary_llm = llm.llm_proxy.with_config(config={
-    "configurable": {"model_provider": "openai", "model": "gpt-5.2"}
-})
+# Model Setup with Fallbacks: unhealthy providers are skipped instead of waited out
+TOOL_MODELS = [
+    ("openai", "gpt-5.2"),
+    ("anthropic", "claude-3-5-sonnet-20240620"),
+]
 
-LLM_WITH_TOOLS = primary_llm.bind_tools(tools).with_fallbacks([
-    llm.llm_proxy.with_config(config={
-        "configurable": {"model_provider": "anthropic", "model": "claude-3-5-sonnet-20240620"}
-    }).bind_tools(tools)
+LLM_WITH_TOOLS = ProviderRouter([
+    Candidate(provider, model, llm.llm_proxy.with_config(config={
+        "configurable": {"model_provider": provider, "model": model}
+    }).bind_tools(tools))
+    for provider, model in TOOL_MODELS
 ])
 
 def get_active_context(chat_summary, history, session_state, sys_content):
@@ -77,40 +94,179 @@ def get_active_context(chat_summary, history, session_state, sys_content):
 """
 
     # --- STEP 3: TRIM ---
-    final_history = validated_history[-8:]
+    final_history = validated_history[-CHAT_HISTORY_LIVE_WINDOW:]
     # Final check: Ensure we don't start with a ToolMessage
     while final_history and isinstance(final_history[0], ToolMessage):
         final_history.pop(0)
 
     return [SystemMessage(content=combined_instructions)] + final_history
 
-def agent_chatting(session_id, msg, session):    
+def _run_tool_in_own_session(handler, state, payload):
+    """Runs a tool handler on a dedicated pooled connection so sibling tool calls don't share a Session."""
+    # Tools only read, so they can be served by the replica when one is configured
+    with Session(read_engine) as db:
+        return handler(state=state, payload=payload, db=db)
+
+async def run_tool_calls(tool_calls, session_state, session):
+    """
+    Executes the tool calls of one agent turn and returns their outputs in the
+    original tool_calls order. A lone call reuses the request session; several
+    calls are dispatched concurrently, each on its own session from the pool.
+    Unknown tools map to None.
+    """
+    if len(tool_calls) == 1:
+        handler = tool_map.get(tool_calls[0]["name"])
+        if not handler:
+            return [None]
+        # Tool handlers run blocking SQLModel queries; keep them off the event loop
+        return [await run_in_threadpool(
+            handler, state=session_state, payload=tool_calls[0]["args"], db=session)]
+
+    async def _dispatch(tool_call):
+        handler = tool_map.get(tool_call["name"])
+        if not handler:
+            return None
+        return await run_in_threadpool(
+            _run_tool_in_own_session, handler, session_state, tool_call["args"])
+
+    return await asyncio.gather(*(_dispatch(tc) for tc in tool_calls))
+
+def _chunk_text(chunk):
+    """Extracts the printable text from a streamed AIMessageChunk (str or content blocks)."""
+    content = chunk.content
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") for block in content
+        if isinstance(block, dict) and block.get("type") == "text"
+    )
+
+def _cacheable_state(session_state):
+    """Session state a cached answer leaves behind (data_version is re-read on every hit)."""
+    return {key: session_state.get(key) for key in ("active_filters", "focused_ventures", "last_analysis_metrics")}
+
+async def agent_chatting_events(session_id, msg, session):
+    """
+    Runs the agent loop as an async generator of UI events:
+      - tool_call: the model asked for a tool (name + args)
+      - ventures:  a tool handler returned; carries the focused ventures right away
+      - token:     a piece of the final answer as the model streams it
+      - final:     the same payload agent_chatting returns
+    """
     # 1. Load Session & Initialize History
-    session_data = get_user_session(session_id=session_id) or {}
+    # Only the trailing window is read; the slack lets get_active_context drop a broken tool sequence
+    session_data = await aget_user_session(
+        session_id=session_id, message_window=CHAT_HISTORY_LIVE_WINDOW * 2) or {}
     chat_summary = session_data.get("summary", "")
     
     # Robust history loading
     raw_history = session_data.get("messages", [])
     history = messages_from_dict(raw_history) if raw_history else []
+    stored_count = len(history) # everything past this index is new this turn
     
     # 2. Maintain Venture-Specific State
     session_state = {
         "active_filters": session_data.get("active_filters", {}),
         "focused_ventures": session_data.get("focused_ventures", []),
         "last_analysis_metrics": session_data.get("last_analysis_metrics", {}),
-        "focused_ventures_data": session_data.get("focused_ventures_data", [])
+        "data_version": session_data.get("data_version", 0),
     }
+    # Full venture rows produced this turn; never persisted, sessions keep IDs only
+    turn_ventures_data = None
 
     # Add the new user message
     history.append(HumanMessage(content=msg))
     sys_content = PROMPTS.get("venture_analyst")["content"]
 
+    # Answer cache: the same question under the same filters and data version gets the same answer
+    cache_key, pods = None, ()
+    if response_cache.is_cacheable(msg):
+        cache_key = (msg, dict(session_state["active_filters"]), await aget_data_version())
+        pods = await run_in_threadpool(known_pods, session) # near matches must name the same pods
+        cached = await response_cache.alookup(*cache_key, pods=pods)
+        if cached:
+            session_state.update(cached["state"])
+            session_state["data_version"] = cache_key[2]
+            ventures = await run_in_threadpool(get_venture_payloads, cached["ventures_ids"], session)
+            yield {"event": "ventures", "data": {
+                "tool": "response_cache",
+                "ventures_ids": cached["ventures_ids"],
+                "ventures": ventures,
+            }}
+            yield {"event": "token", "data": cached["answer"]}
+
+            history.append(AIMessage(content=cached["answer"]))
+            message_count = await asave_user_session(
+                session_id, session_state, new_messages=messages_to_dict(history[stored_count:]))
+            schedule_compaction(session_id, message_count)
+
+            yield {"event": "final", "data": {
+                "answer": cached["answer"],
+                "data": {
+                    "ventures_ids": cached["ventures_ids"],
+                    "ventures": ventures,
+                    "data_version": cache_key[2],
+                }
+            }}
+            return
+
+    # Fast path: confidently parsed lookups run the tool directly and get a templated briefing
+    routed = await run_in_threadpool(route_message, msg, session) if settings.QUERY_ROUTER_ENABLED else None
+    if routed:
+        logger.info(f"Fast path: {routed.tool} {routed.payload} ({routed.confidence:.2f})")
+        yield {"event": "tool_call", "data": {"name": routed.tool, "args": routed.payload}}
+
+        tool_output = await run_in_threadpool(run_routed_query, routed, session_state, session)
+        session_state.update(tool_output.get("state_update", {}))
+        session_state["data_version"] = await run_in_threadpool(get_data_version)
+        ventures = tool_output.get("data", [])
+        yield {"event": "ventures", "data": {
+            "tool": routed.tool,
+            "ventures_ids": session_state.get("focused_ventures", []),
+            "ventures": ventures,
+        }}
+
+        answer = briefing(routed, ventures)
+        yield {"event": "token", "data": answer}
+
+        # Recorded as a regular tool round-trip so follow-ups through the agent see the same context
+        tool_call_id = f"router_{uuid4().hex[:12]}"
+        history.extend([
+            AIMessage(content="", tool_calls=[{"name": routed.tool, "args": routed.payload, "id": tool_call_id}]),
+            ToolMessage(tool_call_id=tool_call_id, content=tool_output.get("llm_content") or json.dumps(ventures, default=json_serial)),
+            AIMessage(content=answer),
+        ])
+        message_count = await asave_user_session(
+            session_id, session_state, new_messages=messages_to_dict(history[stored_count:]))
+        schedule_compaction(session_id, message_count)
+        if cache_key:
+            await response_cache.astore(*cache_key, answer, session_state.get("focused_ventures", []),
+                                        _cacheable_state(session_state), pods=pods)
+
+        yield {"event": "final", "data": {
+            "answer": answer,
+            "data": {
+                "ventures_ids": session_state.get("focused_ventures", []),
+                "ventures": ventures,
+                "data_version": session_state.get("data_version", 0),
+            }
+        }}
+        return
+
     # 3. Execution Loop (Limit to 5 turns to prevent infinite loops)
     for i in range(5):  
         active_messages = get_active_context(chat_summary, history, session_state, sys_content)
         
         try:
-            response = LLM_WITH_TOOLS.invoke(active_messages)
+            # Stream the turn: text chunks go straight to the client, while the
+            # chunks are merged so tool_calls are available once the turn ends.
+            gathered = None
+            async for chunk in LLM_WITH_TOOLS.astream(active_messages):
+                gathered = chunk if gathered is None else gathered + chunk
+                text = _chunk_text(chunk)
+                if text:
+                    yield {"event": "token", "data": text}
+            response = message_chunk_to_message(gathered) if gathered is not None else AIMessage(content="")
         except Exception as e:
             # CRITICAL FIX: If the history is corrupted (orphaned tool calls), 
             # pop the last message to unblock the session for the next attempt.
@@ -123,48 +279,67 @@ def agent_chatting(session_id, msg, session):
 
         # CASE A: Final Answer (No tools called)
         if not response.tool_calls:
-            final_ventures = session_state.get("focused_ventures_data", [])
             final_ids = session_state.get("focused_ventures", [])
+            if turn_ventures_data is not None:
+                final_ventures = turn_ventures_data
+            else:
+                # Follow-up without a tool call: hydrate the focused IDs from the shared cache
+                final_ventures = await run_in_threadpool(get_venture_payloads, final_ids, session)
 
-            # Save clean history and state to Redis
-            save_data = {
-                **session_state,
-                "summary": chat_summary,
-                "messages": messages_to_dict(history)
-            }
-            save_user_session(session_id, save_data)
+            # Save state and append only this turn's messages; the summary is owned by compaction
+            message_count = await asave_user_session(
+                session_id, session_state, new_messages=messages_to_dict(history[stored_count:]))
+            # Older turns are folded into the summary off the request path
+            schedule_compaction(session_id, message_count)
+            if cache_key and response.content:
+                await response_cache.astore(*cache_key, response.content, final_ids,
+                                            _cacheable_state(session_state), pods=pods)
 
-            return {
+            yield {"event": "final", "data": {
                 "answer": response.content,
                 "data": {
                     "ventures_ids": final_ids,
                     "ventures": final_ventures, 
+                    "data_version": session_state.get("data_version", 0),
                 }
-            }
+            }}
+            return
 
         # CASE B: Tool Handling (Tools were called)
         for tool_call in response.tool_calls:
-            handler = tool_map.get(tool_call["name"])
+            yield {"event": "tool_call", "data": {"name": tool_call["name"], "args": tool_call["args"]}}
+
+        tool_outputs = await run_tool_calls(response.tool_calls, session_state, session)
+        session_state["data_version"] = await run_in_threadpool(get_data_version)
+
+        # Apply results in tool_call order so state updates and ToolMessages stay deterministic
+        for tool_call, tool_output in zip(response.tool_calls, tool_outputs):
             result = "No data found." # Default fallback string
-            
-            if handler:
-                tool_output = handler(state=session_state, payload=tool_call["args"], db=session)
-                
-                if isinstance(tool_output, dict):
-                    # Update local state with tool results
-                    if "state_update" in tool_output:
-                        session_state.update(tool_output["state_update"])
-                    
-                    session_state["focused_ventures_data"] = tool_output.get("data", [])
-                    result = tool_output.get("data")
-                
-                # IMPORTANT: Append ToolMessage immediately after the AI's tool_call
-                history.append(
-                    ToolMessage(
-                        tool_call_id=tool_call["id"], 
-                        content=json.dumps(result, default=json_serial)
-                    )
-                )       
+            content = None
+
+            if isinstance(tool_output, dict):
+                # Update local state with tool results
+                if "state_update" in tool_output:
+                    session_state.update(tool_output["state_update"])
+
+                turn_ventures_data = tool_output.get("data", [])
+                result = tool_output.get("data")
+                # Tools hand back their own compact, pre-serialized payload for the model
+                content = tool_output.get("llm_content")
+
+                yield {"event": "ventures", "data": {
+                    "tool": tool_call["name"],
+                    "ventures_ids": session_state.get("focused_ventures", []),
+                    "ventures": turn_ventures_data,
+                }}
+
+            # IMPORTANT: Append ToolMessage immediately after the AI's tool_call
+            history.append(
+                ToolMessage(
+                    tool_call_id=tool_call["id"], 
+                    content=content if content is not None else json.dumps(result, default=json_serial)
+                )
+            )       
 
     # 4. Final Safety Guard
     # If the loop finishes without returning, the last message might be an AIMessage 
@@ -172,7 +347,15 @@ def agent_chatting(session_id, msg, session):
     if history and hasattr(history[-1], 'tool_calls') and history[-1].tool_calls:
         history.pop()
 
-    return {
+    yield {"event": "final", "data": {
         "answer": "I've hit my reasoning limit for this specific request. Could you try rephrasing?", 
         "error": "LOOP_LIMIT"
-    }
+    }}
+
+async def agent_chatting(session_id, msg, session):
+    """Non-streaming entry point: drains the event stream and returns the final payload."""
+    final = None
+    async for event in agent_chatting_events(session_id=session_id, msg=msg, session=session):
+        if event["event"] == "final":
+            final = event["data"]
+    return final
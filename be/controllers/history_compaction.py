@@ -0,0 +1,57 @@
+import asyncio
+import json
+from langchain_core.messages import HumanMessage, messages_from_dict
+from services.llm_client import llm
+from helpers.redis_utils import async_redis_client, acompact_user_session, aget_session_messages, aget_session_summary
+from helpers.logging import setup_logger
+from config.constants import CHAT_HISTORY_LIVE_WINDOW, CHAT_HISTORY_COMPACTION_THRESHOLD
+
+logger = setup_logger("history_compaction.py")
+
+COMPACTION_LOCK_TTL = 120 # seconds; guards against two workers summarizing the same session
+_background_tasks = set()
+
+def archive_boundary(history, live_window: int = CHAT_HISTORY_LIVE_WINDOW):
+    """
+    Index splitting history into (archive, live). The live part starts on a
+    HumanMessage so no tool-call sequence is cut in half, and keeps at least
+    live_window messages. Returns 0 when nothing can be archived.
+    """
+    for i in range(len(history) - live_window, 0, -1):
+        if isinstance(history[i], HumanMessage):
+            return i
+    return 0
+
+async def compact_session_history(session_id: str):
+    """Folds the archivable prefix of a session into its summary and drops it from Redis."""
+    lock_key = f"{session_id}:compacting"
+    if not await async_redis_client.set(lock_key, 1, nx=True, ex=COMPACTION_LOCK_TTL):
+        return
+
+    try:
+        # Read under the lock: the summary a turn loaded may predate another compaction
+        chat_summary = await aget_session_summary(session_id)
+        raw_messages = await aget_session_messages(session_id)
+        history = messages_from_dict([json.loads(m) for m in raw_messages])
+        boundary = archive_boundary(history)
+        if not boundary:
+            return
+
+        new_summary = await llm.asummarize_conversation(chat_summary, history[:boundary])
+        compacted = await acompact_user_session(session_id, raw_messages[:boundary], new_summary, chat_summary)
+        if compacted:
+            logger.info(f"Compacted {boundary} messages of session {session_id} into its summary")
+    except Exception as e:
+        logger.error(f"History compaction failed for {session_id}: {e}")
+    finally:
+        await async_redis_client.delete(lock_key)
+
+def schedule_compaction(session_id: str, message_count: int):
+    """Kicks off compaction in the background once stored history passes the threshold."""
+    if message_count <= CHAT_HISTORY_COMPACTION_THRESHOLD:
+        return
+
+    task = asyncio.create_task(compact_session_history(session_id))
+    # Keep a strong reference until done; bare create_task results can be garbage collected
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
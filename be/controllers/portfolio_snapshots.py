@@ -0,0 +1,137 @@
+from typing import List, Optional
+import asyncio
+from datetime import date, datetime, timezone
+from sqlmodel import Session, select, func, desc
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
+from starlette.concurrency import run_in_threadpool
+from models import Venture, PortfolioSnapshot
+from models.db import engine
+from controllers.venture_cache import get_data_version, aget_data_version
+from helpers.logging import setup_logger
+
+logger = setup_logger("portfolio_snapshots.py")
+
+SNAPSHOT_INTERVAL_SECONDS = 3600
+TREND_PERIODS = 6 # months shown in the burn sparkline
+CHART_SIZE = 10
+
+_scheduler_task: Optional[asyncio.Task] = None
+
+def current_period(now: Optional[datetime] = None) -> date:
+    now = now or datetime.now(timezone.utc)
+    return date(now.year, now.month, 1)
+
+def take_portfolio_snapshot(db: Session, period: Optional[date] = None) -> PortfolioSnapshot:
+    """Recomputes the portfolio aggregates and upserts them as the row for `period` (default: this month)."""
+    period = period or current_period()
+    version = get_data_version()
+
+    stats = db.exec(select(
+        func.sum(Venture.burn_rate_monthly).label("total_burn"),
+        func.avg(Venture.runway_months).label("avg_runway"),
+        func.avg(Venture.nps_score).label("avg_nps"),
+        func.sum(Venture.pilot_customers_count).label("total_pilots"),
+        func.count(Venture.id).label("venture_count")
+    )).one()
+
+    chart_rows = db.exec(
+        select(Venture.name, Venture.burn_rate_monthly, Venture.runway_months, Venture.health)
+        .order_by(desc(Venture.burn_rate_monthly)).limit(CHART_SIZE)
+    ).all()
+    chart_data = [{
+        "name": name,
+        "burn": float(burn) / 1000, # Value in K
+        "runway": runway,
+        "health": health
+    } for name, burn, runway, health in chart_rows]
+
+    values = {
+        "total_burn": float(stats.total_burn or 0),
+        "avg_runway": float(stats.avg_runway or 0),
+        "avg_nps": float(stats.avg_nps or 0),
+        "total_pilots": int(stats.total_pilots or 0),
+        "venture_count": int(stats.venture_count or 0),
+        "chart_data": chart_data,
+        "data_version": version,
+        "taken_at": datetime.now(timezone.utc),
+    }
+    # One row per month; concurrent workers converge on the same row
+    statement = insert(PortfolioSnapshot).values(period=period, **values)
+    db.execute(statement.on_conflict_do_update(index_elements=["period"], set_=values))
+    db.commit()
+
+    return db.exec(select(PortfolioSnapshot).where(PortfolioSnapshot.period == period)).one()
+
+def get_recent_snapshots(db: Session, periods: int = TREND_PERIODS) -> List[PortfolioSnapshot]:
+    """Latest snapshots, newest first. Refreshes the current month if ventures changed since it was taken."""
+    snapshots = db.exec(
+        select(PortfolioSnapshot).order_by(desc(PortfolioSnapshot.period)).limit(periods)
+    ).all()
+
+    latest = snapshots[0] if snapshots else None
+    if latest is None or latest.period != current_period() or latest.data_version != get_data_version():
+        # `db` may be a read-replica session; the refresh always writes through the primary
+        fresh = _snapshot_in_own_session()
+        snapshots = [fresh] + [s for s in snapshots if s.period != fresh.period][:periods - 1]
+    return snapshots
+
+async def aget_recent_snapshots(db: AsyncSession, periods: int = TREND_PERIODS) -> List[PortfolioSnapshot]:
+    """Async twin of get_recent_snapshots; the (rare) refresh runs on the sync primary in the threadpool."""
+    snapshots = (await db.exec(
+        select(PortfolioSnapshot).order_by(desc(PortfolioSnapshot.period)).limit(periods)
+    )).all()
+
+    latest = snapshots[0] if snapshots else None
+    if latest is None or latest.period != current_period() or latest.data_version != await aget_data_version():
+        fresh = await run_in_threadpool(_snapshot_in_own_session)
+        snapshots = [fresh] + [s for s in snapshots if s.period != fresh.period][:periods - 1]
+    return snapshots
+
+def _pct_change(current: float, previous: Optional[float]) -> float:
+    if not previous:
+        return 0
+    return round((current - previous) / previous * 100, 1)
+
+def build_dashboard_stats(snapshots: List[PortfolioSnapshot]) -> dict:
+    """Shapes DashboardStatsResponse from snapshots (newest first)."""
+    latest = snapshots[0]
+    previous = snapshots[1] if len(snapshots) > 1 else None
+
+    return {
+        "totalBurn": float(latest.total_burn or 0),
+        "avgRunway": round(latest.avg_runway or 0),
+        "avgNps": round(latest.avg_nps or 0),
+        "totalPilotCustomers": latest.total_pilots,
+        "burnChange": _pct_change(float(latest.total_burn or 0), previous and float(previous.total_burn or 0)),
+        "runwayChange": _pct_change(latest.avg_runway, previous and previous.avg_runway),
+        "npsChange": _pct_change(latest.avg_nps, previous and previous.avg_nps),
+        "pilotsChange": _pct_change(latest.total_pilots, previous and previous.total_pilots),
+        # Oldest -> newest for the sparkline
+        "burnTrend": [float(s.total_burn or 0) for s in reversed(snapshots)],
+        "chartData": latest.chart_data or []
+    }
+
+def _snapshot_in_own_session() -> PortfolioSnapshot:
+    with Session(engine) as db:
+        return take_portfolio_snapshot(db)
+
+async def _snapshot_loop():
+    while True:
+        try:
+            await run_in_threadpool(_snapshot_in_own_session)
+        except Exception as e:
+            logger.error(f"Portfolio snapshot failed: {e}")
+        await asyncio.sleep(SNAPSHOT_INTERVAL_SECONDS)
+
+def start_snapshot_scheduler():
+    """Keeps this month's snapshot current even when nobody opens the dashboard."""
+    global _scheduler_task
+    if _scheduler_task is None:
+        _scheduler_task = asyncio.create_task(_snapshot_loop())
+
+def stop_snapshot_scheduler():
+    global _scheduler_task
+    if _scheduler_task is not None:
+        _scheduler_task.cancel()
+        _scheduler_task = None
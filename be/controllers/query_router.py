@@ -0,0 +1,339 @@
+from typing import List, Optional
+import re
+import threading
+from dataclasses import dataclass, field
+from sqlmodel import Session, select
+from models import Venture
+from controllers.venture_filtering import search_ventures, get_ventures_by_metrics
+from controllers.venture_cache import get_data_version
+from services.embeddings import HashingEmbedder
+from helpers.logging import setup_logger
+
+logger = setup_logger("query_router.py")
+
+# Below this nearest-example similarity the question goes to the full agent loop
+ROUTER_MIN_CONFIDENCE = 0.3
+
+# --- Vocabulary ---
+
+METRIC_SYNONYMS = [
+    (r"burn(?:\s*rate)?|spend(?:ing)?|cash\s*burn", "burn_rate_monthly"),
+    (r"runway", "runway_months"),
+    (r"nps|net\s*promoter|satisfaction", "nps_score"),
+    (r"pilots?(?:\s*customers?)?|customers", "pilot_customers_count"),
+]
+METRIC_LABELS = {
+    "burn_rate_monthly": "burn",
+    "runway_months": "runway",
+    "nps_score": "NPS",
+    "pilot_customers_count": "pilot customers",
+}
+HEALTH_PATTERNS = [
+    (r"critical", "Critical"),
+    (r"at[\s-]*risk|risky", "At Risk"),
+    (r"on[\s-]*track|healthy", "On Track"),
+]
+STAGES = ["Discovery", "Validation", "Pilot", "Growth", "Scale"]
+NUMBER_WORDS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+                "eight": 8, "nine": 9, "ten": 10}
+
+DESC_WORDS = r"highest|most|top|best|largest|biggest|max(?:imum)?|longest|strongest"
+ASC_WORDS = r"lowest|least|worst|smallest|bottom|min(?:imum)?|shortest|weakest"
+# Questions that need reasoning or conversation context are never fast-pathed
+NEEDS_AGENT = re.compile(
+    r"\b(why|how\s+(?:come|should|can|do)|explain|compare|versus|vs\.?|should|recommend|"
+    r"what\s+if|predict|forecast|trend|summari[sz]e|them|those|these|it|they|their)\b", re.I)
+
+NUMBER = r"\$?\s*(\d+(?:[.,]\d+)?)\s*(k|m)?\b"
+THRESHOLD_PATTERNS = [
+    (re.compile(rf"\bbetween\s+{NUMBER}\s+and\s+{NUMBER}", re.I), "between"),
+    (re.compile(rf"(?:under|below|less\s+than|fewer\s+than|lower\s+than|<)\s*{NUMBER}", re.I), "lt"),
+    (re.compile(rf"(?:over|above|more\s+than|greater\s+than|higher\s+than|>)\s*{NUMBER}", re.I), "gt"),
+    (re.compile(rf"(?:at\s+most|<=)\s*{NUMBER}", re.I), "lte"),
+    (re.compile(rf"(?:at\s+least|>=)\s*{NUMBER}", re.I), "gte"),
+]
+# Any of these flips or narrows the filter in ways the slots can't express
+NEGATION = re.compile(r"\b(not|no|none|never|except|excluding|without|non|other\s+than)\b|n't\b", re.I)
+# Words a fully parsed question may still contain once its slots are removed
+FILLER_WORDS = {
+    "show", "me", "list", "find", "get", "give", "display", "please", "which", "what", "who",
+    "are", "is", "the", "a", "an", "all", "any", "our", "my", "ventures", "venture",
+    "companies", "company", "startups", "startup", "portfolio", "with", "in", "by", "of",
+    "for", "that", "has", "have", "having", "pod", "months", "month", "monthly", "per",
+    "rate", "score", "count", "number", "currently", "right", "now", "stage",
+}
+
+# --- Small local classifier: nearest labeled example over hashed bag-of-words vectors ---
+
+LABELED_EXAMPLES = {
+    "rank": [
+        "top 3 ventures by nps",
+        "which venture has the highest burn",
+        "show the 5 ventures with the longest runway",
+        "lowest nps ventures",
+        "rank ventures by pilot customers",
+        "bottom two by runway",
+        "fintech ventures with the highest burn",
+    ],
+    "threshold": [
+        "ventures with runway under 6 months",
+        "which ventures burn more than 100k a month",
+        "ventures with nps above 70",
+        "show ventures with fewer than 2 pilot customers",
+        "ventures with burn between 50k and 100k",
+    ],
+    "filter": [
+        "show critical ventures in fintech",
+        "list at risk ventures",
+        "which ventures are in healthtech",
+        "ventures in the pilot stage",
+        "show on track infrastructure ventures",
+    ],
+    "agent": [
+        "why is medflow struggling",
+        "compare portflow and logichain",
+        "what should we do about the at risk ventures",
+        "summarize the portfolio for the board",
+        "which venture should we fund next and why",
+        "tell me more about them",
+    ],
+}
+
+class _IntentClassifier:
+    def __init__(self):
+        self.embedder = HashingEmbedder()
+        self.labels, self.vectors = [], []
+        for label, examples in LABELED_EXAMPLES.items():
+            self.labels.extend([label] * len(examples))
+            self.vectors.extend(self.embedder.encode(examples))
+
+    def predict(self, text: str):
+        query = self.embedder.encode([text])[0]
+        scores = [sum(a * b for a, b in zip(query, vec)) for vec in self.vectors]
+        best = max(range(len(scores)), key=scores.__getitem__)
+        return self.labels[best], scores[best]
+
+classifier = _IntentClassifier()
+
+# --- Slot extraction ---
+
+@dataclass
+class RoutedQuery:
+    intent: str
+    tool: str
+    payload: dict
+    confidence: float
+    description: List[str] = field(default_factory=list) # human-readable filters for the briefing
+
+def _amount(number: str, suffix: Optional[str]) -> float:
+    value = float(number.replace(",", ""))
+    return value * {"k": 1_000, "m": 1_000_000}.get((suffix or "").lower(), 1)
+
+_pods_cache = {"version": None, "pods": []}
+_pods_lock = threading.Lock()
+
+def known_pods(db: Session) -> List[str]:
+    """Distinct pods, refreshed when the venture data version moves."""
+    version = get_data_version()
+    with _pods_lock:
+        if _pods_cache["version"] != version:
+            _pods_cache["pods"] = [p for p in db.exec(select(Venture.pod).distinct()).all() if p]
+            _pods_cache["version"] = version
+        return _pods_cache["pods"]
+
+def _take(pattern, text: str):
+    """First match of pattern in text, and text with that match blanked out (offsets stay put)."""
+    match = re.search(pattern, text) if isinstance(pattern, str) else pattern.search(text)
+    if not match:
+        return None, text
+    return match, text[:match.start()] + " " * (match.end() - match.start()) + text[match.end():]
+
+def route_query(msg: str, pods: List[str]) -> Optional[RoutedQuery]:
+    """
+    Maps a simple portfolio question onto a tool payload. Returns None when the
+    question needs the LLM: reasoning or context references, negation, more than
+    one condition, anything the slots below don't account for (venture names,
+    dates, extra filters), a slot the target tool can't take, or low classifier
+    confidence. Every parsed slot ends up in the payload.
+    """
+    text = (msg or "").strip()
+    if not text or len(text) > 160 or NEEDS_AGENT.search(text) or NEGATION.search(text):
+        return None
+    # Every recognized slot is blanked out of `rest`; whatever remains must be filler
+    rest = text.lower()
+
+    stage = None
+    for name in STAGES:
+        match, rest = _take(rf"\b{name.lower()}\s+stage\b|\bstage\s+{name.lower()}\b", rest)
+        if match:
+            # "pilot stage" must not be read as the pilot-customers metric
+            stage = name
+            break
+
+    thresholds = []
+    for pattern, operator in THRESHOLD_PATTERNS:
+        match, rest = _take(pattern, rest)
+        while match:
+            if operator == "between":
+                thresholds.append((operator, _amount(match.group(1), match.group(2)), _amount(match.group(3), match.group(4))))
+            else:
+                thresholds.append((operator, _amount(match.group(1), match.group(2)), None))
+            match, rest = _take(pattern, rest)
+    if len(thresholds) > 1:
+        return None # composite conditions are the agent's job
+    threshold = thresholds[0] if thresholds else None
+
+    metric = None
+    for pattern, name in METRIC_SYNONYMS:
+        match, rest = _take(rf"\b(?:{pattern})\b", rest)
+        if match:
+            if metric:
+                return None # two metrics in one question
+            metric = name
+
+    health = None
+    for pattern, name in HEALTH_PATTERNS:
+        match, rest = _take(rf"\b(?:{pattern})\b", rest)
+        if match:
+            health = name
+            break
+
+    pod = None
+    for name in pods:
+        match, rest = _take(rf"\b{re.escape(name.lower())}\b", rest)
+        if match:
+            pod = name
+            break
+
+    limit = None
+    numbers = "|".join(NUMBER_WORDS)
+    limit_match, rest = _take(rf"\b(?:top|bottom|first)\s+(\d+|{numbers})\b", rest)
+    if not limit_match:
+        limit_match, rest = _take(rf"\b(\d+|{numbers})(?=\s+(?:ventures?|companies|startups)\b)", rest)
+    if limit_match:
+        token = limit_match.group(1)
+        limit = int(token) if token.isdigit() else NUMBER_WORDS[token]
+
+    direction = None
+    match, rest = _take(rf"\b(?:{ASC_WORDS})\b", rest)
+    if match:
+        direction = "sort_asc"
+    else:
+        match, rest = _take(rf"\b(?:{DESC_WORDS})\b", rest)
+        direction = "sort_desc" if match else None
+    if re.search(rf"\b(?:{ASC_WORDS}|{DESC_WORDS})\b", rest):
+        return None # conflicting or repeated orderings
+
+    leftover = [word for word in re.findall(r"[a-z0-9']+", rest) if word not in FILLER_WORDS]
+    if leftover:
+        logger.info(f"Router deferred to agent: unparsed {leftover}")
+        return None
+
+    # Rules decide the intent; the classifier has to agree for the fast path to fire
+    if metric and threshold:
+        intent = "threshold"
+    elif metric and (direction or limit):
+        intent = "rank"
+    elif (health or pod or stage) and not metric and not threshold:
+        intent = "filter"
+    else:
+        return None
+
+    predicted, confidence = classifier.predict(text.lower())
+    if predicted != intent or confidence < ROUTER_MIN_CONFIDENCE:
+        logger.info(f"Router deferred to agent: rules={intent} classifier={predicted} ({confidence:.2f})")
+        return None
+
+    description = []
+    if health:
+        description.append(f"marked {health}")
+    if pod:
+        description.append(f"in {pod}")
+    if stage:
+        description.append(f"at the {stage} stage")
+
+    if intent == "filter":
+        if limit:
+            return None # search_ventures has no ordering, so "3 critical ventures" has no well-defined 3
+        payload = {k: v for k, v in {"health": health, "pod": pod, "stage": stage}.items() if v}
+        return RoutedQuery(intent, "search_ventures", payload, confidence, description)
+
+    payload = {"metric_type": metric}
+    if health:
+        payload["health"] = health
+    if pod:
+        payload["pod"] = pod
+    if stage:
+        payload["stage"] = stage
+    if limit:
+        payload["limit"] = limit
+    if intent == "threshold":
+        operator, value, value_max = threshold
+        payload.update({"operator": operator, "value": value})
+        if value_max is not None:
+            payload["value_max"] = value_max
+        bound = f"between {value:g} and {value_max:g}" if operator == "between" else \
+            f"{'under' if operator in ('lt', 'lte') else 'over'} {value:g}"
+        description.append(f"with {METRIC_LABELS[metric]} {bound}")
+    else:
+        payload["operator"] = direction or "sort_desc"
+        order = "lowest" if payload["operator"] == "sort_asc" else "highest"
+        description.append(f"ranked by {order} {METRIC_LABELS[metric]}")
+
+    return RoutedQuery(intent, "get_ventures_by_metrics", payload, confidence, description)
+
+def extract_entities(msg: str, pods: List[str]) -> dict:
+    """
+    The router's slots as a question mentions them (pods, stages, health values,
+    metrics, ordering, comparisons, numbers, negation); two questions only mean
+    the same thing if all of these match.
+    """
+    lowered = (msg or "").lower()
+
+    def mentioned(patterns):
+        return sorted({name for pattern, name in patterns if re.search(rf"\b(?:{pattern})\b", lowered)})
+
+    return {
+        "pods": sorted(p for p in pods if re.search(rf"\b{re.escape(p.lower())}\b", lowered)),
+        "stages": mentioned((name.lower(), name) for name in STAGES),
+        "health": mentioned(HEALTH_PATTERNS),
+        "metrics": mentioned(METRIC_SYNONYMS),
+        "order": mentioned([(ASC_WORDS, "sort_asc"), (DESC_WORDS, "sort_desc")]),
+        "comparisons": sorted({operator for pattern, operator in THRESHOLD_PATTERNS if pattern.search(lowered)}),
+        "numbers": sorted(_amount(n, k) for n, k in re.findall(NUMBER, lowered)),
+        "negated": bool(NEGATION.search(lowered)),
+    }
+
+def route_message(msg: str, db: Session) -> Optional[RoutedQuery]:
+    return route_query(msg, known_pods(db))
+
+def run_routed_query(routed: RoutedQuery, state: dict, db: Session) -> dict:
+    handler = {"search_ventures": search_ventures, "get_ventures_by_metrics": get_ventures_by_metrics}[routed.tool]
+    return handler(state=state, payload=routed.payload, db=db)
+
+# --- Templated briefing (same analytic rules as the venture_analyst prompt) ---
+
+def _names(ventures: List[dict], cap: int = 3) -> str:
+    names = [v["name"] for v in ventures[:cap]]
+    if len(ventures) > cap:
+        names.append(f"{len(ventures) - cap} more")
+    return ", ".join(names[:-1]) + (" and " if len(names) > 1 else "") + names[-1]
+
+def briefing(routed: RoutedQuery, ventures: List[dict]) -> str:
+    scope = " ".join(routed.description)
+    if not ventures:
+        return f"No ventures match{(' ' + scope) if scope else ''}."
+
+    noun = "venture" if len(ventures) == 1 else "ventures"
+    sentences = [f"I've identified {len(ventures)} {noun} {scope}: {_names(ventures)}."]
+
+    critical = [v for v in ventures if v["runway_months"] < 6]
+    strong = [v for v in ventures if v["nps_score"] > 70]
+    inefficient = [v for v in ventures if v["burn_rate_monthly"] > 50000 and v["pilot_customers_count"] == 0]
+    if critical:
+        sentences.append(f"{_names(critical, 2)} {'is' if len(critical) == 1 else 'are'} at a CRITICAL runway stage.")
+    if strong:
+        sentences.append(f"{_names(strong, 2)} {'shows' if len(strong) == 1 else 'show'} STRONG PMF.")
+    if inefficient:
+        sentences.append(f"EFFICIENCY WARNING on {_names(inefficient, 2)}.")
+    return " ".join(sentences)
@@ -0,0 +1,149 @@
+from typing import Optional
+import hashlib
+import json
+import re
+import threading
+from starlette.concurrency import run_in_threadpool
+from helpers.redis_utils import async_redis_client
+from helpers.json_utils import json_serial
+from services.embeddings import get_embedder
+from controllers.query_router import extract_entities
+from config.config import settings
+from helpers.logging import setup_logger
+
+logger = setup_logger("response_cache.py")
+
+# Cache of final agent answers, shared by all workers through Redis.
+# Keys embed the portfolio data version, so any venture write makes every cached
+# answer unreachable; TTL bounds how long an answer lives within one version.
+#   answer:{version}:{scope}:{question}  exact match on the normalized question
+#   answer:index:{version}:{scope}       hash of question -> {embedding, entities} for near matches
+# scope is a digest of the session's active filters the question was asked under.
+SEMANTIC_INDEX_LIMIT = 500 # per scope; beyond it answers are only served on exact match
+
+# Follow-ups point at earlier turns ("compare them"), so the same words mean different things per session
+CONTEXT_REFERENCES = re.compile(
+    r"\b(them|those|these|it|its|they|their|above|previous|same|again)\b", re.I)
+FILLER = re.compile(r"^(please |can you |could you |tell me |show me |list )+")
+
+RESPONSE_CACHE_STATS = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "stores": 0, "uncacheable": 0}
+_stats_lock = threading.Lock()
+
+def _count(stat: str):
+    with _stats_lock:
+        RESPONSE_CACHE_STATS[stat] += 1
+
+def response_cache_stats() -> dict:
+    with _stats_lock:
+        hits = RESPONSE_CACHE_STATS["exact_hits"] + RESPONSE_CACHE_STATS["semantic_hits"]
+        lookups = hits + RESPONSE_CACHE_STATS["misses"]
+        return {
+            **RESPONSE_CACHE_STATS,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+def normalize_question(msg: str) -> str:
+    text = re.sub(r"[^\w\s$.%-]", " ", (msg or "").lower())
+    text = re.sub(r"\s+", " ", text).strip(" .")
+    return FILLER.sub("", text)
+
+def is_cacheable(msg: str) -> bool:
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return False
+    if not normalize_question(msg) or CONTEXT_REFERENCES.search(msg):
+        _count("uncacheable")
+        return False
+    return True
+
+def _digest(value: str) -> str:
+    return hashlib.sha1(value.encode()).hexdigest()[:20]
+
+def _scope(active_filters: dict) -> str:
+    return _digest(json.dumps(active_filters or {}, sort_keys=True, default=json_serial))
+
+def _answer_key(version: int, scope: str, question_digest: str) -> str:
+    return f"answer:{version}:{scope}:{question_digest}"
+
+def _index_key(version: int, scope: str) -> str:
+    return f"answer:index:{version}:{scope}"
+
+async def _embed(question: str):
+    # Sentence models run on CPU; keep them off the event loop
+    return (await run_in_threadpool(get_embedder().encode, [question]))[0]
+
+def _nearest(question: str, entities: dict, index: dict):
+    """
+    Best stored question above RESPONSE_CACHE_SIMILARITY whose extracted entities
+    equal ours; embeddings alone can't tell "FinTech" from "HealthTech", "highest"
+    from "lowest" or "at risk" from "not at risk".
+    CPU-bound (embedding + one dot product per entry), so it runs in the threadpool.
+    """
+    query = get_embedder().encode([question])[0]
+    best, best_score = None, settings.RESPONSE_CACHE_SIMILARITY
+    for question_digest, raw in index.items():
+        stored = json.loads(raw)
+        if not isinstance(stored, dict) or stored.get("entities") != entities:
+            continue
+        score = sum(a * b for a, b in zip(query, stored["vector"]))
+        if score >= best_score:
+            best, best_score = question_digest, score
+    return best, best_score
+
+async def alookup(msg: str, active_filters: dict, version: int, pods=()) -> Optional[dict]:
+    """
+    Cached answer for the question under these filters and data version: exact
+    match first, then the nearest stored question above RESPONSE_CACHE_SIMILARITY
+    that mentions the same entities. Returns {"answer", "ventures_ids", "state"} or None.
+    """
+    question = normalize_question(msg)
+    scope = _scope(active_filters)
+    try:
+        raw = await async_redis_client.get(_answer_key(version, scope, _digest(question)))
+        if raw:
+            _count("exact_hits")
+            return json.loads(raw)
+
+        if settings.RESPONSE_CACHE_SIMILARITY > 0:
+            index = await async_redis_client.hgetall(_index_key(version, scope))
+            if index:
+                best, best_score = await run_in_threadpool(
+                    _nearest, question, extract_entities(msg, list(pods)), index)
+                if best:
+                    raw = await async_redis_client.get(_answer_key(version, scope, best))
+                    if raw:
+                        _count("semantic_hits")
+                        logger.info(f"Semantic answer cache hit ({best_score:.3f}) for '{question}'")
+                        return json.loads(raw)
+    except Exception as e:
+        logger.error(f"response cache read error: {e}")
+
+    _count("misses")
+    return None
+
+async def astore(msg: str, active_filters: dict, version: int, answer: str, ventures_ids: list, state: dict,
+                 pods=()):
+    """Caches a final answer; ventures are kept as IDs and re-hydrated from the venture cache on a hit."""
+    question = normalize_question(msg)
+    scope = _scope(active_filters)
+    question_digest = _digest(question)
+    ttl = settings.RESPONSE_CACHE_TTL_SECONDS
+    entry = {"answer": answer, "ventures_ids": ventures_ids, "state": state}
+    try:
+        vector = await _embed(question) if settings.RESPONSE_CACHE_SIMILARITY > 0 else None
+        index_key = _index_key(version, scope)
+        async with async_redis_client.pipeline(transaction=False) as pipe:
+            pipe.setex(_answer_key(version, scope, question_digest), ttl,
+                       json.dumps(entry, default=json_serial))
+            if vector is not None:
+                pipe.hlen(index_key)
+            results = await pipe.execute()
+        if vector is not None and results[-1] < SEMANTIC_INDEX_LIMIT:
+            # Entities come from the raw message: normalization strips the apostrophe in "aren't"
+            indexed = {"vector": vector, "entities": extract_entities(msg, list(pods))}
+            async with async_redis_client.pipeline(transaction=False) as pipe:
+                pipe.hset(index_key, question_digest, json.dumps(indexed))
+                pipe.expire(index_key, ttl)
+                await pipe.execute()
+        _count("stores")
+    except Exception as e:
+        logger.error(f"response cache write error: {e}")
@@ -0,0 +1,361 @@
+from typing import List, Optional
+import json
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession, object_session
+from sqlmodel import Session, select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models import Venture, PilotCustomer
+from models.db import engine, async_engine, DATABASE_READ_URL
+from controllers.venture_filtering import venture_tool_statement, parse_search_results
+from helpers.redis_utils import redis_client, async_redis_client
+from helpers.json_utils import json_serial
+from helpers.logging import setup_logger
+
+logger = setup_logger("venture_cache.py")
+
+# Two-tier read-through cache for venture payloads (VenturePulseResponse shape):
+#   1. in-process LRU per uvicorn worker
+#   2. Redis, shared by every worker
+# All keys embed the portfolio data version. Any committed write to Venture/PilotCustomer
+# bumps the version and publishes it, so every worker drops its LRU and stale Redis
+# entries simply age out.
+VENTURE_CACHE_TTL = 3600
+LOCAL_CACHE_SIZE = 4096
+VERSION_REFRESH_SECONDS = 5 # safety net if a pub/sub message is missed
+DATA_VERSION_KEY = "ventures:data_version"
+INVALIDATION_CHANNEL = "ventures:invalidate"
+
+_local_cache: "OrderedDict[str, object]" = OrderedDict()
+_local_lock = threading.Lock()
+_version = {"value": None, "fetched_at": 0.0}
+CACHE_STATS = {"local_hits": 0, "redis_hits": 0, "misses": 0, "invalidations": 0}
+
+def _payload_key(version: int, venture_id: str) -> str:
+    return f"venture:payload:{version}:{venture_id}"
+
+def _list_key(version: int) -> str:
+    return f"venture:list:{version}"
+
+def _count_key(version: int) -> str:
+    return f"venture:count:{version}"
+
+def _count(stat: str, n: int = 1):
+    with _local_lock:
+        CACHE_STATS[stat] += n
+
+def cache_stats() -> dict:
+    with _local_lock:
+        lookups = CACHE_STATS["local_hits"] + CACHE_STATS["redis_hits"] + CACHE_STATS["misses"]
+        hits = CACHE_STATS["local_hits"] + CACHE_STATS["redis_hits"]
+        return {
+            **CACHE_STATS,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "local_entries": len(_local_cache),
+            "data_version": _version["value"],
+        }
+
+# --- Data version ---
+
+def _set_local_version(version: int):
+    with _local_lock:
+        if _version["value"] is not None and version < _version["value"]:
+            return # late pub/sub message; we already know a newer version
+        if _version["value"] != version:
+            _local_cache.clear()
+        _version["value"] = version
+        _version["fetched_at"] = time.monotonic()
+
+def get_data_version() -> int:
+    if _version["value"] is not None and time.monotonic() - _version["fetched_at"] < VERSION_REFRESH_SECONDS:
+        return _version["value"]
+    try:
+        _set_local_version(int(redis_client.get(DATA_VERSION_KEY) or 0))
+    except Exception as e:
+        logger.error(f"get_data_version error: {e}")
+    return _version["value"] or 0
+
+async def aget_data_version() -> int:
+    """Async twin of get_data_version."""
+    if _version["value"] is not None and time.monotonic() - _version["fetched_at"] < VERSION_REFRESH_SECONDS:
+        return _version["value"]
+    try:
+        _set_local_version(int(await async_redis_client.get(DATA_VERSION_KEY) or 0))
+    except Exception as e:
+        logger.error(f"aget_data_version error: {e}")
+    return _version["value"] or 0
+
+def bump_data_version() -> int:
+    """Call after any venture write so cached payloads (and anything keyed on the version) go stale."""
+    version = redis_client.incr(DATA_VERSION_KEY)
+    _set_local_version(version)
+    redis_client.publish(INVALIDATION_CHANNEL, version)
+    _count("invalidations")
+    return version
+
+# --- Local tier ---
+
+def _local_get(key: str):
+    with _local_lock:
+        if key in _local_cache:
+            _local_cache.move_to_end(key)
+            return _local_cache[key]
+    return None
+
+def _local_set(key: str, value):
+    with _local_lock:
+        _local_cache[key] = value
+        _local_cache.move_to_end(key)
+        while len(_local_cache) > LOCAL_CACHE_SIZE:
+            _local_cache.popitem(last=False)
+
+def _encode(value) -> str:
+    return json.dumps(value, default=json_serial, ensure_ascii=False)
+
+def _redis_set_many(items: dict):
+    try:
+        with redis_client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.setex(key, VENTURE_CACHE_TTL, _encode(value))
+            pipe.execute()
+    except Exception as e:
+        logger.error(f"venture cache write error: {e}")
+
+async def _aredis_set_many(items: dict):
+    try:
+        async with async_redis_client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.setex(key, VENTURE_CACHE_TTL, _encode(value))
+            await pipe.execute()
+    except Exception as e:
+        logger.error(f"venture cache write error: {e}")
+
+def _local_lookup(version: int, venture_ids: List[str]) -> dict:
+    payloads = {}
+    for vid in venture_ids:
+        hit = _local_get(_payload_key(version, vid))
+        if hit is not None:
+            payloads[vid] = hit
+    _count("local_hits", len(payloads))
+    return payloads
+
+def _absorb_redis_hits(version: int, missing: List[str], cached: list, payloads: dict):
+    for vid, raw in zip(missing, cached):
+        if raw:
+            payloads[vid] = json.loads(raw)
+            _local_set(_payload_key(version, vid), payloads[vid])
+            _count("redis_hits")
+
+def _absorb_db_rows(version: int, rows, payloads: dict) -> dict:
+    """Adds freshly loaded rows to the result and the local tier; returns what Redis should get."""
+    fresh = {p["id"]: p for p in parse_search_results(results=rows)}
+    payloads.update(fresh)
+    for vid, payload in fresh.items():
+        _local_set(_payload_key(version, vid), payload)
+    return {_payload_key(version, vid): p for vid, p in fresh.items()}
+
+def _absorb_full_list(version: int, rows) -> tuple:
+    payloads = parse_search_results(results=rows)
+    _local_set(_list_key(version), payloads)
+    # Seed the per-venture tier too; detail views usually follow a list load
+    for p in payloads:
+        _local_set(_payload_key(version, p["id"]), p)
+    return payloads, {_list_key(version): payloads, **{_payload_key(version, p["id"]): p for p in payloads}}
+
+# --- Primary reads for cache fills ---
+# A fill stores rows under the current data version. Right after a bump a lagging
+# replica may still return pre-write rows, which would then be served for the whole
+# TTL; so with a replica configured, misses are filled from the primary (once per
+# version per key) and only the cache hits are served off-primary.
+
+def fill_exec(db: Session, statement):
+    if not DATABASE_READ_URL:
+        return db.exec(statement)
+    with Session(engine) as primary:
+        # Rows are fully loaded (selectinload) before the session closes
+        return primary.exec(statement).all()
+
+async def afill_exec(db: AsyncSession, statement):
+    if not DATABASE_READ_URL:
+        return await db.exec(statement)
+    async with AsyncSession(async_engine) as primary:
+        return (await primary.exec(statement)).all()
+
+# --- Read-through lookups ---
+
+def get_venture_payloads(venture_ids: List[str], db: Session) -> List[dict]:
+    """
+    Hydrates venture payloads for the given IDs, in order: local LRU, then one
+    Redis MGET, then one Postgres query for whatever is still missing.
+    """
+    if not venture_ids:
+        return []
+
+    version = get_data_version()
+    payloads = _local_lookup(version, venture_ids)
+
+    missing = [vid for vid in venture_ids if vid not in payloads]
+    if missing:
+        try:
+            cached = redis_client.mget([_payload_key(version, vid) for vid in missing])
+            _absorb_redis_hits(version, missing, cached, payloads)
+        except Exception as e:
+            logger.error(f"venture cache read error: {e}")
+
+    missing = [vid for vid in venture_ids if vid not in payloads]
+    if missing:
+        _count("misses", len(missing))
+        rows = list(fill_exec(db, venture_tool_statement().where(Venture.id.in_(missing))))
+        _redis_set_many(_absorb_db_rows(version, rows, payloads))
+
+    # Ventures deleted since the session focused on them simply drop out
+    return [payloads[vid] for vid in venture_ids if vid in payloads]
+
+async def aget_venture_payloads(venture_ids: List[str], db: AsyncSession) -> List[dict]:
+    """Async twin of get_venture_payloads (async Redis + asyncpg session)."""
+    if not venture_ids:
+        return []
+
+    version = await aget_data_version()
+    payloads = _local_lookup(version, venture_ids)
+
+    missing = [vid for vid in venture_ids if vid not in payloads]
+    if missing:
+        try:
+            cached = await async_redis_client.mget([_payload_key(version, vid) for vid in missing])
+            _absorb_redis_hits(version, missing, cached, payloads)
+        except Exception as e:
+            logger.error(f"venture cache read error: {e}")
+
+    missing = [vid for vid in venture_ids if vid not in payloads]
+    if missing:
+        _count("misses", len(missing))
+        rows = list(await afill_exec(db, venture_tool_statement().where(Venture.id.in_(missing))))
+        await _aredis_set_many(_absorb_db_rows(version, rows, payloads))
+
+    return [payloads[vid] for vid in venture_ids if vid in payloads]
+
+def get_all_venture_payloads(db: Session) -> List[dict]:
+    """The full portfolio list served by GET /ventures, cached as a whole per data version."""
+    version = get_data_version()
+    key = _list_key(version)
+
+    hit = _local_get(key)
+    if hit is not None:
+        _count("local_hits")
+        return hit
+
+    try:
+        raw = redis_client.get(key)
+        if raw:
+            _count("redis_hits")
+            payloads = json.loads(raw)
+            _local_set(key, payloads)
+            return payloads
+    except Exception as e:
+        logger.error(f"venture cache read error: {e}")
+
+    _count("misses")
+    payloads, to_redis = _absorb_full_list(version, list(fill_exec(db, venture_tool_statement())))
+    _redis_set_many(to_redis)
+    return payloads
+
+async def aget_all_venture_payloads(db: AsyncSession) -> List[dict]:
+    """Async twin of get_all_venture_payloads."""
+    version = await aget_data_version()
+    key = _list_key(version)
+
+    hit = _local_get(key)
+    if hit is not None:
+        _count("local_hits")
+        return hit
+
+    try:
+        raw = await async_redis_client.get(key)
+        if raw:
+            _count("redis_hits")
+            payloads = json.loads(raw)
+            _local_set(key, payloads)
+            return payloads
+    except Exception as e:
+        logger.error(f"venture cache read error: {e}")
+
+    _count("misses")
+    payloads, to_redis = _absorb_full_list(version, list(await afill_exec(db, venture_tool_statement())))
+    await _aredis_set_many(to_redis)
+    return payloads
+
+async def aget_venture_count(db: AsyncSession) -> int:
+    """Portfolio size, cached per data version so paged list calls don't run COUNT(*)."""
+    version = await aget_data_version()
+    key = _count_key(version)
+
+    hit = _local_get(key)
+    if hit is not None:
+        _count("local_hits")
+        return hit
+
+    try:
+        raw = await async_redis_client.get(key)
+        if raw is not None:
+            _count("redis_hits")
+            _local_set(key, int(raw))
+            return int(raw)
+    except Exception as e:
+        logger.error(f"venture cache read error: {e}")
+
+    _count("misses")
+    total = list(await afill_exec(db, select(func.count(Venture.id))))[0]
+    _local_set(key, total)
+    await _aredis_set_many({key: total})
+    return total
+
+# --- Invalidation hooks ---
+
+def _mark_dirty(mapper, connection, target):
+    # Mapper events fire mid-flush; we only flag the session and act once the commit lands
+    session = object_session(target)
+    if session is not None:
+        session.info["ventures_dirty"] = True
+
+for _model in (Venture, PilotCustomer):
+    for _event in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event, _mark_dirty)
+
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop("ventures_dirty", False):
+        try:
+            bump_data_version()
+        except Exception as e:
+            logger.error(f"venture cache invalidation failed: {e}")
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_dirty_flag(session):
+    session.info.pop("ventures_dirty", None)
+
+_listener: Optional[object] = None
+
+def start_invalidation_listener():
+    """Subscribes this worker to version bumps published by other workers."""
+    global _listener
+    if _listener is not None:
+        return
+
+    def _on_message(message):
+        try:
+            _set_local_version(int(message["data"]))
+        except (TypeError, ValueError):
+            pass
+
+    pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(**{INVALIDATION_CHANNEL: _on_message})
+    _listener = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+def stop_invalidation_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
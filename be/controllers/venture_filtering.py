@@ -1,34 +1,203 @@
 from typing import Optional, List
+import json
+import threading
+from collections import OrderedDict
 from sqlmodel import Session, select, func, desc, asc
-from models import Venture
-from schemas import VenturePulseResponse
+from sqlalchemy.orm import selectinload, load_only
+from models import Venture, PilotCustomer
 
 from helpers.logging import setup_logger
+from helpers.json_utils import json_serial
 
 logger = setup_logger("AI Agnet Tools")
 
+# Columns the tool path actually reads; lead_id and friends stay unloaded
+VENTURE_TOOL_COLUMNS = (
+    Venture.id, Venture.name, Venture.pod, Venture.stage, Venture.founder,
+    Venture.health, Venture.burn_rate_monthly, Venture.runway_months,
+    Venture.nps_score, Venture.pilot_customers_count, Venture.last_update_text,
+    Venture.description, Venture.updated_at,
+)
+PILOT_CUSTOMER_TOOL_COLUMNS = (
+    PilotCustomer.id, PilotCustomer.name, PilotCustomer.contract_value,
+    PilotCustomer.start_date, PilotCustomer.status,
+)
+
+# Serialized LLM-facing JSON per venture, keyed by (id, updated_at, rendered pilots) so an edit invalidates it
+LLM_ROW_CACHE_SIZE = 2048
+_llm_row_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_llm_row_cache_lock = threading.Lock()
+
+# Token budget for one ToolMessage (~4 chars per token); the rest of the result set
+# is summarized and reachable through 'cursor'
+LLM_TOOL_TOKEN_BUDGET = 1500
+LLM_CHARS_PER_TOKEN = 4
+LLM_TEXT_MAX_CHARS = 160 # description / last update are cut past this
+
+def venture_tool_statement():
+    """Base SELECT for the agent tools: projected columns + one batched load of pilot customers."""
+    return select(Venture).options(
+        load_only(*VENTURE_TOOL_COLUMNS),
+        selectinload(Venture.pilot_customers).load_only(*PILOT_CUSTOMER_TOOL_COLUMNS),
+    )
+
 def parse_search_results (results):
-    formatted_data = []
+    """
+    Maps ORM rows straight to the VenturePulseResponse shape (snake_case keys)
+    without a model_validate/model_dump round-trip.
+    """
+    return [{
+        "id": v.id,
+        "name": v.name,
+        "pod": v.pod,
+        "stage": v.stage,
+        "founder": v.founder,
+        "health": v.health,
+        "burn_rate_monthly": float(v.burn_rate_monthly),
+        "runway_months": v.runway_months,
+        "nps_score": v.nps_score ,
+        "pilot_customers_count": v.pilot_customers_count, # denormalized column, no relationship load
+        "last_update_text": v.last_update_text,
+        "description": v.description,
+        "pilot_customers": [{
+            "id": p.id,
+            "name": p.name,
+            "contract_value": float(p.contract_value),
+            "start_date": p.start_date,
+            "status": p.status,
+        } for p in v.pilot_customers],
+    } for v in results]
+
+# Field name -> (columns it needs, how to read it); drives the `fields=` projection of GET /ventures
+VENTURE_LIST_FIELDS = {
+    "id": ((Venture.id,), lambda v: v.id),
+    "name": ((Venture.name,), lambda v: v.name),
+    "pod": ((Venture.pod,), lambda v: v.pod),
+    "stage": ((Venture.stage,), lambda v: v.stage),
+    "founder": ((Venture.founder,), lambda v: v.founder),
+    "health": ((Venture.health,), lambda v: v.health),
+    "burn_rate_monthly": ((Venture.burn_rate_monthly,), lambda v: float(v.burn_rate_monthly)),
+    "runway_months": ((Venture.runway_months,), lambda v: v.runway_months),
+    "nps_score": ((Venture.nps_score,), lambda v: v.nps_score),
+    "pilot_customers_count": ((Venture.pilot_customers_count,), lambda v: v.pilot_customers_count),
+    "last_update_text": ((Venture.last_update_text,), lambda v: v.last_update_text),
+    "description": ((Venture.description,), lambda v: v.description),
+    "pilot_customers": ((), lambda v: [{
+        "id": p.id,
+        "name": p.name,
+        "contract_value": float(p.contract_value),
+        "start_date": p.start_date,
+        "status": p.status,
+    } for p in v.pilot_customers]),
+}
+
+def venture_list_statement(fields: List[str]):
+    """
+    SELECT for a `fields=` projection: only the requested columns (plus the keyset
+    key name/id) are loaded, and pilot customers only when asked for.
+    """
+    columns = {Venture.id, Venture.name}
+    for field in fields:
+        columns.update(VENTURE_LIST_FIELDS[field][0])
+    options = [load_only(*columns)]
+    if "pilot_customers" in fields:
+        options.append(selectinload(Venture.pilot_customers).load_only(*PILOT_CUSTOMER_TOOL_COLUMNS))
+    return select(Venture).options(*options)
+
+def project_ventures(results, fields: List[str]) -> List[dict]:
+    return [{field: VENTURE_LIST_FIELDS[field][1](v) for field in fields} for v in results]
+
+def _elide(text: Optional[str], max_chars: int = LLM_TEXT_MAX_CHARS) -> Optional[str]:
+    if not text or len(text) <= max_chars:
+        return text
+    return text[:max_chars].rstrip() + "…"
+
+def _llm_row_json(v) -> str:
+    """Compact, token-lean JSON for one venture as the model sees it."""
+    pilot_customers = tuple(f"{p.name} ({p.status})" for p in v.pilot_customers)
+    # PilotCustomer writes don't touch Venture.updated_at, so the rendered pilots are part of the key
+    key = (v.id, v.updated_at, pilot_customers)
+    with _llm_row_cache_lock:
+        cached = _llm_row_cache.get(key)
+        if cached is not None:
+            _llm_row_cache.move_to_end(key)
+            return cached
+
+    row = json.dumps({
+        "id": v.id,
+        "name": v.name,
+        "pod": v.pod,
+        "stage": v.stage,
+        "founder": v.founder,
+        "health": v.health,
+        "burn": float(v.burn_rate_monthly),
+        "runway": v.runway_months,
+        "nps": v.nps_score,
+        "pilots": v.pilot_customers_count,
+        "pilot_customers": list(pilot_customers),
+        "update": _elide(v.last_update_text),
+        "description": _elide(v.description),
+    }, default=json_serial, ensure_ascii=False, separators=(",", ":"))
+
+    with _llm_row_cache_lock:
+        _llm_row_cache[key] = row
+        _llm_row_cache.move_to_end(key)
+        while len(_llm_row_cache) > LLM_ROW_CACHE_SIZE:
+            _llm_row_cache.popitem(last=False)
+    return row
+
+def _summarize_for_llm(results) -> dict:
+    """Portfolio-level aggregates over the whole result set, so the model can reason past the page."""
+    count = len(results)
+    health = {}
     for v in results:
-        # Get latest metric for the current snapshot
-        temp = {
-            "id": v.id,
-            "name": v.name,
-            "pod": v.pod,
-            "stage": v.stage,
-            "founder": v.founder,
-            "health": v.health,
-            "burn_rate_monthly": float(v.burn_rate_monthly),
-            "runway_months": v.runway_months,
-            "nps_score": v.nps_score ,
-            "pilot_customers_count": len(v.pilot_customers),
-            "last_update_text": v.last_update_text,
-            "description": v.description,
-            "pilot_customers": [p.dict() for p in v.pilot_customers], 
-        }
-        validated = VenturePulseResponse.model_validate(temp).model_dump(by_alias=True)
-        formatted_data.append(validated)
-    return formatted_data
+        health[v.health] = health.get(v.health, 0) + 1
+    return {
+        "total_burn": round(sum(float(v.burn_rate_monthly) for v in results), 2),
+        "avg_runway": round(sum(v.runway_months for v in results) / count, 1),
+        "avg_nps": round(sum(v.nps_score for v in results) / count, 1),
+        "total_pilots": sum(v.pilot_customers_count for v in results),
+        "health": health,
+    }
+
+def int_arg(value, default: int) -> int:
+    """Integer tool argument; the model sometimes sends '2', 'next' or null, so anything unparsable is the default."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+def serialize_for_llm(results, cursor: int = 0, token_budget: int = LLM_TOOL_TOKEN_BUDGET) -> str:
+    """
+    Builds the ToolMessage content for a result set from the per-venture JSON cache.
+    Rows are added from 'cursor' until the token budget is spent (always at least one);
+    if anything is left out, the payload carries aggregates and a next_cursor to page with.
+    """
+    total = len(results)
+    cursor = max(0, min(int_arg(cursor, 0), total))
+    char_budget = token_budget * LLM_CHARS_PER_TOKEN
+
+    rows, used = [], 0
+    for v in results[cursor:]:
+        row = _llm_row_json(v)
+        if rows and used + len(row) > char_budget:
+            break
+        rows.append(row)
+        used += len(row) + 1
+
+    if cursor == 0 and len(rows) == total:
+        return "[" + ",".join(rows) + "]"
+
+    next_cursor = cursor + len(rows)
+    envelope = json.dumps({
+        "total": total,
+        "cursor": cursor,
+        "returned": len(rows),
+        "next_cursor": next_cursor if next_cursor < total else None,
+        "summary": _summarize_for_llm(results) if total else {},
+    }, separators=(",", ":"))
+    # Splice the cached rows in as-is rather than re-encoding them
+    return envelope[:-1] + ',"ventures":[' + ",".join(rows) + "]}"
 
 # --- Tool 1: General Metadata & Basic Filter ---
 def search_ventures(state: dict, payload: dict, db: Session):
@@ -44,8 +213,8 @@ def search_ventures(state: dict, payload: dict, db: Session):
     stage = payload.get("stage")
     health = payload.get("health")
 
-    # 2. Build the query
-    statement = select(Venture)
+    # 2. Build the query (pilot customers batched in one extra SELECT ... IN, not one per row)
+    statement = venture_tool_statement()
     if name:
         statement = statement.where(Venture.name.contains(name))
     if pod:
@@ -63,6 +232,7 @@ def search_ventures(state: dict, payload: dict, db: Session):
     # Return data for the LLM AND a state update for the UI/Memory
     return {
         "data": validated_parsed_data,
+        "llm_content": serialize_for_llm(results, cursor=payload.get("cursor", 0)),
         "state_update": {
             "focused_ventures": [v.id for v in results],
             "active_filters": payload # Persist filters in session memory
@@ -70,50 +240,101 @@ def search_ventures(state: dict, payload: dict, db: Session):
     }
 
 # --- Tool 2: Advanced Metrics Query ---
+METRIC_COLUMNS = {
+    "burn_rate_monthly": Venture.burn_rate_monthly,
+    "runway_months": Venture.runway_months,
+    "nps_score": Venture.nps_score,
+    "pilot_customers_count": Venture.pilot_customers_count,
+}
+
+def _to_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def metric_predicate(metric: str, operator: str, value=None, value_max=None):
+    """
+    SQL predicate for one threshold filter (gt|gte|lt|lte|between), or None when the
+    metric/operator/value combination is not a filter (e.g. a pure sort).
+    """
+    column = METRIC_COLUMNS.get(metric)
+    value, value_max = _to_number(value), _to_number(value_max)
+    if column is None or value is None:
+        return None
+
+    if operator == "gt":
+        return column > value
+    if operator == "gte":
+        return column >= value
+    if operator == "lt":
+        return column < value
+    if operator == "lte":
+        return column <= value
+    if operator == "between" and value_max is not None:
+        return column.between(min(value, value_max), max(value, value_max))
+    return None
+
 def get_ventures_by_metrics(state: dict, payload: dict, db: Session):
     """
     Rank and filter ventures using denormalized metric columns.
-    Supports single metric sorting via 'metric_type' or multi-metric via 'sort_by'.
+    Supports single metric sorting/thresholds via 'metric_type' + 'operator' (+ 'value'),
+    composite thresholds via 'filters', and multi-metric sorting via 'sort_by'.
+    All predicates run in SQL against the indexed metric columns.
     """
     # 1. Extraction & Parameter Normalization
     limit = payload.get("limit")
     health = payload.get("health")
     pod = payload.get("pod")
+    stage = payload.get("stage")
     
     # Handle both LLM styles: single 'metric_type' or plural 'sort_by'
     metric_type = payload.get("metric_type")
     operator = payload.get("operator", "sort_desc")
     sort_by_list = payload.get("sort_by", [])
+    filters = payload.get("filters") or []
 
-    # 2. Base Query
-    statement = select(Venture)
+    # 2. Base Query (pilot customers batched in one extra SELECT ... IN, not one per row)
+    statement = venture_tool_statement()
     
-    # 3. Apply Categorical Filters (Pod/Health)
+    # 3. Apply Categorical Filters (Pod/Health/Stage)
     if health:
         statement = statement.where(Venture.health == health)
     if pod:
         statement = statement.where(Venture.pod == pod)
+    if stage:
+        statement = statement.where(Venture.stage == stage)
 
-    # 4. Construct Multi-Metric Sorting
+    # 4. Apply Threshold Filters (single metric_type/value plus any composite 'filters', ANDed)
+    predicates = [metric_predicate(metric_type, operator, payload.get("value"), payload.get("value_max"))]
+    for f in filters:
+        if isinstance(f, dict):
+            predicates.append(metric_predicate(f.get("metric"), f.get("operator"), f.get("value"), f.get("value_max")))
+    predicates = [p for p in predicates if p is not None]
+    if predicates:
+        statement = statement.where(*predicates)
+
+    # 5. Construct Multi-Metric Sorting
     order_clauses = []
 
     # If LLM passed a specific list (e.g., ["nps_score", "burn_rate_monthly"])
     if sort_by_list:
         for field in sort_by_list:
-            if hasattr(Venture, field):
-                order_clauses.append(desc(getattr(Venture, field)))
+            if field in METRIC_COLUMNS:
+                order_clauses.append(desc(METRIC_COLUMNS[field]))
     
     # If LLM used the standard single-metric definition
-    elif metric_type and hasattr(Venture, metric_type):
-        sort_func = desc if "desc" in operator else asc
-        order_clauses.append(sort_func(getattr(Venture, metric_type)))
+    # (thresholds rank toward the bound: 'lt' lowest first, 'gt' highest first)
+    elif metric_type in METRIC_COLUMNS:
+        sort_func = asc if operator in ("sort_asc", "lt", "lte") else desc
+        order_clauses.append(sort_func(METRIC_COLUMNS[metric_type]))
 
     # Default fallback to keep results consistent
-    else:
+    if not order_clauses:
         order_clauses.append(desc(Venture.updated_at))
 
     statement = statement.order_by(*order_clauses)
-    # 5. Execution (Only apply limit if it is a positive integer)
+    # 6. Execution (Only apply limit if it is a positive integer)
     if limit:
         results = db.exec(statement.limit(limit)).all()
     else:
@@ -122,9 +343,10 @@ def get_ventures_by_metrics(state: dict, payload: dict, db: Session):
     # Use your previously defined helper to map to frontend-friendly camelCase
     validated_parsed_data = parse_search_results(results=results)
 
-    # 6. Return Data + State Update
+    # 7. Return Data + State Update
     return {
         "data": validated_parsed_data,
+        "llm_content": serialize_for_llm(results, cursor=payload.get("cursor", 0)),
         "state_update": {
             "focused_ventures": [v.id for v in results],
             "active_filters": payload,
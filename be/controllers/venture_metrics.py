@@ -0,0 +1,123 @@
+from typing import List, Optional
+from datetime import date, datetime, timezone
+from sqlalchemy import event, inspect, select, func, desc
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from models import Venture, VentureMetric, VentureMetricRollup
+from helpers.text_utils import generate_id
+from helpers.logging import setup_logger
+
+logger = setup_logger("venture_metrics.py")
+
+TRACKED_METRICS = ("burn_rate_monthly", "runway_months", "nps_score", "pilot_customers_count")
+GRANULARITIES = ("month", "quarter")
+
+def month_start(d) -> date:
+    return date(d.year, d.month, 1)
+
+def quarter_start(d) -> date:
+    return date(d.year, 3 * ((d.month - 1) // 3) + 1, 1)
+
+def _period_bounds(granularity: str, d: date):
+    start = month_start(d) if granularity == "month" else quarter_start(d)
+    months = 1 if granularity == "month" else 3
+    year, month = divmod(start.year * 12 + start.month - 1 + months, 12)
+    return start, date(year, month + 1, 1)
+
+def refresh_rollups(connection, venture_id: str, period: date):
+    """Re-aggregates the month and quarter containing `period` for one venture from the raw history."""
+    metrics = VentureMetric.__table__
+    rollups = VentureMetricRollup.__table__
+
+    for granularity in GRANULARITIES:
+        start, end = _period_bounds(granularity, period)
+        agg = connection.execute(
+            select(
+                func.avg(metrics.c.burn_rate_monthly),
+                func.avg(metrics.c.runway_months),
+                func.avg(metrics.c.nps_score),
+                func.max(metrics.c.pilot_customers_count),
+                func.count(),
+            ).where(
+                metrics.c.venture_id == venture_id,
+                metrics.c.period >= start,
+                metrics.c.period < end,
+            )
+        ).one()
+        if not agg[4]:
+            continue
+
+        values = {
+            "burn_rate_monthly": agg[0],
+            "runway_months": float(agg[1]),
+            "nps_score": float(agg[2]),
+            "pilot_customers_count": agg[3],
+            "sample_count": agg[4],
+        }
+        statement = insert(rollups).values(
+            id=generate_id(), venture_id=venture_id, granularity=granularity, period=start, **values)
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=["venture_id", "granularity", "period"], set_=values))
+
+def record_metrics(connection, venture, period: Optional[date] = None, **overrides):
+    """
+    Appends one history point with the venture's current KPI columns (or `overrides`,
+    e.g. when backfilling a past month) and refreshes its rollups.
+    """
+    period = period or month_start(datetime.now(timezone.utc))
+    values = {m: getattr(venture, m) for m in TRACKED_METRICS}
+    values.update(overrides)
+    connection.execute(VentureMetric.__table__.insert().values(
+        id=generate_id(),
+        venture_id=venture.id,
+        period=period,
+        recorded_at=datetime.now(timezone.utc),
+        **values,
+    ))
+    refresh_rollups(connection, venture.id, period)
+
+# --- Write hooks: every insert, and every update touching a KPI column, lands in the history ---
+
+@event.listens_for(Venture, "after_insert")
+def _record_on_insert(mapper, connection, target):
+    record_metrics(connection, target)
+
+@event.listens_for(Venture, "after_update")
+def _record_on_update(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[m].history.has_changes() for m in TRACKED_METRICS):
+        record_metrics(connection, target)
+
+# --- Reads ---
+
+def _metrics_history_statement(venture_id: str, granularity: str, limit: int):
+    rollups = VentureMetricRollup.__table__
+    return select(
+        rollups.c.period,
+        rollups.c.burn_rate_monthly,
+        rollups.c.runway_months,
+        rollups.c.nps_score,
+        rollups.c.pilot_customers_count,
+    ).where(
+        rollups.c.venture_id == venture_id,
+        rollups.c.granularity == granularity,
+    ).order_by(desc(rollups.c.period)).limit(limit)
+
+def _metric_points(rows) -> List[dict]:
+    return [{
+        "period": period,
+        "burn_rate_monthly": float(burn),
+        "runway_months": runway,
+        "nps_score": nps,
+        "pilot_customers_count": pilots,
+    } for period, burn, runway, nps, pilots in reversed(rows)]
+
+def get_metrics_history(db: Session, venture_id: str, granularity: str = "month", limit: int = 12) -> List[dict]:
+    """Most recent `limit` rollup points, oldest first; served from the covering index."""
+    return _metric_points(db.execute(_metrics_history_statement(venture_id, granularity, limit)).all())
+
+async def aget_metrics_history(db: AsyncSession, venture_id: str, granularity: str = "month", limit: int = 12) -> List[dict]:
+    """Async twin of get_metrics_history."""
+    result = await db.execute(_metrics_history_statement(venture_id, granularity, limit))
+    return _metric_points(result.all())
@@ -0,0 +1,148 @@
+from typing import Dict, List
+import threading
+import numpy as np
+from sqlmodel import Session, select, func, desc
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import literal_column
+from models import Venture
+from models.venture import VENTURE_SEARCH_DOCUMENT_SQL
+from controllers.venture_filtering import venture_tool_statement, parse_search_results, serialize_for_llm, int_arg
+from controllers.venture_cache import get_data_version, fill_exec
+from services.embeddings import get_embedder, HashingEmbedder
+from helpers.logging import setup_logger
+
+logger = setup_logger("venture_search.py")
+
+DEFAULT_TOP_K = 5
+MAX_TOP_K = 50
+# Cosine floor for semantic hits; below it a venture is not a match, however few matches there are
+SEMANTIC_MIN_SCORE = 0.3
+
+# Same expression as the GIN index on venture, so the planner can use it
+_search_document = literal_column(f"({VENTURE_SEARCH_DOCUMENT_SQL})")
+
+# --- Full-text (Postgres tsvector) ---
+
+def _fulltext_statement(query: str, k: int):
+    ts_query = func.websearch_to_tsquery(literal_column("'english'::regconfig"), query)
+    rank = func.ts_rank_cd(_search_document, ts_query)
+    return (
+        venture_tool_statement()
+        .where(_search_document.op("@@")(ts_query))
+        .order_by(desc(rank), Venture.id)
+        .limit(k)
+    )
+
+def fulltext_search(db: Session, query: str, k: int = DEFAULT_TOP_K):
+    """Top-k ventures ranked by ts_rank_cd over name, description and last update."""
+    return db.exec(_fulltext_statement(query, k)).all()
+
+async def afulltext_search(db: AsyncSession, query: str, k: int = DEFAULT_TOP_K):
+    """Async twin of fulltext_search."""
+    return (await db.exec(_fulltext_statement(query, k))).all()
+
+# --- Semantic (local embeddings) ---
+
+def _venture_text(v) -> str:
+    return " ".join(filter(None, [v.name, v.pod, v.description, v.last_update_text]))
+
+class _EmbeddingIndex:
+    """
+    In-process (id, vector) matrix, refreshed when the venture data version moves.
+    Vectors are kept per (id, updated_at), so a refresh re-embeds only the ventures
+    that changed; queries keep reading the previous matrix while it runs.
+    """
+    def __init__(self):
+        self._lock = threading.Lock() # guards the published (ids, matrix) snapshot
+        self._refresh_lock = threading.Lock() # one refresh at a time
+        self.version = None
+        self.ids: List[str] = []
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self._embedded: Dict[str, tuple] = {} # id -> (updated_at, vector)
+        self._embedder = None
+
+    def ensure_fresh(self, db: Session):
+        version = get_data_version()
+        if self.version == version:
+            return
+        with self._refresh_lock:
+            if self.version == version:
+                return
+            embedder = get_embedder()
+            if embedder is not self._embedder:
+                self._embedded, self._embedder = {}, embedder
+
+            # Keyed by data version like the venture cache, so it is filled from the primary too
+            stamps = {r.id: r.updated_at for r in fill_exec(db, select(Venture.id, Venture.updated_at))}
+            stale = [vid for vid, updated_at in stamps.items() if self._embedded.get(vid, (None,))[0] != updated_at]
+            if stale:
+                statement = select(Venture.id, Venture.updated_at, Venture.name, Venture.pod,
+                                   Venture.description, Venture.last_update_text)
+                if len(stale) < len(stamps):
+                    statement = statement.where(Venture.id.in_(stale))
+                rows = list(fill_exec(db, statement))
+                vectors = embedder.encode([_venture_text(r) for r in rows]) if rows else []
+                for row, vector in zip(rows, vectors):
+                    self._embedded[row.id] = (row.updated_at, np.asarray(vector, dtype=np.float32))
+            for vid in self._embedded.keys() - stamps.keys():
+                del self._embedded[vid]
+
+            ids = list(self._embedded)
+            matrix = np.vstack([self._embedded[vid][1] for vid in ids]) if ids else np.zeros((0, 0), dtype=np.float32)
+            with self._lock:
+                self.ids, self.matrix, self.version = ids, matrix, version
+            logger.info(f"Embedding index refreshed: {len(stale)} of {len(ids)} ventures re-embedded (data version {version})")
+
+    def top_k(self, query: str, k: int, min_score: float = SEMANTIC_MIN_SCORE) -> List[str]:
+        query_vec = np.asarray(get_embedder().encode([query])[0], dtype=np.float32)
+        with self._lock:
+            # ids and matrix are swapped together on refresh; read them as one snapshot
+            ids, matrix = self.ids, self.matrix
+        if not ids:
+            return []
+        scores = matrix @ query_vec
+        k = min(k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [ids[i] for i in top[np.argsort(-scores[top])] if scores[i] >= min_score]
+
+embedding_index = _EmbeddingIndex()
+
+def semantic_search(db: Session, query: str, k: int = DEFAULT_TOP_K):
+    """
+    Up to k ventures by cosine similarity of local embeddings (vectors are unit
+    length), keeping only those at or above SEMANTIC_MIN_SCORE.
+    """
+    embedding_index.ensure_fresh(db)
+    ids = embedding_index.top_k(query, k)
+    if not ids:
+        return []
+    rows = {v.id: v for v in db.exec(venture_tool_statement().where(Venture.id.in_(ids))).all()}
+    return [rows[vid] for vid in ids if vid in rows]
+
+# --- Agent tool ---
+
+def search_venture_text(state: dict, payload: dict, db: Session):
+    """
+    Free-text search over venture names, descriptions and latest updates.
+    Payload keys: query, mode ('fulltext' | 'semantic'), k
+    """
+    query = (payload.get("query") or "").strip()
+    k = max(1, min(int_arg(payload.get("k"), DEFAULT_TOP_K), MAX_TOP_K))
+    mode = payload.get("mode", "fulltext")
+
+    results = []
+    if query:
+        results = semantic_search(db, query, k) if mode == "semantic" else fulltext_search(db, query, k)
+        # Lexical search found nothing (synonyms, paraphrase): fall back to a real embedding
+        # model. The hashing embedder is lexical too, so it would only add noise.
+        if not results and mode != "semantic" and not isinstance(get_embedder(), HashingEmbedder):
+            results = semantic_search(db, query, k)
+
+    return {
+        "data": parse_search_results(results=results),
+        "llm_content": serialize_for_llm(results, cursor=0),
+        "state_update": {
+            "focused_ventures": [v.id for v in results],
+            "active_filters": payload
+        }
+    }
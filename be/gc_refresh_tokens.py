@@ -0,0 +1,15 @@
+from sqlmodel import Session
+from models.db import engine
+from helpers.refresh_token_store import purge_expired_refresh_tokens
+
+def gc_refresh_tokens():
+    """
+    Deletes expired rows from the refresh_token table. Run once after switching
+    to REFRESH_TOKEN_STORE=redis (or periodically while the table is in use).
+    """
+    with Session(engine) as session:
+        removed = purge_expired_refresh_tokens(session)
+    print(f"🧹 Removed {removed} expired refresh tokens")
+
+if __name__ == "__main__":
+    gc_refresh_tokens()
@@ -8,17 +8,30 @@ from config.config import Settings
 from helpers.redis_utils import get_redis, set_redis
 from jose import jwt, JWTError
 from fastapi.security import OAuth2PasswordBearer
-from helpers.redis_utils import redis_client
+from helpers.redis_utils import redis_client, async_redis_client
 from models.db import get_session
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 from helpers.logging import setup_logger
+from helpers.principal_cache import aget_principal
 
 logger = setup_logger("authenticating utils")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login") # good for Swagger docs, not strictly needed for direct token parsing though
 ACCESS_TOKEN_PREFIX = "onboarding:token:"
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min == max == default: any stored hash with another cost reports needs_update
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto",
+    bcrypt__default_rounds=Settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=Settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=Settings.BCRYPT_ROUNDS,
+)
+# bcrypt releases the GIL, so a small dedicated pool keeps hashing off the event loop
+# without letting a login burst take over the shared threadpool
+_password_pool = ThreadPoolExecutor(max_workers=Settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+LOGIN_ATTEMPT_PREFIX = "auth:attempts:"
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -36,9 +49,66 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
-async def get_current_user(
-        authToken: str = Cookie(None), 
-        session: Session = Depends(get_session)):
+async def ahash_password(password: str) -> str:
+    """hash_password on the bounded bcrypt pool."""
+    return await asyncio.get_running_loop().run_in_executor(_password_pool, hash_password, password)
+
+async def averify_and_update_password(plain_password: str, hashed_password: str):
+    """
+    Verifies on the bounded bcrypt pool. Returns (valid, new_hash); new_hash is set
+    when the stored hash uses another cost factor and should be replaced.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        _password_pool, pwd_context.verify_and_update, plain_password, hashed_password)
+
+def login_client_ip(request: Request) -> Optional[str]:
+    """
+    Client address for the per-IP login limit. With TRUSTED_PROXY_HOPS proxies in
+    front of the app it is the X-Forwarded-For entry the outermost one appended
+    (counted from the right; entries further left are client-supplied), else the
+    socket peer. None when the header is shorter than the configured chain.
+    """
+    hops = Settings.TRUSTED_PROXY_HOPS
+    if hops > 0:
+        forwarded = [part.strip() for part in request.headers.get("x-forwarded-for", "").split(",") if part.strip()]
+        return forwarded[-hops] if len(forwarded) >= hops else None
+    return request.client.host if request.client else None
+
+async def check_login_attempts(email: str, client_ip: Optional[str]):
+    """
+    Counts a login attempt against the account and, if LOGIN_MAX_ATTEMPTS_PER_IP is
+    set, the client IP (fixed window). Raises 429 once either is over its limit,
+    before any bcrypt work is done.
+    """
+    window = Settings.LOGIN_ATTEMPT_WINDOW_SECONDS
+    limits = {f"{LOGIN_ATTEMPT_PREFIX}account:{email.lower()}": Settings.LOGIN_MAX_ATTEMPTS_PER_ACCOUNT}
+    if client_ip and Settings.LOGIN_MAX_ATTEMPTS_PER_IP > 0:
+        limits[f"{LOGIN_ATTEMPT_PREFIX}ip:{client_ip}"] = Settings.LOGIN_MAX_ATTEMPTS_PER_IP
+    try:
+        async with async_redis_client.pipeline(transaction=True) as pipe:
+            for key in limits:
+                pipe.set(key, 0, ex=window, nx=True) # opens the window on the first attempt
+                pipe.incr(key)
+            counts = (await pipe.execute())[1::2]
+    except Exception as e:
+        # Fail open: an unavailable Redis must not lock everybody out
+        logger.error(f"login limiter error: {e}")
+        return
+    if any(count > limit for count, limit in zip(counts, limits.values())):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts. Try again later.",
+            headers={"Retry-After": str(window)},
+        )
+
+async def reset_login_attempts(email: str):
+    """A successful login clears the account counter (the IP counter keeps running)."""
+    try:
+        await async_redis_client.delete(f"{LOGIN_ATTEMPT_PREFIX}account:{email.lower()}")
+    except Exception as e:
+        logger.error(f"login limiter error: {e}")
+
+async def get_current_user(authToken: str = Cookie(None)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -53,13 +123,13 @@ async def get_current_user(
         if user_id is None:
             logger.error("get_current_user failed. Invalid Token; no user_id found in payload")
             raise credentials_exception
-        # --- Query database for user ---
-        user = session.exec(select(User).where(User.id == user_id)).first()
+        # --- Resolve the principal (cached; Postgres only on a miss) ---
+        user = await aget_principal(user_id)
         if not user:
             logger.error(f"User {user_id} not found in DB")
             raise credentials_exception
 
-        return user        
+        return user
     except JWTError:
         logger.error("JWTError")
         raise credentials_exception
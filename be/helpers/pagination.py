@@ -0,0 +1,18 @@
+import base64
+import json
+from typing import Optional
+
+def encode_cursor(*key) -> str:
+    """Opaque, URL-safe keyset cursor for the last row of a page."""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[list]:
+    """Inverse of encode_cursor; returns None for a missing or malformed cursor (anything but a JSON list)."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return key if isinstance(key, list) else None
@@ -0,0 +1,114 @@
+from typing import Optional
+import json
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession, object_session
+from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
+from models.user import User
+from models.db import engine
+from helpers.redis_utils import redis_client, async_redis_client
+from helpers.json_utils import json_serial
+from helpers.logging import setup_logger
+
+logger = setup_logger("principal_cache.py")
+
+# Short-lived cache of authenticated principals, so get_current_user does not hit
+# Postgres on every request:
+#   1. in-process LRU per worker (a few seconds, bounds cross-worker staleness)
+#   2. Redis, shared by every worker
+# Any committed User update/delete and every logout drops the entry from both tiers.
+PRINCIPAL_REDIS_TTL = 300
+PRINCIPAL_LOCAL_TTL = 10
+PRINCIPAL_LOCAL_SIZE = 1024
+# Never cached: the password hash has no business travelling with the principal
+PRINCIPAL_EXCLUDED_FIELDS = {"hashed_password"}
+
+_local_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_local_lock = threading.Lock()
+
+def _principal_key(user_id: str) -> str:
+    return f"auth:principal:{user_id}"
+
+def _local_get(user_id: str) -> Optional[dict]:
+    with _local_lock:
+        entry = _local_cache.get(user_id)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del _local_cache[user_id]
+            return None
+        _local_cache.move_to_end(user_id)
+        return entry[1]
+
+def _local_set(user_id: str, data: dict):
+    with _local_lock:
+        _local_cache[user_id] = (time.monotonic() + PRINCIPAL_LOCAL_TTL, data)
+        _local_cache.move_to_end(user_id)
+        while len(_local_cache) > PRINCIPAL_LOCAL_SIZE:
+            _local_cache.popitem(last=False)
+
+def _to_data(user: User) -> dict:
+    """JSON-safe principal, as stored in both tiers."""
+    return json.loads(json.dumps(user.model_dump(exclude=PRINCIPAL_EXCLUDED_FIELDS), default=json_serial))
+
+def _to_user(data: dict) -> User:
+    # Detached instance; callers only read attributes off the principal.
+    # Excluded fields are declared without defaults, so validation needs them spelled out.
+    return User.model_validate({**data, **{name: None for name in PRINCIPAL_EXCLUDED_FIELDS}})
+
+def _load_from_db(user_id: str) -> Optional[dict]:
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.id == user_id)).first()
+        return _to_data(user) if user else None
+
+async def aget_principal(user_id: str) -> Optional[User]:
+    """Resolves a user ID from the token to a User: local LRU, then Redis, then one Postgres lookup."""
+    data = _local_get(user_id)
+    if data is None:
+        try:
+            raw = await async_redis_client.get(_principal_key(user_id))
+            data = json.loads(raw) if raw else None
+        except Exception as e:
+            logger.error(f"principal cache read error: {e}")
+
+    if data is None:
+        data = await run_in_threadpool(_load_from_db, user_id)
+        if data is None:
+            return None
+        try:
+            await async_redis_client.setex(_principal_key(user_id), PRINCIPAL_REDIS_TTL, json.dumps(data))
+        except Exception as e:
+            logger.error(f"principal cache write error: {e}")
+
+    _local_set(user_id, data)
+    return _to_user(data)
+
+def invalidate_principal(user_id: str):
+    with _local_lock:
+        _local_cache.pop(user_id, None)
+    try:
+        redis_client.delete(_principal_key(user_id))
+    except Exception as e:
+        logger.error(f"principal cache invalidation failed: {e}")
+
+# --- Invalidation hooks ---
+
+def _mark_dirty(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("principals_dirty", set()).add(str(target.id))
+
+for _event in ("after_update", "after_delete"):
+    event.listen(User, _event, _mark_dirty)
+
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_after_commit(session):
+    for user_id in session.info.pop("principals_dirty", ()):
+        invalidate_principal(user_id)
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_dirty_ids(session):
+    session.info.pop("principals_dirty", None)
@@ -1,4 +1,6 @@
 import redis
+import redis.asyncio as aioredis
+from redis.exceptions import WatchError
 import secrets
 from config.config import Settings
 from typing import Any, Dict
@@ -10,6 +12,8 @@ logger = setup_logger("redis_utils.py")
 
 # Redis configuration
 redis_client = redis.Redis(host=Settings.REDIS_HOST, port=Settings.REDIS_PORT, decode_responses=True)
+# Non-blocking client for the async request path (agent loop, streaming)
+async_redis_client = aioredis.Redis(host=Settings.REDIS_HOST, port=Settings.REDIS_PORT, decode_responses=True)
 
 # SSE broadcaster
 REDIS_URL = f"redis://{Settings.REDIS_HOST}:{Settings.REDIS_PORT}"
@@ -44,34 +48,134 @@ def flush_redis():
     redis_client.flushdb()
     
 # --- Session utils ---
-SESSION_STORE = {}
 
-def get_user_session(session_id: str):
-    if redis_client:
-        try:
-            state = redis_client.get(session_id)
-            return json.loads(state) if state else {}
-        except Exception as e:
-            logger.error(f"get_user_session error: {e}")
-
-    return SESSION_STORE.get(session_id, {})
-
-def reset_user_session(session_id: str="test"):
-    if redis_client:
-        try:
-            delete_redis(session_id)
-        except Exception as e:
-            logger.error(f"failed to reset redis session error: {e}")
-
-    SESSION_STORE[session_id] = {}
+# Async session store: state fields live in a hash and messages in a list, so a turn
+# appends only its own messages and a load reads just the trailing window it needs.
+#   <session_id>:state     HASH  field -> JSON value (summary, active_filters, ...)
+#   <session_id>:messages  LIST  one JSON-encoded message dict per entry
+# Sessions written by the old layout (one JSON blob under <session_id>) are migrated on first read.
+SESSION_TTL_SECONDS = 86400
+# State fields no longer written by the agent; dropped from the hash on the next save
+LEGACY_SESSION_FIELDS = ("focused_ventures_data",)
+
+def session_state_key(session_id: str) -> str:
+    return f"{session_id}:state"
+
+def session_messages_key(session_id: str) -> str:
+    return f"{session_id}:messages"
+
+def _dump(value) -> str:
+    return json.dumps(value, default=json_serial, ensure_ascii=False)
+
+async def _aread_session(session_id: str, message_window: int = None):
+    start = -message_window if message_window else 0
+    async with async_redis_client.pipeline(transaction=False) as pipe:
+        pipe.hgetall(session_state_key(session_id))
+        pipe.lrange(session_messages_key(session_id), start, -1)
+        fields, raw_messages = await pipe.execute()
+    state = {k: json.loads(v) for k, v in fields.items()}
+    return state, [json.loads(m) for m in raw_messages]
+
+async def _amigrate_blob_session(session_id: str) -> bool:
+    """Moves a legacy single-blob session into the hash + list layout, keeping its TTL."""
+    raw = await async_redis_client.get(session_id)
+    if not raw:
+        return False
+
+    state = json.loads(raw)
+    messages = state.pop("messages", [])
+    for field in LEGACY_SESSION_FIELDS:
+        state.pop(field, None)
+    ttl = await async_redis_client.ttl(session_id)
+    ttl = ttl if ttl and ttl > 0 else SESSION_TTL_SECONDS
+
+    async with async_redis_client.pipeline(transaction=True) as pipe:
+        if state:
+            pipe.hset(session_state_key(session_id), mapping={k: _dump(v) for k, v in state.items()})
+            pipe.expire(session_state_key(session_id), ttl)
+        if messages:
+            pipe.rpush(session_messages_key(session_id), *[_dump(m) for m in messages])
+            pipe.expire(session_messages_key(session_id), ttl)
+        pipe.delete(session_id)
+        await pipe.execute()
+    logger.info(f"Migrated blob session {session_id} ({len(messages)} messages)")
+    return True
+
+async def aget_user_session(session_id: str, message_window: int = None):
+    """
+    Loads the session state plus its messages; with message_window only the
+    trailing N messages are read and deserialized.
+    """
+    try:
+        state, messages = await _aread_session(session_id, message_window)
+        if not state and not messages and await _amigrate_blob_session(session_id):
+            state, messages = await _aread_session(session_id, message_window)
+        return {**state, "messages": messages} if (state or messages) else {}
+    except Exception as e:
+        logger.error(f"aget_user_session error: {e}")
+        return {}
+
+async def asave_user_session(session_id: str, state: dict, new_messages: list = (), expire_seconds: int = SESSION_TTL_SECONDS):
+    """
+    Writes the given state fields and appends this turn's messages; earlier messages
+    are never rewritten. Returns the total number of stored messages.
+    default ttl is one day
+    """
+    state_key, messages_key = session_state_key(session_id), session_messages_key(session_id)
+    async with async_redis_client.pipeline(transaction=True) as pipe:
+        if state:
+            pipe.hset(state_key, mapping={k: _dump(v) for k, v in state.items()})
+        pipe.hdel(state_key, *LEGACY_SESSION_FIELDS)
+        if new_messages:
+            pipe.rpush(messages_key, *[_dump(m) for m in new_messages])
+        pipe.expire(state_key, expire_seconds)
+        pipe.expire(messages_key, expire_seconds)
+        pipe.llen(messages_key)
+        results = await pipe.execute()
+    return results[-1]
+
+async def areset_user_session(session_id: str="test"):
+    try:
+        await async_redis_client.delete(
+            session_id, session_state_key(session_id), session_messages_key(session_id))
+    except Exception as e:
+        logger.error(f"failed to reset redis session error: {e}")
     return "success"
 
-def save_user_session(session_id: str, state: dict, expire_seconds: int = 86400):
-    """ default ttl is one day """
-    if redis_client:
-        redis_client.setex(
-            name=session_id, 
-            time=expire_seconds, 
-            value=json.dumps(state, default=json_serial, ensure_ascii=False))
-    else:
-        SESSION_STORE[session_id] = state
+async def aget_session_messages(session_id: str):
+    """Raw (still JSON-encoded) stored messages, oldest first."""
+    return await async_redis_client.lrange(session_messages_key(session_id), 0, -1)
+
+async def aget_session_summary(session_id: str) -> str:
+    """The stored conversation summary ("" when the session has none yet)."""
+    raw = await async_redis_client.hget(session_state_key(session_id), "summary")
+    return json.loads(raw) if raw else ""
+
+async def acompact_user_session(session_id: str, archived_messages: list, summary: str, previous_summary: str = ""):
+    """
+    Atomically drops an archived message prefix (raw JSON entries, as returned by
+    aget_session_messages) and replaces previous_summary with summary. The message
+    list and state hash are WATCHed, and both the prefix and the stored summary are
+    re-checked, so a concurrent write or compaction makes this one back off and retry
+    on a later turn instead of losing messages or another compaction's summary.
+    """
+    if not async_redis_client:
+        return False
+
+    state_key, messages_key = session_state_key(session_id), session_messages_key(session_id)
+    async with async_redis_client.pipeline(transaction=True) as pipe:
+        try:
+            await pipe.watch(messages_key, state_key)
+            stored = await pipe.lrange(messages_key, 0, len(archived_messages) - 1)
+            stored_summary = await pipe.hget(state_key, "summary")
+            if stored != list(archived_messages) or (json.loads(stored_summary) if stored_summary else "") != previous_summary:
+                return False
+
+            pipe.multi()
+            pipe.ltrim(messages_key, len(archived_messages), -1)
+            pipe.hset(state_key, "summary", _dump(summary))
+            await pipe.execute()
+            return True
+        except WatchError:
+            logger.info(f"Session {session_id} changed during compaction; will retry next turn")
+            return False
@@ -0,0 +1,115 @@
+from typing import Optional, Tuple
+import secrets
+from datetime import datetime, timedelta, timezone
+from sqlmodel import Session, select, delete
+from models.refresh_token import RefreshToken
+from helpers.redis_utils import redis_client
+from config.config import Settings
+from helpers.logging import setup_logger
+
+logger = setup_logger("refresh_token_store.py")
+
+# Refresh tokens live either in the refresh_token table (default) or, with
+# REFRESH_TOKEN_STORE=redis, in Redis:
+#   auth:refresh:{token}         hash {user_id, expires_at}, native TTL = token lifetime
+#   auth:refresh:user:{user_id}  set of the user's live tokens, for revoke-all
+# The Redis store keeps Postgres out of login/refresh entirely and never needs a GC.
+REFRESH_TOKEN_PREFIX = "auth:refresh:"
+
+def _use_redis() -> bool:
+    return Settings.REFRESH_TOKEN_STORE == "redis"
+
+def _token_key(token: str) -> str:
+    return f"{REFRESH_TOKEN_PREFIX}{token}"
+
+def _user_key(user_id: str) -> str:
+    return f"{REFRESH_TOKEN_PREFIX}user:{user_id}"
+
+def _lifetime() -> timedelta:
+    return timedelta(days=Settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+def _redis_issue(user_id: str) -> str:
+    token = secrets.token_urlsafe(32)
+    ttl = int(_lifetime().total_seconds())
+    expires_at = datetime.now(timezone.utc) + _lifetime()
+    with redis_client.pipeline(transaction=True) as pipe:
+        pipe.hset(_token_key(token), mapping={"user_id": user_id, "expires_at": expires_at.isoformat()})
+        pipe.expire(_token_key(token), ttl)
+        pipe.sadd(_user_key(user_id), token)
+        # The index outlives every token in it; stale members are dropped on revoke-all
+        pipe.expire(_user_key(user_id), ttl)
+        pipe.execute()
+    return token
+
+def issue_refresh_token(user_id: str, session: Session) -> str:
+    """Creates a refresh token for the user. The DB store leaves the commit to the caller."""
+    if _use_redis():
+        return _redis_issue(user_id)
+
+    token = secrets.token_urlsafe(32)
+    session.add(RefreshToken(user_id=user_id, token=token, expires_at=datetime.now(timezone.utc) + _lifetime()))
+    return token
+
+def rotate_refresh_token(token: str, session: Session) -> Optional[Tuple[str, str]]:
+    """
+    Consumes a refresh token and issues its replacement. Returns (user_id, new_token),
+    or None when the token is unknown, expired or was already rotated.
+    """
+    if _use_redis():
+        user_id = redis_client.hget(_token_key(token), "user_id")
+        # DEL decides the race: of two concurrent refreshes only one sees 1
+        if not user_id or not redis_client.delete(_token_key(token)):
+            return None
+        redis_client.srem(_user_key(user_id), token)
+        return user_id, _redis_issue(user_id)
+
+    token_entry = session.exec(select(RefreshToken).where(RefreshToken.token == token)).first()
+    if not token_entry or token_entry.expires_at < datetime.now(timezone.utc):
+        return None
+    new_token = secrets.token_urlsafe(32)
+    token_entry.token = new_token
+    token_entry.expires_at = datetime.now(timezone.utc) + _lifetime()
+    session.add(token_entry)
+    session.commit()
+    return token_entry.user_id, new_token
+
+def revoke_refresh_token(token: str, session: Session) -> Optional[str]:
+    """Deletes one refresh token; returns its user ID when it was known."""
+    if _use_redis():
+        user_id = redis_client.hget(_token_key(token), "user_id")
+        if user_id:
+            with redis_client.pipeline(transaction=True) as pipe:
+                pipe.delete(_token_key(token))
+                pipe.srem(_user_key(user_id), token)
+                pipe.execute()
+        return user_id
+
+    token_entry = session.exec(select(RefreshToken).where(RefreshToken.token == token)).first()
+    if not token_entry:
+        return None
+    session.delete(token_entry)
+    session.commit()
+    return token_entry.user_id
+
+def revoke_all_refresh_tokens(user_id: str, session: Session):
+    """Signs the user out everywhere."""
+    if _use_redis():
+        tokens = redis_client.smembers(_user_key(user_id))
+        redis_client.delete(_user_key(user_id), *(_token_key(t) for t in tokens))
+        return
+
+    session.exec(delete(RefreshToken).where(RefreshToken.user_id == user_id))
+    session.commit()
+
+def purge_expired_refresh_tokens(session: Session, batch_size: int = 5000) -> int:
+    """One-shot GC for the refresh_token table: deletes expired rows in batches."""
+    now = datetime.now(timezone.utc)
+    removed = 0
+    while True:
+        ids = session.exec(
+            select(RefreshToken.id).where(RefreshToken.expires_at < now).limit(batch_size)).all()
+        if not ids:
+            return removed
+        session.exec(delete(RefreshToken).where(RefreshToken.id.in_(ids)))
+        session.commit()
+        removed += len(ids)
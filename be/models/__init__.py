@@ -1,5 +1,7 @@
 from .venture import Venture
 from .pilot_customer import PilotCustomer
 from .user import User
+from .portfolio_snapshot import PortfolioSnapshot
+from .venture_metric import VentureMetric, VentureMetricRollup
 
-__all__ = ["Venture", "User", "PilotCustomer"]
\ No newline at end of file
+__all__ = ["Venture", "User", "PilotCustomer", "PortfolioSnapshot", "VentureMetric", "VentureMetricRollup"]
\ No newline at end of file
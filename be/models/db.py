@@ -1,12 +1,135 @@
 from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 import os
+import threading
+import time
+from config.config import Settings
 
 DATABASE_URL = os.getenv('DATABASE_URL') or 'postgresql://postgres:postgres123@db:5432/venture_pulse'
-engine = create_engine(DATABASE_URL, echo=False)
+DATABASE_READ_URL = Settings.DATABASE_READ_URL
+
+class _CheckoutWaitMixin:
+    """Records how long callers wait for a pooled connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._wait_lock = threading.Lock()
+        self.checkout_count = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.checkout_timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            with self._wait_lock:
+                self.checkout_timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._wait_lock:
+                self.checkout_count += 1
+                self.checkout_wait_total += waited
+                self.checkout_wait_max = max(self.checkout_wait_max, waited)
+
+    def recreate(self):
+        # Keep counters across dispose()/recreate so the gauges stay monotonic
+        new_pool = super().recreate()
+        new_pool.checkout_count = self.checkout_count
+        new_pool.checkout_wait_total = self.checkout_wait_total
+        new_pool.checkout_wait_max = self.checkout_wait_max
+        new_pool.checkout_timeouts = self.checkout_timeouts
+        return new_pool
+
+class InstrumentedQueuePool(_CheckoutWaitMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_CheckoutWaitMixin, AsyncAdaptedQueuePool):
+    pass
+
+def _pool_options(pool_size: int, max_overflow: int) -> dict:
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": Settings.DB_POOL_TIMEOUT,
+        "pool_recycle": Settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": Settings.DB_POOL_PRE_PING,
+    }
+
+def _async_url(url: str) -> str:
+    """postgresql[+psycopg2]://... -> postgresql+asyncpg://..."""
+    scheme, rest = url.split("://", 1)
+    return f"postgresql+asyncpg://{rest}" if scheme.startswith("postgresql") else url
+
+def _build_engine(url: str):
+    return create_engine(url, echo=False, poolclass=InstrumentedQueuePool,
+                         **_pool_options(Settings.DB_POOL_SIZE, Settings.DB_MAX_OVERFLOW))
+
+def _build_async_engine(url: str):
+    # Sized separately: these connections are opened on top of the sync engines' (see DB_ASYNC_POOL_SIZE)
+    return create_async_engine(_async_url(url), echo=False, poolclass=InstrumentedAsyncQueuePool,
+                               **_pool_options(Settings.DB_ASYNC_POOL_SIZE, Settings.DB_ASYNC_MAX_OVERFLOW))
+
+engine = _build_engine(DATABASE_URL)
+# Read-only endpoints route here; without a replica it is simply the primary engine
+read_engine = _build_engine(DATABASE_READ_URL) if DATABASE_READ_URL else engine
+
+# asyncpg engine for the read-heavy endpoints, so queries don't block the event loop
+async_read_engine = _build_async_engine(DATABASE_READ_URL or DATABASE_URL)
+# asyncpg on the primary, for reads that must not lag writes (cache fills after a data version bump)
+async_engine = _build_async_engine(DATABASE_URL) if DATABASE_READ_URL else async_read_engine
+
+def ensure_indexes(db_engine=engine):
+    """
+    create_all only creates indexes together with a new table; this adds any index
+    declared on the models that an existing table is still missing.
+    """
+    with db_engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
 
 def init_db():
+    with engine.begin() as conn:
+        # Trigram GIN indexes on venture name/founder/description depend on it
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
     SQLModel.metadata.create_all(engine)
+    ensure_indexes(engine)
 
 def get_session():
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+async def get_async_read_session():
+    """AsyncSession (asyncpg) for read-only endpoints; served by the replica when DATABASE_READ_URL is set."""
+    async with AsyncSession(async_read_engine) as session:
+        yield session
+
+def _pool_stats(db_engine) -> dict:
+    pool = db_engine.pool
+    count = getattr(pool, "checkout_count", 0)
+    return {
+        "size": pool.size(),
+        "in_use": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "checkouts": count,
+        "checkout_timeouts": getattr(pool, "checkout_timeouts", 0),
+        "avg_checkout_wait_ms": round(getattr(pool, "checkout_wait_total", 0.0) / count * 1000, 3) if count else 0.0,
+        "max_checkout_wait_ms": round(getattr(pool, "checkout_wait_max", 0.0) * 1000, 3),
+    }
+
+def pool_stats() -> dict:
+    """In-use / checkout-wait gauges for the primary and (if configured) replica pools of this worker."""
+    stats = {"primary": _pool_stats(engine)}
+    if read_engine is not engine:
+        stats["replica"] = _pool_stats(read_engine)
+    stats["async_read"] = _pool_stats(async_read_engine.sync_engine)
+    if async_engine is not async_read_engine:
+        stats["async_primary"] = _pool_stats(async_engine.sync_engine)
+    return stats
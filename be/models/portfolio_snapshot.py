@@ -0,0 +1,30 @@
+from typing import List
+from sqlalchemy import Column, Date, DateTime, Numeric, JSON
+from helpers.text_utils import generate_id
+from sqlmodel import SQLModel, Field
+from datetime import date, datetime, timezone
+
+class PortfolioSnapshot(SQLModel, table=True):
+    """
+    Portfolio-wide aggregates for one month. The current month's row is re-written
+    as ventures change; older rows are history for the dashboard trend and deltas.
+    """
+    __tablename__ = "portfolio_snapshot"
+
+    id: str = Field(default_factory=generate_id, primary_key=True)
+    period: date = Field(sa_column=Column(Date, unique=True, index=True, nullable=False)) # first day of the month
+
+    total_burn: float = Field(default=0.0, sa_column=Column(Numeric(14, 2)))
+    avg_runway: float = Field(default=0.0)
+    avg_nps: float = Field(default=0.0)
+    total_pilots: int = Field(default=0)
+    venture_count: int = Field(default=0)
+    # Top ventures by burn, pre-shaped for the dashboard chart
+    chart_data: List[dict] = Field(default_factory=list, sa_column=Column(JSON))
+
+    # Venture data version the aggregates were computed from
+    data_version: int = Field(default=0)
+    taken_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(DateTime(timezone=True))
+    )
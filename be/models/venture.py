@@ -1,14 +1,36 @@
 from typing import List, Optional, TYPE_CHECKING
-from sqlalchemy import Column, DateTime, Numeric, String, Text, func
+from sqlalchemy import Column, DateTime, Numeric, String, Text, Index, func, text
 from helpers.text_utils import generate_id
 from sqlmodel import SQLModel, Field, Relationship
 from datetime import datetime, timezone
 
 if TYPE_CHECKING:
     from .pilot_customer import PilotCustomer
+    from .venture_metric import VentureMetric
+
+# Full-text document: name > description > last update. Queries must use this exact
+# expression for Postgres to match it to the GIN expression index below.
+VENTURE_SEARCH_DOCUMENT_SQL = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(last_update_text, '')), 'C')"
+)
 
 class Venture(SQLModel, table=True):
     __tablename__ = "venture"
+    __table_args__ = (
+        # Keyset pagination key for GET /ventures
+        Index("ix_venture_name_id", "name", "id"),
+        # /ventures/filter: categorical equality prefix + range column
+        Index("ix_venture_pod_stage_health_runway", "pod", "stage", "health", "runway_months"),
+        Index("ix_venture_pod_stage_health_burn", "pod", "stage", "health", "burn_rate_monthly"),
+        # Substring (ILIKE '%...%') search; needs the pg_trgm extension (see models.db.init_db)
+        Index("ix_venture_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_venture_founder_trgm", "founder", postgresql_using="gin", postgresql_ops={"founder": "gin_trgm_ops"}),
+        Index("ix_venture_description_trgm", "description", postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}),
+        # Ranked full-text search (controllers.venture_search)
+        Index("ix_venture_search_document", text(f"({VENTURE_SEARCH_DOCUMENT_SQL})"), postgresql_using="gin"),
+    )
 
     id: str = Field(
         default_factory=generate_id,
@@ -24,10 +46,11 @@ class Venture(SQLModel, table=True):
 
     # --- New Aggregation Columns (Denormalized for performance) ---
     # We use float/Numeric to handle burn rate
-    burn_rate_monthly: float = Field(default=0.0, sa_column=Column(Numeric(12, 2)))
-    runway_months: int = Field(default=0)
-    pilot_customers_count: int = Field(default=0) # Total number of pilot customers
-    nps_score: int = Field(default=0)
+    # Indexed for the agent's threshold filters / rankings (get_ventures_by_metrics)
+    burn_rate_monthly: float = Field(default=0.0, sa_column=Column(Numeric(12, 2), index=True))
+    runway_months: int = Field(default=0, index=True)
+    pilot_customers_count: int = Field(default=0, index=True) # Total number of pilot customers
+    nps_score: int = Field(default=0, index=True)
     
     # Standard Timestamps
     updated_at: datetime = Field(
@@ -37,4 +60,5 @@ class Venture(SQLModel, table=True):
 
     # Relationships
     lead_id: Optional[str] = Field(default=None, foreign_key="user.id")
-    pilot_customers: List["PilotCustomer"] = Relationship(back_populates="venture")
\ No newline at end of file
+    pilot_customers: List["PilotCustomer"] = Relationship(back_populates="venture")
+    metrics_history: List["VentureMetric"] = Relationship(back_populates="venture")
\ No newline at end of file
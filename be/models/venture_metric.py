@@ -0,0 +1,55 @@
+from typing import Optional, TYPE_CHECKING
+from sqlalchemy import Column, Date, DateTime, Numeric, Index
+from helpers.text_utils import generate_id
+from sqlmodel import SQLModel, Field, Relationship
+from datetime import date, datetime, timezone
+
+if TYPE_CHECKING:
+    from .venture import Venture
+
+class VentureMetric(SQLModel, table=True):
+    """Append-only observation of a venture's KPIs; one row per metric change."""
+    __tablename__ = "venture_metric"
+    __table_args__ = (
+        Index("ix_venture_metric_venture_period", "venture_id", "period"),
+    )
+
+    id: str = Field(default_factory=generate_id, primary_key=True)
+    venture_id: str = Field(foreign_key="venture.id")
+    period: date = Field(sa_column=Column(Date, nullable=False)) # first day of the month observed
+    recorded_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(DateTime(timezone=True))
+    )
+
+    burn_rate_monthly: float = Field(default=0.0, sa_column=Column(Numeric(12, 2)))
+    runway_months: int = Field(default=0)
+    nps_score: int = Field(default=0)
+    pilot_customers_count: int = Field(default=0)
+
+    venture: "Venture" = Relationship(back_populates="metrics_history")
+
+class VentureMetricRollup(SQLModel, table=True):
+    """
+    Pre-aggregated VentureMetric per month / quarter. The lookup index carries the
+    metric columns, so sparkline and trend reads are index-only scans.
+    """
+    __tablename__ = "venture_metric_rollup"
+    __table_args__ = (
+        Index(
+            "ix_venture_metric_rollup_lookup", "venture_id", "granularity", "period",
+            unique=True,
+            postgresql_include=["burn_rate_monthly", "runway_months", "nps_score", "pilot_customers_count"],
+        ),
+    )
+
+    id: str = Field(default_factory=generate_id, primary_key=True)
+    venture_id: str = Field(foreign_key="venture.id")
+    granularity: str # 'month' | 'quarter'
+    period: date = Field(sa_column=Column(Date, nullable=False)) # first day of the month / quarter
+
+    burn_rate_monthly: float = Field(default=0.0, sa_column=Column(Numeric(12, 2))) # average over the period
+    runway_months: float = Field(default=0.0) # average over the period
+    nps_score: float = Field(default=0.0) # average over the period
+    pilot_customers_count: int = Field(default=0) # peak over the period
+    sample_count: int = Field(default=0)
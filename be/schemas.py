@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, date
 
 # --- Sub-Schemas ---
 
@@ -37,6 +37,34 @@ class VenturePulseResponse(BaseModel):
         populate_by_name = True
         from_attributes = True
 
+class VentureListItem(BaseModel):
+    """VenturePulseResponse with every field but id optional, for `fields=` projections."""
+    id: str
+    name: Optional[str] = None
+    pod: Optional[str] = None
+    stage: Optional[str] = None
+    founder: Optional[str] = None
+    health: Optional[str] = None
+    burn_rate_monthly: Optional[float] = None
+    runway_months: Optional[int] = None
+    nps_score: Optional[int] = None
+    pilot_customers_count: Optional[int] = None
+    last_update_text: Optional[str] = None
+    description: Optional[str] = None
+    pilot_customers: Optional[List["PilotCustomerSchema"]] = None
+
+    class Config:
+        populate_by_name = True
+        from_attributes = True
+
+class MetricPointSchema(BaseModel):
+    """One monthly/quarterly rollup point of a venture's KPIs."""
+    period: date
+    burn_rate_monthly: float
+    runway_months: float
+    nps_score: float
+    pilot_customers_count: int
+
 class VentureDetailResponse(VenturePulseResponse):
     """
     Extends PulseResponse. Used when clicking a specific venture.
@@ -44,7 +72,7 @@ class VentureDetailResponse(VenturePulseResponse):
     """
     # todo: add additional fields here that only appear on the detail page
     # e.g., funding_rounds: List[FundingRound]
-    pass
+    metrics_history: List[MetricPointSchema] = [] # monthly rollups for the sparkline, oldest first
 
 class GlobalMetricsResponse(BaseModel):
     """Matches your calculateMetrics() frontend function."""
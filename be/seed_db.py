@@ -4,7 +4,11 @@ from sqlmodel import Session
 from models.venture import Venture
 from models.pilot_customer import PilotCustomer
 from models.user import User
+from models.portfolio_snapshot import PortfolioSnapshot
 from models.db import engine
+import controllers.venture_cache # registers the write hooks that invalidate cached ventures
+from controllers.portfolio_snapshots import current_period, take_portfolio_snapshot
+from controllers.venture_metrics import record_metrics # also registers the metrics-history write hooks
 
 # The data provided in the prompt
 ventures_data = [
@@ -207,5 +211,55 @@ def seed_database():
         session.commit()
         print("✅ Database successfully populated with aggregated metrics!")
 
+        seed_metrics_history(session)
+        seed_portfolio_snapshots(session)
+
+
+def seed_metrics_history(session: Session):
+    """
+    Backfills past months of per-venture history from burnHistory (last entry = current
+    month, already recorded by the insert hook). Other KPIs reuse today's values.
+    """
+    period = current_period()
+    connection = session.connection()
+
+    for v_data in ventures_data:
+        venture = session.get(Venture, v_data["id"])
+        for months_back in range(1, len(v_data["burnHistory"])):
+            year, month = divmod(period.year * 12 + period.month - 1 - months_back, 12)
+            record_metrics(
+                connection, venture,
+                period=period.replace(year=year, month=month + 1),
+                burn_rate_monthly=float(v_data["burnHistory"][-1 - months_back]))
+
+    session.commit()
+    print("📈 Backfilled per-venture metrics history")
+
+
+def seed_portfolio_snapshots(session: Session):
+    """
+    Backfills past monthly snapshots from burnHistory (last entry = current month).
+    Only burn has history in the seed data; the other aggregates reuse today's values.
+    """
+    current = take_portfolio_snapshot(session)
+    months = max(len(v["burnHistory"]) for v in ventures_data)
+    period = current_period()
+
+    for months_back in range(1, months):
+        year, month = divmod(period.year * 12 + period.month - 1 - months_back, 12)
+        session.add(PortfolioSnapshot(
+            period=period.replace(year=year, month=month + 1),
+            total_burn=float(sum(v["burnHistory"][-1 - months_back] for v in ventures_data)),
+            avg_runway=current.avg_runway,
+            avg_nps=current.avg_nps,
+            total_pilots=current.total_pilots,
+            venture_count=current.venture_count,
+            chart_data=current.chart_data,
+            data_version=current.data_version,
+        ))
+
+    session.commit()
+    print(f"📈 Backfilled {months - 1} monthly portfolio snapshots")
+
 if __name__ == "__main__":
     seed_database()
\ No newline at end of file
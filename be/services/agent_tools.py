@@ -20,6 +20,10 @@ tools = [
                         "type": "string", 
                         "enum": ["On Track", "At Risk", "Critical"],
                         "description": "The current health status of the venture"
+                    },
+                    "cursor": {
+                        "type": "integer",
+                        "description": "Offset to continue from when a previous result returned 'next_cursor'."
                     }
                 }
             }
@@ -45,22 +49,82 @@ tools = [
                     },
                     "operator": {
                         "type": "string", 
-                        "enum": ["gt", "lt", "sort_desc", "sort_asc"],
-                        "description": "gt/lt for filtering; sort_desc/sort_asc for ranking (e.g., 'Highest NPS')."
+                        "enum": ["gt", "gte", "lt", "lte", "between", "sort_desc", "sort_asc"],
+                        "description": "gt/gte/lt/lte/between for filtering (needs 'value'); sort_desc/sort_asc for ranking (e.g., 'Highest NPS')."
                     },
                     "value": {
                         "type": "number", 
-                        "description": "The threshold value (e.g., 50000 for burn or 70 for NPS)."
+                        "description": "The threshold value (e.g., 50000 for burn or 70 for NPS); lower bound for 'between'."
+                    },
+                    "value_max": {
+                        "type": "number",
+                        "description": "Upper bound when operator is 'between'."
+                    },
+                    "filters": {
+                        "type": "array",
+                        "description": "Additional thresholds, all of which must hold (e.g., runway < 6 AND burn > 50000).",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "metric": {
+                                    "type": "string",
+                                    "enum": ["burn_rate_monthly", "runway_months", "nps_score", "pilot_customers_count"]
+                                },
+                                "operator": {"type": "string", "enum": ["gt", "gte", "lt", "lte", "between"]},
+                                "value": {"type": "number"},
+                                "value_max": {"type": "number"}
+                            },
+                            "required": ["metric", "operator", "value"]
+                        }
+                    },
+                    "sort_by": {
+                        "type": "array",
+                        "items": {
+                            "type": "string",
+                            "enum": ["burn_rate_monthly", "runway_months", "nps_score", "pilot_customers_count"]
+                        },
+                        "description": "Multi-metric ranking, highest first, in priority order."
+                    },
+                    "pod": {"type": "string", "description": "Restrict to one pod, e.g., 'FinTech'."},
+                    "stage": {"type": "string", "description": "Restrict to one stage, e.g., 'Pilot'."},
+                    "health": {
+                        "type": "string",
+                        "enum": ["On Track", "At Risk", "Critical"],
+                        "description": "Restrict to one health status."
                     },
                     "limit": {
                         "type": "integer", 
                         "description": "Number of results to return (useful for 'Top 3')."
+                    },
+                    "cursor": {
+                        "type": "integer",
+                        "description": "Offset to continue from when a previous result returned 'next_cursor'."
                     }
                 },
                 "required": ["metric_type", "operator"]
             }
         }
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "search_venture_text",
+            "description": "Free-text search over venture descriptions and latest updates. Use this for topical questions (e.g., 'who is working on logistics?', 'which ventures mention FDA or regulation?').",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "Keywords or a short natural-language phrase"},
+                    "mode": {
+                        "type": "string",
+                        "enum": ["fulltext", "semantic"],
+                        "description": "fulltext for keyword matches (default); semantic for paraphrased or conceptual questions."
+                    },
+                    "k": {"type": "integer", "description": "Number of results (default 5)."}
+                },
+                "required": ["query"]
+            }
+        }
+    },
     {
         "type": "function",
         "function": {
@@ -0,0 +1,62 @@
+# embeddings.py
+import hashlib
+import math
+import re
+from typing import List, Optional
+from config.config import Settings
+from helpers.logging import setup_logger
+
+logger = setup_logger("Embeddings")
+
+class HashingEmbedder:
+    """
+    Dependency-free stand-in for a sentence model: L2-normalized hashed bag of
+    words (+ bigrams). Deterministic, so it doubles as the stub in tests.
+    """
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _tokens(self, text: str) -> List[str]:
+        words = re.findall(r"[a-z0-9]+", (text or "").lower())
+        return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for text in texts:
+            vec = [0.0] * self.dim
+            for token in self._tokens(text):
+                h = int(hashlib.md5(token.encode()).hexdigest(), 16)
+                vec[h % self.dim] += 1.0 if (h >> 8) & 1 else -1.0
+            norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+            vectors.append([x / norm for x in vec])
+        return vectors
+
+class SentenceTransformerEmbedder:
+    """Local CPU sentence model (optional dependency: sentence-transformers)."""
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name, device="cpu")
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        return self.model.encode(texts, normalize_embeddings=True).tolist()
+
+_embedder = None
+
+def get_embedder():
+    """Configured model if available, otherwise the hashing embedder."""
+    global _embedder
+    if _embedder is None:
+        model_name: Optional[str] = Settings.SEMANTIC_SEARCH_MODEL
+        if model_name:
+            try:
+                _embedder = SentenceTransformerEmbedder(model_name)
+            except Exception as e:
+                logger.warning(f"Embedding model '{model_name}' unavailable ({e}); using hashing embedder")
+        if _embedder is None:
+            _embedder = HashingEmbedder()
+    return _embedder
+
+def set_embedder(embedder):
+    """Swap the embedder (e.g. a stub in tests)."""
+    global _embedder
+    _embedder = embedder
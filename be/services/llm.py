@@ -2,18 +2,26 @@
 from datetime import datetime, timezone
 import os
 import json
-from typing import List, Optional, Dict
+import threading
+from typing import List, Optional, Dict, Tuple
 from helpers.text_utils import clean_llm_json
 from langchain.chat_models import init_chat_model
 from langchain_core.prompts import PromptTemplate
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage
 from services.prompts import PROMPTS
+from services.provider_router import ProviderRouter, Candidate
 from config.constants import CHAT_HISTORY_SUMMARIZATION_MODEL, CHAT_HISTORY_SUMMARIZATION_MODEL_PROVIDER
 from helpers.logging import setup_logger
 
 
 logger = setup_logger("LLMManager")
 
+# Tried in order when the primary provider fails (e.g. if OpenAI fails, try Anthropic)
+FALLBACK_MODELS = [
+    ("anthropic", "claude-3-5-sonnet-20240620"),
+    ("google", "gemini-1.5-flash"),
+]
+
 class LLMManager:
     def __init__(
         self,
@@ -38,6 +46,11 @@ class LLMManager:
         # This proxy will only decide the model/provider at the moment of 'generate_response'
         self.llm_proxy = init_chat_model()
 
+        # 4. Lazily built, reused across requests (runnables and templates are immutable)
+        self._runnables: Dict[tuple, object] = {}
+        self._templates: Dict[Tuple[str, str, Tuple[str, ...]], Optional[PromptTemplate]] = {}
+        self._build_lock = threading.Lock()
+
     def _validate_config(self, provider: str, model: str):
         """Guard layer to ensure provider and model are whitelisted."""
         if provider not in self.allowed_registry:
@@ -45,6 +58,35 @@ class LLMManager:
         if model not in self.allowed_registry[provider]:
             raise ValueError(f"Model '{model}' is not allowed for provider '{provider}'.")
 
+    def _configured(self, provider: str, model: str):
+        return self.llm_proxy.with_config(config={
+            "configurable": {"model_provider": provider, "model": model}
+        })
+
+    def _get_runnable(self, provider: str, model: str):
+        """Primary model routed with FALLBACK_MODELS, built once per (provider, model)."""
+        key = (provider, model)
+        runnable = self._runnables.get(key)
+        if runnable is None:
+            with self._build_lock:
+                runnable = self._runnables.get(key)
+                if runnable is None:
+                    chain = [(provider, model)] + [fb for fb in FALLBACK_MODELS if fb != (provider, model)]
+                    runnable = ProviderRouter([Candidate(p, m, self._configured(p, m)) for p, m in chain])
+                    self._runnables[key] = runnable
+        return runnable
+
+    def _get_template(self, prompt_key: str, raw_template: str, lang: str, input_keys: Tuple[str, ...]):
+        """Compiled PromptTemplate per (prompt_key, language, input variables); None when nothing to format."""
+        key = (prompt_key, lang, input_keys)
+        if key not in self._templates:
+            if "{language}" in raw_template:
+                raw_template = raw_template.replace("{language}", lang)
+            template = PromptTemplate(input_variables=list(input_keys), template=raw_template) if input_keys else None
+            with self._build_lock:
+                self._templates.setdefault(key, template)
+        return self._templates[key]
+
     def generate_response(
         self,
         input_vars: dict,
@@ -66,43 +108,17 @@ class LLMManager:
             # 3. Guardrail Validation
             self._validate_config(active_provider, active_model)
 
-            # 1. Create the Primary Runnable
-            primary_llm = self.llm_proxy.with_config(config={
-                "configurable": {
-                    "model_provider": active_provider,
-                    "model": active_model
-                }
-            })
-
-            # 2. Define Fallbacks (e.g., if OpenAI fails, try Anthropic)
-            # You can customize this list based on your specific needs
-            fallbacks = [
-                self.llm_proxy.with_config(config={
-                    "configurable": {"model_provider": "anthropic", "model": "claude-3-5-sonnet-20240620"}
-                }),
-                self.llm_proxy.with_config(config={
-                    "configurable": {"model_provider": "google", "model": "gemini-1.5-flash"}
-                })
-            ]
-
-            # 3. Chain them together
-            # This creates a single object that handles the retry logic automatically
-            runnable = primary_llm.with_fallbacks(fallbacks)
-
-
-            # 4. Prepare Content
-            raw_template = prompt_data["content"]
-            if "{language}" in raw_template:
-                raw_template = raw_template.replace("{language}", lang)
+            # 4. Primary runnable with health-aware fallbacks (cached per provider/model)
+            runnable = self._get_runnable(active_provider, active_model)
 
-            # Logic for template formatting
-            if input_vars:
-                template = PromptTemplate(input_variables=list(input_vars.keys()), template=raw_template)
+            # 5. Prepare Content (template compiled once per prompt/language/variables)
+            template = self._get_template(prompt_key, prompt_data["content"], lang, tuple(input_vars or ()))
+            if template is not None:
                 formatted_content = template.format(**input_vars)
             else:
-                formatted_content = raw_template
+                formatted_content = prompt_data["content"].replace("{language}", lang)
 
-            # 5. Execute
+            # 6. Execute
             response_obj = runnable.invoke(
                 [HumanMessage(content=formatted_content)],
                 temperature=self.temperature,
@@ -132,13 +148,7 @@ class LLMManager:
             return "Sorry, I couldn't generate a response due to an internal error."
 
 
-    def summarize_conversation(self, current_summary, messages_to_archive):
-        """
-        Collapses old messages into a concise summary to save tokens.
-        """
-        if not messages_to_archive:
-            return current_summary
-
+    def _build_summary_prompt(self, current_summary, messages_to_archive):
         # 1. Format the messages to be archived into a readable string for the LLM
         formatted_history = ""
         for m in messages_to_archive:
@@ -151,12 +161,12 @@ class LLMManager:
                 formatted_history += f"System: (Action performed/Data retrieved)\n"
 
         # 2. Prepare the Summarization Prompt
-        summary_prompt = f"""
+        return f"""
 Progressively summarize the lines of conversation provided, adding onto the previous summary 
 to create a single concise update. Focus on:
-- User preferences (items they liked/disliked)
-- Specific intent (e.g., "looking for a dress for a wedding")
-- Key decisions made (e.g., "agreed to delivery on Friday")
+- Ventures, pods and founders the user is tracking
+- Specific intent (e.g., "comparing runway across FinTech ventures")
+- Filters and conclusions already reached (e.g., "BioSync flagged as STRONG PMF")
 
 CURRENT SUMMARY:
 {current_summary if current_summary else "No previous summary."}
@@ -167,12 +177,33 @@ NEW MESSAGES TO ADD:
 New concise summary:
 """
 
-        # 3. Call the LLM (Using a lightweight model for cost efficiency)
-        summary_llm = self.llm_proxy.with_config(config={
-            "configurable": {"model_provider": CHAT_HISTORY_SUMMARIZATION_MODEL_PROVIDER, "model": CHAT_HISTORY_SUMMARIZATION_MODEL}
-        })
-        
-        response = summary_llm.invoke([SystemMessage(content=summary_prompt)])
+    def _summary_llm(self):
+        # Lightweight model for cost efficiency; configured once and reused
+        key = ("summary", CHAT_HISTORY_SUMMARIZATION_MODEL_PROVIDER, CHAT_HISTORY_SUMMARIZATION_MODEL)
+        runnable = self._runnables.get(key)
+        if runnable is None:
+            runnable = self._runnables.setdefault(key, self._configured(
+                CHAT_HISTORY_SUMMARIZATION_MODEL_PROVIDER, CHAT_HISTORY_SUMMARIZATION_MODEL))
+        return runnable
+
+    def summarize_conversation(self, current_summary, messages_to_archive):
+        """
+        Collapses old messages into a concise summary to save tokens.
+        """
+        if not messages_to_archive:
+            return current_summary
+
+        summary_prompt = self._build_summary_prompt(current_summary, messages_to_archive)
+        response = self._summary_llm().invoke([SystemMessage(content=summary_prompt)])
         
         return response.content.strip()
 
+    async def asummarize_conversation(self, current_summary, messages_to_archive):
+        """Async twin of summarize_conversation, used by the background history compaction."""
+        if not messages_to_archive:
+            return current_summary
+
+        summary_prompt = self._build_summary_prompt(current_summary, messages_to_archive)
+        response = await self._summary_llm().ainvoke([SystemMessage(content=summary_prompt)])
+
+        return response.content.strip()
@@ -0,0 +1,319 @@
+from typing import Dict, List, Optional
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, wait, FIRST_COMPLETED, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from config.config import Settings
+from helpers.logging import setup_logger
+
+logger = setup_logger("provider_router.py")
+
+# Health is tracked per (provider, model) and shared by every router in the worker,
+# so an outage seen by the agent loop also steers LLMManager away (and vice versa).
+HEALTH_WINDOW = 50 # most recent calls considered for error rate / latency
+
+class ProviderHealth:
+    """
+    Rolling error rate and latency of one provider/model, plus its circuit:
+    closed -> open once the error rate crosses the threshold -> half-open after
+    the cooldown (calls go through again; the first failure re-opens it, the
+    first success closes it).
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = deque(maxlen=HEALTH_WINDOW) # (ok, latency_seconds)
+        self.opened_at: Optional[float] = None
+        self.in_flight = 0 # sync calls still running, including ones a caller gave up on
+        self.lock = threading.Lock()
+
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < Settings.LLM_CIRCUIT_COOLDOWN_SECONDS:
+            return "open"
+        return "half_open"
+
+    def available(self) -> bool:
+        return self.state() != "open"
+
+    def acquire_slot(self) -> bool:
+        """Claims one of LLM_MAX_IN_FLIGHT_PER_PROVIDER sync call slots; False when all are taken."""
+        with self.lock:
+            if self.in_flight >= Settings.LLM_MAX_IN_FLIGHT_PER_PROVIDER:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release_slot(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def record(self, ok: bool, latency: float):
+        with self.lock:
+            if ok and self.opened_at is not None:
+                # Recovered: start from a clean window so old failures don't re-trip it
+                logger.info(f"LLM circuit closed for {self.name}")
+                self.opened_at = None
+                self.calls.clear()
+            self.calls.append((ok, latency))
+            if not ok and self._should_open():
+                if self.opened_at is None:
+                    logger.warning(f"LLM circuit opened for {self.name}")
+                self.opened_at = time.monotonic()
+
+    def _should_open(self) -> bool:
+        if self.opened_at is not None:
+            return True # failed while open/half-open: re-arm the cooldown
+        if len(self.calls) < Settings.LLM_CIRCUIT_MIN_CALLS:
+            return False
+        errors = sum(1 for ok, _ in self.calls if not ok)
+        return errors / len(self.calls) >= Settings.LLM_CIRCUIT_ERROR_RATE
+
+    def p95_latency(self) -> Optional[float]:
+        with self.lock:
+            return self._p95_latency()
+
+    def _p95_latency(self) -> Optional[float]:
+        # Caller holds self.lock; record() appends from other threads
+        latencies = sorted(latency for ok, latency in self.calls if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+    def stats(self) -> dict:
+        with self.lock:
+            calls = len(self.calls)
+            errors = sum(1 for ok, _ in self.calls if not ok)
+            p95 = self._p95_latency()
+            return {
+                "state": self.state(),
+                "calls": calls,
+                "error_rate": round(errors / calls, 4) if calls else 0.0,
+                "p95_latency_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "in_flight": self.in_flight,
+            }
+
+_health: Dict[str, ProviderHealth] = {}
+_health_lock = threading.Lock()
+
+def get_health(provider: str, model: str) -> ProviderHealth:
+    name = f"{provider}:{model}"
+    with _health_lock:
+        if name not in _health:
+            _health[name] = ProviderHealth(name)
+        return _health[name]
+
+def provider_stats() -> dict:
+    with _health_lock:
+        entries = list(_health.values())
+    return {h.name: h.stats() for h in entries}
+
+@dataclass
+class Candidate:
+    provider: str
+    model: str
+    runnable: object
+
+    @property
+    def health(self) -> ProviderHealth:
+        return get_health(self.provider, self.model)
+
+class _SyncAttempt:
+    """
+    One sync call on its own thread, so a deadline can be enforced without a shared
+    pool whose queue eats into it. A timed-out call is abandoned, not killed; it keeps
+    its candidate's in-flight slot until invoke actually returns.
+    """
+    def __init__(self, candidate: Candidate, messages, kwargs):
+        self.candidate = candidate
+        self.future = Future()
+        self.started = time.monotonic()
+        self.future.set_running_or_notify_cancel()
+        threading.Thread(target=self._run, args=(messages, kwargs), daemon=True,
+                         name=f"llm-{candidate.health.name}").start()
+
+    def _run(self, messages, kwargs):
+        try:
+            self.future.set_result(self.candidate.runnable.invoke(messages, **kwargs))
+        except BaseException as e:
+            self.future.set_exception(e)
+        finally:
+            self.candidate.health.release_slot()
+
+class ProviderRouter:
+    """
+    Drop-in for a with_fallbacks chain: tries candidates in order, skipping any
+    whose circuit is open, with a deadline per attempt and (optionally) a hedged
+    call to the next candidate once the current one exceeds its observed p95.
+    """
+    def __init__(self, candidates: List[Candidate], attempt_timeout: Optional[float] = None,
+                 hedge: Optional[bool] = None):
+        self.candidates = candidates
+        self.attempt_timeout = attempt_timeout or Settings.LLM_ATTEMPT_TIMEOUT_SECONDS
+        self.hedge = Settings.LLM_HEDGE_ENABLED if hedge is None else hedge
+
+    def _ordered(self) -> List[Candidate]:
+        available = [c for c in self.candidates if c.health.available()]
+        if not available:
+            # Every circuit is open: trying beats failing outright
+            logger.warning("All LLM circuits open; trying providers in configured order")
+            return list(self.candidates)
+        return available
+
+    def _hedge_delay(self, candidate: Candidate) -> Optional[float]:
+        if not self.hedge:
+            return None
+        p95 = candidate.health.p95_latency()
+        if p95 is None:
+            return None # no baseline yet; don't double-spend
+        return min(max(p95, Settings.LLM_HEDGE_MIN_DELAY_SECONDS), self.attempt_timeout)
+
+    # --- async ---
+
+    async def _attempt(self, candidate: Candidate, messages, kwargs):
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(candidate.runnable.ainvoke(messages, **kwargs), self.attempt_timeout)
+        except asyncio.CancelledError:
+            raise # lost a hedge race; says nothing about the provider
+        except Exception as e:
+            candidate.health.record(False, time.monotonic() - start)
+            logger.warning(f"LLM attempt on {candidate.health.name} failed: {type(e).__name__}: {e}")
+            raise
+        candidate.health.record(True, time.monotonic() - start)
+        return result
+
+    async def ainvoke(self, messages, **kwargs):
+        order = self._ordered()
+        last_error = None
+        i = 0
+        while i < len(order):
+            task = asyncio.ensure_future(self._attempt(order[i], messages, kwargs))
+            delay = self._hedge_delay(order[i]) if i + 1 < len(order) else None
+            if delay is not None:
+                done, _ = await asyncio.wait({task}, timeout=delay)
+                if not done:
+                    logger.info(f"Hedging {order[i].health.name} with {order[i + 1].health.name}")
+                    pending = {task, asyncio.ensure_future(self._attempt(order[i + 1], messages, kwargs))}
+                    while pending:
+                        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        for finished in done:
+                            if finished.exception() is None:
+                                for loser in pending:
+                                    loser.cancel()
+                                return finished.result()
+                            last_error = finished.exception()
+                    i += 2
+                    continue
+            try:
+                return await task
+            except Exception as e:
+                last_error = e
+            i += 1
+        raise last_error or RuntimeError("No LLM provider available")
+
+    async def astream(self, messages, **kwargs):
+        """
+        Streams from the first healthy candidate. Falls back only until the first
+        chunk arrives; after that the client already has tokens, so errors propagate.
+        """
+        last_error = None
+        for candidate in self._ordered():
+            start = time.monotonic()
+            iterator = candidate.runnable.astream(messages, **kwargs).__aiter__()
+            try:
+                first = await asyncio.wait_for(iterator.__anext__(), self.attempt_timeout)
+            except StopAsyncIteration:
+                candidate.health.record(True, time.monotonic() - start)
+                return
+            except Exception as e:
+                candidate.health.record(False, time.monotonic() - start)
+                logger.warning(f"LLM stream on {candidate.health.name} failed: {type(e).__name__}: {e}")
+                last_error = e
+                continue
+
+            # Latency for streams is time to first token
+            first_token_latency = time.monotonic() - start
+            yield first
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(iterator.__anext__(), self.attempt_timeout)
+                    except StopAsyncIteration:
+                        break
+                    yield chunk
+            except Exception:
+                candidate.health.record(False, time.monotonic() - start)
+                raise
+            candidate.health.record(True, first_token_latency)
+            return
+        raise last_error or RuntimeError("No LLM provider available")
+
+    # --- sync ---
+
+    def _start(self, candidate: Candidate, messages, kwargs) -> Optional[_SyncAttempt]:
+        """Starts a sync attempt, or returns None when the candidate has no free in-flight slot."""
+        if not candidate.health.acquire_slot():
+            # Saturated by slow or abandoned calls; skipping it is not a provider failure
+            logger.warning(f"LLM {candidate.health.name} is at its in-flight limit; skipping")
+            return None
+        return _SyncAttempt(candidate, messages, kwargs)
+
+    def _settle(self, attempt: _SyncAttempt):
+        """Records the outcome of a finished attempt and returns (ok, result_or_error)."""
+        candidate = attempt.candidate
+        try:
+            result = attempt.future.result(timeout=0)
+        except Exception as e:
+            candidate.health.record(False, time.monotonic() - attempt.started)
+            logger.warning(f"LLM attempt on {candidate.health.name} failed: {type(e).__name__}: {e}")
+            return False, e
+        candidate.health.record(True, time.monotonic() - attempt.started)
+        return True, result
+
+    def invoke(self, messages, **kwargs):
+        order = self._ordered()
+        last_error = None
+        i = 0
+        while i < len(order):
+            attempt = self._start(order[i], messages, kwargs)
+            if attempt is None:
+                last_error = RuntimeError(f"{order[i].health.name} is at its in-flight limit")
+                i += 1
+                continue
+            attempts = {attempt.future: attempt}
+            consumed = 1
+            # The deadline runs from when the call started, never from time spent waiting for a slot
+            deadline = attempt.started + self.attempt_timeout
+
+            delay = self._hedge_delay(order[i]) if i + 1 < len(order) else None
+            if delay is not None:
+                done, _ = wait([attempt.future], timeout=delay)
+                if not done:
+                    consumed = 2
+                    hedge = self._start(order[i + 1], messages, kwargs)
+                    if hedge is not None:
+                        logger.info(f"Hedging {order[i].health.name} with {order[i + 1].health.name}")
+                        attempts[hedge.future] = hedge
+                        deadline = max(deadline, hedge.started + self.attempt_timeout)
+
+            pending = set(attempts)
+            while pending:
+                done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                                     return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for finished in done:
+                    ok, outcome = self._settle(attempts[finished])
+                    if ok:
+                        return outcome
+                    last_error = outcome
+            for timed_out in pending:
+                candidate = attempts[timed_out].candidate
+                candidate.health.record(False, time.monotonic() - attempts[timed_out].started)
+                last_error = FutureTimeoutError(f"{candidate.health.name} exceeded {self.attempt_timeout}s")
+                logger.warning(f"LLM attempt on {candidate.health.name} timed out")
+            i += consumed
+        raise last_error or RuntimeError("No LLM provider available")
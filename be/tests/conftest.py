@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the app modules the way uvicorn does, from the be/ directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,54 @@
+import asyncio
+from starlette.requests import Request
+from config.config import Settings
+from helpers import authentication_utils
+from helpers.authentication_utils import check_login_attempts, login_client_ip
+
+def _request(forwarded_for=None, peer="10.0.0.5"):
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    return Request({"type": "http", "headers": headers, "client": (peer, 4321)})
+
+def test_client_ip_is_the_peer_without_a_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(Settings, "TRUSTED_PROXY_HOPS", 0)
+
+    assert login_client_ip(_request(forwarded_for="1.2.3.4")) == "10.0.0.5" # header ignored
+
+def test_client_ip_comes_from_the_trusted_proxy_entry(monkeypatch):
+    monkeypatch.setattr(Settings, "TRUSTED_PROXY_HOPS", 1)
+
+    assert login_client_ip(_request(forwarded_for="6.6.6.6, 203.0.113.7")) == "203.0.113.7" # spoofed prefix skipped
+    assert login_client_ip(_request()) is None
+
+    monkeypatch.setattr(Settings, "TRUSTED_PROXY_HOPS", 2)
+    assert login_client_ip(_request(forwarded_for="203.0.113.7, 10.1.0.2")) == "203.0.113.7"
+
+class FakePipeline:
+    def __init__(self, keys):
+        self.keys = keys
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, *args, **kwargs):
+        self.keys.append(key)
+
+    def incr(self, key):
+        pass
+
+    async def execute(self):
+        return [True, 1] * len(self.keys)
+
+def test_per_ip_bucket_only_counts_when_its_limit_is_set(monkeypatch):
+    keys = []
+    monkeypatch.setattr(authentication_utils.async_redis_client, "pipeline", lambda transaction: FakePipeline(keys))
+    monkeypatch.setattr(Settings, "LOGIN_MAX_ATTEMPTS_PER_IP", 0)
+    asyncio.run(check_login_attempts("ada@example.com", "10.0.0.5"))
+    assert keys == ["auth:attempts:account:ada@example.com"]
+
+    keys.clear()
+    monkeypatch.setattr(Settings, "LOGIN_MAX_ATTEMPTS_PER_IP", 50)
+    asyncio.run(check_login_attempts("ada@example.com", "10.0.0.5"))
+    assert keys == ["auth:attempts:account:ada@example.com", "auth:attempts:ip:10.0.0.5"]
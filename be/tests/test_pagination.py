@@ -0,0 +1,14 @@
+import base64
+import json
+import pytest
+from helpers.pagination import encode_cursor, decode_cursor
+
+def _raw(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor("PortFlow", "1")) == ["PortFlow", "1"]
+
+@pytest.mark.parametrize("cursor", [None, "", "MQ", _raw({"name": "x"}), _raw("PortFlow"), "not base64!", "////"])
+def test_malformed_cursors_decode_to_none(cursor):
+    assert decode_cursor(cursor) is None
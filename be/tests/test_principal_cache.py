@@ -0,0 +1,48 @@
+import asyncio
+from datetime import datetime, timezone
+from models.user import User
+from helpers import principal_cache
+
+class FakeAsyncRedis:
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+
+def _user():
+    return User(
+        id="u1", email="ada@example.com", hashed_password="$2b$12$secret", full_name="Ada",
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc), team_id="u1", role="admin",
+    )
+
+def test_principal_round_trips_without_password_hash():
+    user = principal_cache._to_user(principal_cache._to_data(_user()))
+
+    assert user.id == "u1"
+    assert user.email == "ada@example.com"
+    assert user.full_name == "Ada"
+    assert user.created_at == datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert user.hashed_password is None
+
+def test_aget_principal_fills_and_reads_both_tiers(monkeypatch):
+    redis = FakeAsyncRedis()
+    loads = []
+    monkeypatch.setattr(principal_cache, "async_redis_client", redis)
+    monkeypatch.setattr(principal_cache, "_load_from_db",
+                        lambda user_id: loads.append(user_id) or principal_cache._to_data(_user()))
+    principal_cache._local_cache.clear()
+
+    first = asyncio.run(principal_cache.aget_principal("u1"))
+    principal_cache._local_cache.clear() # force the Redis tier
+    second = asyncio.run(principal_cache.aget_principal("u1"))
+    third = asyncio.run(principal_cache.aget_principal("u1")) # local tier
+
+    assert loads == ["u1"]
+    assert "hashed_password" not in redis.store[principal_cache._principal_key("u1")]
+    for principal in (first, second, third):
+        assert principal.email == "ada@example.com"
+        assert principal.hashed_password is None
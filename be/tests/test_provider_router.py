@@ -0,0 +1,184 @@
+import asyncio
+import threading
+import time
+import uuid
+import pytest
+from config.config import Settings
+from services.provider_router import ProviderRouter, Candidate, get_health
+
+class FakeProvider:
+    """Local stand-in for a chat model: configurable delay, failure and stream shape."""
+    def __init__(self, name, delay=0.0, fail=False, fail_after_first=False):
+        self.name, self.delay, self.fail, self.fail_after_first = name, delay, fail, fail_after_first
+        self.calls = 0
+        self.cancelled = False
+
+    async def ainvoke(self, messages, **kwargs):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.fail:
+            raise RuntimeError(f"{self.name} down")
+        return self.name
+
+    def invoke(self, messages, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} down")
+        return self.name
+
+    async def astream(self, messages, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} down")
+        yield f"{self.name}-1"
+        if self.fail_after_first:
+            raise RuntimeError(f"{self.name} dropped mid-stream")
+        yield f"{self.name}-2"
+
+@pytest.fixture(autouse=True)
+def fast_settings(monkeypatch):
+    monkeypatch.setattr(Settings, "LLM_CIRCUIT_MIN_CALLS", 2)
+    monkeypatch.setattr(Settings, "LLM_CIRCUIT_ERROR_RATE", 0.5)
+    monkeypatch.setattr(Settings, "LLM_CIRCUIT_COOLDOWN_SECONDS", 0.05)
+    monkeypatch.setattr(Settings, "LLM_HEDGE_MIN_DELAY_SECONDS", 0.01)
+
+def _candidate(fake):
+    # Unique model name per test: health is shared per (provider, model) across the worker
+    return Candidate("fake", f"{fake.name}-{uuid.uuid4().hex[:8]}", fake)
+
+def _router(*fakes, timeout=0.1, hedge=False):
+    return ProviderRouter([_candidate(f) for f in fakes], attempt_timeout=timeout, hedge=hedge)
+
+async def _collect(stream):
+    return [chunk async for chunk in stream]
+
+def test_circuit_opens_half_opens_and_closes():
+    health = get_health("fake", uuid.uuid4().hex)
+
+    health.record(False, 0.01)
+    assert health.state() == "closed" # below LLM_CIRCUIT_MIN_CALLS
+    health.record(False, 0.01)
+    assert health.state() == "open" and not health.available()
+
+    time.sleep(0.06)
+    assert health.state() == "half_open" and health.available()
+    health.record(False, 0.01) # failed trial re-arms the cooldown
+    assert health.state() == "open"
+
+    time.sleep(0.06)
+    health.record(True, 0.02)
+    assert health.state() == "closed"
+    assert health.stats()["calls"] == 1 # clean window after recovery
+
+def test_open_circuit_is_skipped_without_calling_the_provider():
+    primary, secondary = FakeProvider("a", fail=True), FakeProvider("b")
+    router = _router(primary, secondary)
+
+    assert [router.invoke([]) for _ in range(3)] == ["b", "b", "b"]
+    assert primary.calls == 2 # the circuit opened after LLM_CIRCUIT_MIN_CALLS failures
+    assert router.candidates[0].health.state() == "open"
+
+def test_async_attempt_past_its_deadline_falls_back():
+    primary, secondary = FakeProvider("a", delay=1), FakeProvider("b")
+    router = _router(primary, secondary, timeout=0.05)
+
+    started = time.monotonic()
+    assert asyncio.run(router.ainvoke([])) == "b"
+    assert time.monotonic() - started < 0.5
+    assert router.candidates[0].health.stats()["error_rate"] == 1.0
+
+def test_sync_attempt_past_its_deadline_falls_back():
+    primary, secondary = FakeProvider("a", delay=0.5), FakeProvider("b")
+    router = _router(primary, secondary, timeout=0.05)
+
+    started = time.monotonic()
+    assert router.invoke([]) == "b"
+    assert time.monotonic() - started < 0.4
+    assert router.candidates[0].health.stats()["error_rate"] == 1.0
+
+def test_hedge_returns_the_faster_provider_and_cancels_the_loser():
+    primary, secondary = FakeProvider("a", delay=0.5), FakeProvider("b")
+    router = _router(primary, secondary, timeout=1, hedge=True)
+    router.candidates[0].health.record(True, 0.01) # p95 baseline for the hedge delay
+
+    async def run():
+        result = await router.ainvoke([])
+        await asyncio.sleep(0) # let the cancellation land
+        return result
+
+    assert asyncio.run(run()) == "b"
+    assert secondary.calls == 1
+    assert primary.cancelled
+
+def test_sync_hedge_returns_the_faster_provider():
+    primary, secondary = FakeProvider("a", delay=0.3), FakeProvider("b")
+    router = _router(primary, secondary, timeout=1, hedge=True)
+    router.candidates[0].health.record(True, 0.01)
+
+    started = time.monotonic()
+    assert router.invoke([]) == "b"
+    assert time.monotonic() - started < 0.25
+
+def test_no_hedge_without_a_latency_baseline():
+    primary, secondary = FakeProvider("a", delay=0.05), FakeProvider("b")
+    router = _router(primary, secondary, timeout=1, hedge=True)
+
+    assert asyncio.run(router.ainvoke([])) == "a"
+    assert secondary.calls == 0
+
+def test_stream_falls_back_before_the_first_chunk():
+    primary, secondary = FakeProvider("a", fail=True), FakeProvider("b")
+
+    assert asyncio.run(_collect(_router(primary, secondary).astream([]))) == ["b-1", "b-2"]
+
+def test_stream_falls_back_when_the_first_chunk_misses_the_deadline():
+    primary, secondary = FakeProvider("a", delay=1), FakeProvider("b")
+
+    assert asyncio.run(_collect(_router(primary, secondary, timeout=0.05).astream([]))) == ["b-1", "b-2"]
+
+def test_stream_error_after_the_first_chunk_propagates():
+    primary, secondary = FakeProvider("a", fail_after_first=True), FakeProvider("b")
+    router = _router(primary, secondary)
+    received = []
+
+    async def run():
+        async for chunk in router.astream([]):
+            received.append(chunk)
+
+    with pytest.raises(RuntimeError, match="mid-stream"):
+        asyncio.run(run())
+    assert received == ["a-1"]
+    assert secondary.calls == 0
+
+def test_saturated_provider_is_skipped_without_counting_a_failure(monkeypatch):
+    monkeypatch.setattr(Settings, "LLM_MAX_IN_FLIGHT_PER_PROVIDER", 1)
+    primary, secondary = FakeProvider("a", delay=0.3), FakeProvider("b")
+    router = _router(primary, secondary, timeout=0.05)
+
+    assert router.invoke([]) == "b" # primary timed out but its call is still running
+    assert router.invoke([]) == "b" # so its only slot is taken and it is skipped
+    assert primary.calls == 1
+    assert router.candidates[0].health.stats()["calls"] == 1
+
+    time.sleep(0.35)
+    assert router.candidates[0].health.stats()["in_flight"] == 0
+
+def test_fallback_deadline_is_not_spent_queueing_behind_hung_calls():
+    primary, secondary = FakeProvider("a", delay=0.5), FakeProvider("b", delay=0.02)
+    router = _router(primary, secondary, timeout=0.1)
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(router.invoke([]))) for _ in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["b"] * 40
+    assert router.candidates[1].health.stats()["error_rate"] == 0.0
@@ -0,0 +1,63 @@
+import pytest
+from controllers.query_router import route_query, briefing
+
+PODS = ["Infrastructure", "HealthTech", "FinTech", "CleanTech"]
+
+@pytest.mark.parametrize("question, tool, payload", [
+    ("top 3 by NPS", "get_ventures_by_metrics",
+     {"metric_type": "nps_score", "operator": "sort_desc", "limit": 3}),
+    ("show critical ventures in FinTech", "search_ventures", {"health": "Critical", "pod": "FinTech"}),
+    ("ventures with runway under 6 months", "get_ventures_by_metrics",
+     {"metric_type": "runway_months", "operator": "lt", "value": 6.0}),
+    ("which ventures burn more than 100k", "get_ventures_by_metrics",
+     {"metric_type": "burn_rate_monthly", "operator": "gt", "value": 100000.0}),
+    ("ventures with nps between 40 and 70", "get_ventures_by_metrics",
+     {"metric_type": "nps_score", "operator": "between", "value": 40.0, "value_max": 70.0}),
+    ("show me ventures in the pilot stage", "search_ventures", {"stage": "Pilot"}),
+    ("list at risk ventures", "search_ventures", {"health": "At Risk"}),
+    ("fintech ventures with highest nps in growth stage", "get_ventures_by_metrics",
+     {"metric_type": "nps_score", "operator": "sort_desc", "pod": "FinTech", "stage": "Growth"}),
+])
+def test_simple_lookups_take_the_fast_path(question, tool, payload):
+    routed = route_query(question, PODS)
+
+    assert routed is not None
+    assert routed.tool == tool
+    assert routed.payload == payload
+
+@pytest.mark.parametrize("question", [
+    # negation
+    "ventures that are not at risk",
+    "ventures without pilot customers",
+    "all ventures except FinTech",
+    "which ventures aren't on track",
+    # more than one condition
+    "runway under 6 months and nps above 50",
+    "critical or at risk ventures",
+    "fintech and healthtech ventures",
+    "highest burn and lowest nps",
+    # venture names and other unparsed tokens
+    "is PortFlow on track",
+    "top 3 fintech ventures by burn rate in 2023",
+    "ventures with runway under 6 months founded by Alex",
+    # reasoning and context
+    "why is MedFlow critical?",
+    "compare them",
+    "what's the total burn of healthtech",
+    # a count search_ventures can't apply
+    "show me 3 critical fintech ventures",
+])
+def test_ambiguous_questions_go_to_the_agent(question):
+    assert route_query(question, PODS) is None
+
+def test_briefing_applies_analyst_rules():
+    routed = route_query("top 2 ventures by nps in fintech", PODS)
+    ventures = [
+        {"name": "A", "runway_months": 4, "nps_score": 80, "burn_rate_monthly": 60000, "pilot_customers_count": 0},
+        {"name": "B", "runway_months": 10, "nps_score": 20, "burn_rate_monthly": 10, "pilot_customers_count": 2},
+    ]
+
+    text = briefing(routed, ventures)
+
+    assert text.startswith("I've identified 2 ventures in FinTech ranked by highest NPS: A and B.")
+    assert "CRITICAL" in text and "STRONG PMF" in text and "EFFICIENCY WARNING on A" in text
@@ -0,0 +1,84 @@
+import asyncio
+from controllers import response_cache
+
+PODS = ["FinTech", "HealthTech"]
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis, self.ops = redis, []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.ops.append((name, args))
+
+    async def execute(self):
+        return [await getattr(self.redis, name)(*args) for name, args in self.ops]
+
+class FakeAsyncRedis:
+    def __init__(self):
+        self.store, self.hashes = {}, {}
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    async def hlen(self, key):
+        return len(self.hashes.get(key, {}))
+
+    async def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def expire(self, key, ttl):
+        return True
+
+def _setup(monkeypatch, similarity):
+    monkeypatch.setattr(response_cache, "async_redis_client", FakeAsyncRedis())
+    monkeypatch.setattr(response_cache.settings, "RESPONSE_CACHE_SIMILARITY", similarity)
+
+def _store(question):
+    asyncio.run(response_cache.astore(question, {}, 1, "cached answer", ["1"], {}, pods=PODS))
+
+def _lookup(question, version=1):
+    return asyncio.run(response_cache.alookup(question, {}, version, pods=PODS))
+
+def test_exact_match_ignores_case_punctuation_and_filler(monkeypatch):
+    _setup(monkeypatch, 0)
+    _store("Which ventures are at risk?")
+
+    assert _lookup("show me which ventures are at risk")["answer"] == "cached answer"
+    assert _lookup("which ventures are at risk", version=2) is None
+
+def test_near_match_requires_the_same_pods_health_and_numbers(monkeypatch):
+    _setup(monkeypatch, 0.5)
+    _store("FinTech ventures with less than 6 months runway")
+
+    assert _lookup("fintech ventures with less than 6 months of runway")["answer"] == "cached answer"
+    assert _lookup("HealthTech ventures with less than 6 months runway") is None
+    assert _lookup("FinTech ventures with less than 9 months runway") is None
+    assert _lookup("critical FinTech ventures with less than 6 months runway") is None
+
+def test_near_match_requires_the_same_metric_order_and_negation(monkeypatch):
+    _setup(monkeypatch, 0.01) # anything sharing a word is "similar"; only the entity check separates these
+    for question in ("which ventures are at risk", "which ventures have the lowest runway",
+                     "ventures with burn under 50k"):
+        _store(question)
+
+    assert _lookup("which ventures are not at risk") is None
+    assert _lookup("which ventures aren't at risk") is None
+    assert _lookup("which ventures have the highest burn") is None
+    assert _lookup("which ventures have the highest runway") is None
+    assert _lookup("ventures with burn over 50k") is None
+    assert _lookup("which of the ventures have the lowest runway")["answer"] == "cached answer"
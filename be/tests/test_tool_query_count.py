@@ -0,0 +1,45 @@
+from datetime import datetime
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.schema import CreateTable
+from sqlmodel import SQLModel, Session
+from models import Venture, PilotCustomer
+from controllers.venture_filtering import search_ventures, get_ventures_by_metrics
+
+def _engine_with(n_ventures: int):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        # Tables only: the Postgres-specific indexes (GIN, trigram, tsvector) don't matter here
+        for table in SQLModel.metadata.sorted_tables:
+            conn.execute(CreateTable(table))
+    with Session(engine) as session:
+        for i in range(n_ventures):
+            session.add(Venture(
+                id=str(i), name=f"Venture {i}", pod="FinTech", stage="Pilot", founder="Founder", health="At Risk",
+                description="", last_update_text="", burn_rate_monthly=1000 * i, runway_months=i,
+                nps_score=i, pilot_customers_count=2,
+            ))
+            for j in range(2):
+                session.add(PilotCustomer(id=f"{i}-{j}", name=f"Customer {j}", contract_value=1,
+                                          start_date=datetime(2024, 1, 1), venture_id=str(i)))
+        session.commit()
+    return engine
+
+def _statements(engine, tool, payload) -> int:
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    with Session(engine) as session:
+        result = tool(state={}, payload=payload, db=session)
+    assert all(len(v["pilot_customers"]) == 2 for v in result["data"])
+    return len(statements)
+
+@pytest.mark.parametrize("tool, payload", [
+    (search_ventures, {"pod": "FinTech"}),
+    (get_ventures_by_metrics, {"metric_type": "nps_score", "operator": "sort_desc"}),
+])
+def test_tool_query_count_does_not_grow_with_results(tool, payload):
+    one = _statements(_engine_with(1), tool, payload)
+    many = _statements(_engine_with(25), tool, payload)
+
+    assert one == many == 2 # ventures + one batched SELECT ... IN for pilot customers
@@ -0,0 +1,27 @@
+import json
+from datetime import datetime, timezone
+from models import Venture, PilotCustomer
+from controllers.venture_filtering import _llm_row_json, serialize_for_llm
+
+def test_llm_row_reflects_pilot_customer_changes_without_venture_update():
+    venture = Venture(
+        id="1", name="PortFlow", pod="Infrastructure", stage="Scale", founder="Alex", health="On Track",
+        description="Port logistics", last_update_text="Closed Series A", burn_rate_monthly=85000,
+        runway_months=18, nps_score=72, pilot_customers_count=1, updated_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+    pilot = PilotCustomer(id="p1", name="Maersk", status="Active", contract_value=1,
+                          start_date=datetime(2024, 1, 15), venture_id="1")
+    venture.pilot_customers = [pilot]
+    assert json.loads(_llm_row_json(venture))["pilot_customers"] == ["Maersk (Active)"]
+
+    pilot.status = "Churned" # venture.updated_at unchanged
+
+    assert json.loads(_llm_row_json(venture))["pilot_customers"] == ["Maersk (Churned)"]
+
+def test_unparsable_cursor_starts_from_the_first_row():
+    ventures = [Venture(id=str(i), name=f"Venture {i}", pod="FinTech", stage="Pilot", founder="Alex",
+                        health="On Track", description="", last_update_text="", pilot_customers=[])
+                for i in range(3)]
+
+    for cursor in ("next", "", None, [2]):
+        assert serialize_for_llm(ventures, cursor=cursor) == serialize_for_llm(ventures, cursor=0)
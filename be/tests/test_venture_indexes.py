@@ -0,0 +1,71 @@
+import os
+import pytest
+from sqlalchemy import create_engine, text
+from sqlmodel import SQLModel, Session, select
+from models import Venture
+from models.db import ensure_indexes
+
+# Needs a throwaway Postgres database with pg_trgm available
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+
+@pytest.fixture(scope="module")
+def db_engine():
+    db_engine = create_engine(TEST_DATABASE_URL)
+    with db_engine.begin() as conn:
+        try:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        except Exception:
+            pytest.skip("pg_trgm is not available")
+    SQLModel.metadata.drop_all(db_engine)
+    SQLModel.metadata.create_all(db_engine)
+    with Session(db_engine) as session:
+        for i in range(500):
+            session.add(Venture(
+                id=str(i), name=f"Venture {i}", pod=["FinTech", "HealthTech", "CleanTech"][i % 3],
+                stage=["Pilot", "Growth", "Scale"][i % 5 % 3], health=["On Track", "At Risk", "Critical"][i % 7 % 3],
+                founder=f"Founder {i}", description="Port logistics", last_update_text="",
+                burn_rate_monthly=1000 * i, runway_months=i % 24, nps_score=i % 100, pilot_customers_count=i % 5,
+            ))
+        session.commit()
+    with db_engine.begin() as conn:
+        conn.execute(text("ANALYZE venture"))
+    yield db_engine
+    SQLModel.metadata.drop_all(db_engine)
+    db_engine.dispose()
+
+def _plan(db_engine, statement) -> str:
+    sql = statement.compile(db_engine, compile_kwargs={"literal_binds": True})
+    with db_engine.connect() as conn:
+        # Tiny test tables would otherwise be seq-scanned whatever indexes exist
+        conn.execute(text("SET enable_seqscan = off"))
+        return "\n".join(row[0] for row in conn.execute(text(f"EXPLAIN {sql}")))
+
+def test_ensure_indexes_restores_indexes_missing_on_an_existing_table(db_engine):
+    with db_engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_venture_pod_stage_health_runway"))
+        conn.execute(text("DROP INDEX ix_venture_name_trgm"))
+
+    ensure_indexes(db_engine)
+    ensure_indexes(db_engine) # idempotent
+
+    with db_engine.connect() as conn:
+        names = {row[0] for row in conn.execute(text("SELECT indexname FROM pg_indexes WHERE tablename = 'venture'"))}
+    assert {"ix_venture_pod_stage_health_runway", "ix_venture_name_trgm"} <= names
+
+def test_filter_predicates_use_the_composite_index(db_engine):
+    statement = select(Venture).where(
+        Venture.pod == "FinTech", Venture.stage == "Pilot", Venture.health == "At Risk",
+        Venture.runway_months >= 6)
+
+    assert "ix_venture_pod_stage_health_runway" in _plan(db_engine, statement)
+
+def test_substring_search_uses_the_trigram_index(db_engine):
+    statement = select(Venture).where(Venture.name.ilike("%ture 12%"))
+
+    assert "ix_venture_name_trgm" in _plan(db_engine, statement)
+
+def test_metric_threshold_uses_the_metric_index(db_engine):
+    statement = select(Venture).where(Venture.runway_months < 6).order_by(Venture.runway_months)
+
+    assert "ix_venture_runway_months" in _plan(db_engine, statement)
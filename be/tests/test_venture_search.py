@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.schema import CreateTable
+from sqlmodel import SQLModel, Session
+from controllers import venture_search
+from models import Venture
+from services.embeddings import HashingEmbedder, set_embedder
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self):
+        super().__init__()
+        self.encoded = []
+
+    def encode(self, texts):
+        self.encoded.extend(texts)
+        return super().encode(texts)
+
+def _venture(id, name, description, day=1):
+    return Venture(id=id, name=name, pod="Infrastructure", stage="Pilot", founder="Alex", health="On Track",
+                   description=description, last_update_text="", updated_at=datetime(2024, 1, day, tzinfo=timezone.utc))
+
+def _engine(ventures):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            conn.execute(CreateTable(table))
+    with Session(engine) as session:
+        session.add_all(ventures)
+        session.commit()
+    return engine
+
+def test_top_k_drops_ventures_below_the_similarity_floor(monkeypatch):
+    set_embedder(HashingEmbedder())
+    monkeypatch.setattr(venture_search, "get_data_version", lambda: 1)
+    engine = _engine([
+        _venture("1", "PortFlow", "AI-powered port logistics optimization platform"),
+        _venture("2", "MedFlow", "patient intake automation for clinics"),
+    ])
+    index = venture_search._EmbeddingIndex()
+    with Session(engine) as session:
+        index.ensure_fresh(session)
+
+    assert index.top_k("port logistics optimization", 5) == ["1"]
+    assert index.top_k("quantum chocolate festival", 5) == []
+
+def test_refresh_re_embeds_only_changed_ventures(monkeypatch):
+    embedder = CountingEmbedder()
+    set_embedder(embedder)
+    version = {"value": 1}
+    monkeypatch.setattr(venture_search, "get_data_version", lambda: version["value"])
+    engine = _engine([_venture(str(i), f"Venture {i}", "payments platform") for i in range(20)])
+    index = venture_search._EmbeddingIndex()
+    with Session(engine) as session:
+        index.ensure_fresh(session)
+        assert len(embedder.encoded) == 20
+
+        changed = session.get(Venture, "7")
+        changed.description, changed.updated_at = "port logistics", datetime(2024, 2, 1, tzinfo=timezone.utc)
+        session.delete(session.get(Venture, "3"))
+        session.commit()
+        version["value"] = 2
+        embedder.encoded.clear()
+        index.ensure_fresh(session)
+
+    assert len(embedder.encoded) == 1 and "port logistics" in embedder.encoded[0]
+    assert len(index.ids) == 19 and "3" not in index.ids
+    assert index.top_k("port logistics", 1) == ["7"]
+
+def test_unparsable_k_falls_back_to_the_default(monkeypatch):
+    requested = []
+    monkeypatch.setattr(venture_search, "fulltext_search", lambda db, query, k: requested.append(k) or [])
+    monkeypatch.setattr(venture_search, "get_embedder", lambda: HashingEmbedder())
+
+    for k in ("five", "", None, {}):
+        venture_search.search_venture_text({}, {"query": "payments", "k": k}, db=None)
+
+    assert requested == [venture_search.DEFAULT_TOP_K] * 4